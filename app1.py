@@ -8,11 +8,16 @@
 
 import streamlit as st
 import pandas as pd
+from data_store import load_dataset
 import pickle
 import folium
 from streamlit_folium import st_folium
-import random
 import warnings
+from distance_matrix import load_distance_matrix
+from geo import haversine
+from ride_index import RideIndex
+from ride_offers import build_offers
+from owner_generator import generate_owners, OWNER_SEED
 warnings.filterwarnings('ignore')
 
 # ============================================================================
@@ -158,62 +163,29 @@ if 'show_results' not in st.session_state:
 # LOAD DATA
 # ============================================================================
 
-@st.cache_resource
-def generate_owners(n):
-    first_names = ['Aarav', 'Aditya', 'Arjun', 'Aryan', 'Ashok', 'Amit', 'Anand', 'Atul',
-                   'Bhuvan', 'Bhavesh', 'Chirag', 'Chetan', 'Deepak', 'Devendra', 'Dhruv',
-                   'Farhan', 'Fahim', 'Gaurav', 'Girish', 'Harsh', 'Harish', 'Ishan',
-                   'Jayesh', 'Jayadev', 'Karan', 'Krishan', 'Lalit', 'Mahesh', 'Manish',
-                   'Mohan', 'Naveen', 'Nilesh', 'Nikhil', 'Omkar', 'Pankaj', 'Prakash',
-                   'Rahul', 'Rajesh', 'Ravi', 'Sandeep', 'Suresh', 'Sanjay', 'Tarun',
-                   'Tushar', 'Varun', 'Vikram', 'Vikas', 'Vinay', 'Vivek', 'Wasim', 'Yash'] * 160
-
-    surnames = ['Singh', 'Kumar', 'Sharma', 'Patel', 'Gupta', 'Verma', 'Pandey', 'Mishra',
-                'Desai', 'Rao', 'Reddy', 'Roy', 'Ghosh', 'Dutta', 'Banerjee', 'Bhattacharya',
-                'Mukherjee', 'Das', 'Nair', 'Menon', 'Iyer', 'Iyengar', 'Krishnan', 'Pillay',
-                'Srivastava', 'Jain', 'Malhotra', 'Kapoor', 'Grover', 'Ahuja', 'Chopra',
-                'Khanna', 'Bhatia', 'Mittal', 'Saxena', 'Mehra', 'Kohli', 'Sethi', 'Talwar',
-                'Sinha', 'Bose', 'Dey', 'Chattopadhyay', 'Sen', 'Dasgupta', 'Nag', 'Bagchi',
-                'Mitra', 'Sarkar', 'Chatterjee', 'Basu', 'Saha'] * 160
-
-    names, times, ratings = [], [], []
-    for i in range(n):
-        names.append(f"{random.choice(first_names)} {random.choice(surnames)}")
-        hour = random.randint(6, 23)
-        minute = random.choice([0, 15, 30, 45])
-        times.append(f"{hour:02d}:{minute:02d}")
-        ratings.append(round(random.uniform(3.5, 5.0), 1))
-    return names, times, ratings
-
 @st.cache_resource
 def load_data():
-    df = pd.read_csv("car-data.csv")
-    names, times, ratings = generate_owners(len(df))
-    df['Owner_Name'] = names
-    df['Availability'] = times
-    df['Rating'] = ratings
+    df = load_dataset("car-data.csv")
+    owners = generate_owners(len(df), seed=OWNER_SEED)
+    df[owners.columns] = owners
 
     try:
         coords = pickle.load(open('location_coordinates.pkl', 'rb'))
     except:
         coords = {}
 
-    return df, coords
+    return df, coords, RideIndex(df)
 
-df, coords = load_data()
+df, coords, ride_index = load_data()
 
 # ============================================================================
 # FUNCTIONS
 # ============================================================================
 
+road_matrix = load_distance_matrix()
+
 def calc_distance(lat1, lon1, lat2, lon2):
-    from math import radians, sin, cos, sqrt, atan2
-    R = 6371
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat, dlon = lat2 - lat1, lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
-    return round(R * c, 2)
+    return round(float(haversine(lat1, lon1, lat2, lon2)), 2)
 
 def calc_fare(distance):
     base = 50
@@ -266,7 +238,8 @@ with col4:
         if pickup in coords and drop in coords:
             lat1, lon1 = coords[pickup]
             lat2, lon2 = coords[drop]
-            st.session_state.distance = calc_distance(lat1, lon1, lat2, lon2)
+            road_km, _ = road_matrix.lookup(pickup, drop)
+            st.session_state.distance = road_km if road_km is not None else calc_distance(lat1, lon1, lat2, lon2)
         else:
             st.session_state.distance = 150
 
@@ -368,22 +341,19 @@ if st.session_state.show_results:
     with col_rides:
         st.write("### 🚗 Available Rides")
 
-        route_data = df[(df['pickup location'] == st.session_state.pickup) & 
-                        (df['drop location'] == st.session_state.drop)]
-
-        if len(route_data) == 0:
-            route_data = df[df['pickup location'] == st.session_state.pickup].head(6)
+        # Route rides, or every ride from the pickup if the route has none
+        route_data = df.iloc[ride_index.search(st.session_state.pickup, st.session_state.drop)]
 
         if len(route_data) > 0:
-            for idx, (_, ride) in enumerate(route_data.head(6).iterrows()):
+            offers = build_offers(route_data.head(6), calc_fare(st.session_state.distance), modifiers=None)
+            for idx, ride in enumerate(offers):
                 with st.container():
                     st.markdown('<div class="ride-card">', unsafe_allow_html=True)
 
                     # Top row - Owner info
                     col_a, col_b = st.columns([3, 1])
                     with col_a:
-                        owner_initial = ride['Owner_Name'][0].upper()
-                        st.markdown(f"**{owner_initial}** {ride['Owner_Name']} | ⭐ {ride['Rating']}")
+                        st.markdown(f"**{ride['initial']}** {ride['name']} | ⭐ {ride['rating']}")
                     with col_b:
                         st.markdown(f"👥 {ride['seats']}")
 
@@ -392,13 +362,12 @@ if st.session_state.show_results:
                     st.markdown(f"📍 **To:** {st.session_state.drop}")
 
                     # Time
-                    st.markdown(f"📅 {st.session_state.date.strftime('%b %d, %Y')} | ⏰ {ride['Availability']} AM")
+                    st.markdown(f"📅 {st.session_state.date.strftime('%b %d, %Y')} | ⏰ {ride['availability']} AM")
 
                     # Bottom - Price and button
-                    fare = calc_fare(st.session_state.distance)
                     col_x, col_y = st.columns([2, 1])
                     with col_x:
-                        st.markdown(f"## 🟢 **₹{fare}** per seat")
+                        st.markdown(f"## 🟢 **₹{ride['price']}** per seat")
                     with col_y:
                         st.button("View", key=f"v_{idx}", use_container_width=True)
 
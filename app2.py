@@ -5,9 +5,14 @@
 
 import streamlit as st
 import pandas as pd
+from data_store import load_dataset
 import pickle
-import random
 import warnings
+from distance_matrix import load_distance_matrix
+from geo import haversine
+from ride_index import RideIndex
+from ride_offers import build_offers
+from owner_generator import generate_owners, OWNER_SEED
 warnings.filterwarnings('ignore')
 
 # ============================================================================
@@ -47,53 +52,29 @@ if 'show_results' not in st.session_state:
 # LOAD DATA
 # ============================================================================
 
-@st.cache_resource
-def generate_owners(n):
-    first_names = ['Aarav', 'Aditya', 'Arjun', 'Aryan', 'Ashok', 'Amit', 'Anand', 'Atul',
-                   'Bhuvan', 'Bhavesh', 'Chirag', 'Chetan', 'Deepak', 'Devendra', 'Dhruv',
-                   'Farhan', 'Fahim', 'Gaurav', 'Girish', 'Harsh', 'Harish', 'Ishan'] * 100
-
-    surnames = ['Singh', 'Kumar', 'Sharma', 'Patel', 'Gupta', 'Verma', 'Pandey', 'Mishra',
-                'Desai', 'Rao', 'Reddy', 'Roy', 'Ghosh', 'Dutta', 'Banerjee', 'Bhattacharya'] * 100
-
-    names, times, ratings = [], [], []
-    for i in range(n):
-        names.append(f"{random.choice(first_names)} {random.choice(surnames)}")
-        hour = random.randint(6, 23)
-        minute = random.choice([0, 15, 30, 45])
-        times.append(f"{hour:02d}:{minute:02d}")
-        ratings.append(round(random.uniform(3.5, 5.0), 1))
-    return names, times, ratings
-
 @st.cache_resource
 def load_data():
-    df = pd.read_csv("C:\\CODE\\python projects\\car-price prediction\\csv\\car-data.csv")
-    names, times, ratings = generate_owners(len(df))
-    df['Owner_Name'] = names
-    df['Availability'] = times
-    df['Rating'] = ratings
+    df = load_dataset("car-data.csv")
+    owners = generate_owners(len(df), seed=OWNER_SEED)
+    df[owners.columns] = owners
 
     try:
         coords = pickle.load(open('location_coordinates.pkl', 'rb'))
     except:
         coords = {}
 
-    return df, coords
+    return df, coords, RideIndex(df)
 
-df, coords = load_data()
+df, coords, ride_index = load_data()
 
 # ============================================================================
 # FUNCTIONS
 # ============================================================================
 
+road_matrix = load_distance_matrix()
+
 def calc_distance(lat1, lon1, lat2, lon2):
-    from math import radians, sin, cos, sqrt, atan2
-    R = 6371
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat, dlon = lat2 - lat1, lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
-    return round(R * c, 2)
+    return round(float(haversine(lat1, lon1, lat2, lon2)), 2)
 
 def calc_fare_model(distance, seats=4):
     """ML Model based fare calculation"""
@@ -160,7 +141,8 @@ with col4:
         if pickup in coords and drop in coords:
             lat1, lon1 = coords[pickup]
             lat2, lon2 = coords[drop]
-            st.session_state.distance = calc_distance(lat1, lon1, lat2, lon2)
+            road_km, _ = road_matrix.lookup(pickup, drop)
+            st.session_state.distance = road_km if road_km is not None else calc_distance(lat1, lon1, lat2, lon2)
         else:
             st.session_state.distance = 14.27
 
@@ -216,21 +198,17 @@ if st.session_state.show_results:
         st.write("### 🚗 Available Rides")
         st.divider()
 
-        route_data = df[(df['pickup location'] == st.session_state.pickup) & 
-                        (df['drop location'] == st.session_state.drop)]
-
-        if len(route_data) == 0:
-            route_data = df[df['pickup location'] == st.session_state.pickup].head(6)
+        # Route rides, or every ride from the pickup if the route has none
+        route_data = df.iloc[ride_index.search(st.session_state.pickup, st.session_state.drop)]
 
         if len(route_data) > 0:
-            for idx, (_, ride) in enumerate(route_data.head(6).iterrows()):
-
-                fare = calc_fare_model(st.session_state.distance, ride['seats'])
+            offers = build_offers(route_data.head(6), calc_fare_model(st.session_state.distance), modifiers=None)
+            for idx, ride in enumerate(offers):
 
                 # Owner info
                 col_a, col_b = st.columns([3, 1])
                 with col_a:
-                    st.write(f"**{ride['Owner_Name'][0]}** {ride['Owner_Name']} | ⭐ {ride['Rating']}")
+                    st.write(f"**{ride['initial']}** {ride['name']} | ⭐ {ride['rating']}")
                 with col_b:
                     st.write(f"👥 {ride['seats']}")
 
@@ -239,7 +217,7 @@ if st.session_state.show_results:
                 st.write(f"📍 **To:** {st.session_state.drop}")
 
                 # Date & Time
-                st.write(f"📅 {st.session_state.date.strftime('%b %d, %Y')} | ⏰ {ride['Availability']} AM")
+                st.write(f"📅 {st.session_state.date.strftime('%b %d, %Y')} | ⏰ {ride['availability']} AM")
 
                 st.divider()
 
@@ -247,7 +225,7 @@ if st.session_state.show_results:
                 st.write("")
                 col_x, col_y = st.columns([2, 1])
                 with col_x:
-                    st.success(f"### ₹{fare} per seat")
+                    st.success(f"### ₹{ride['price']} per seat")
                 with col_y:
                     st.button("View", key=f"view_{idx}", use_container_width=True)
 
@@ -1,8 +1,12 @@
 import streamlit as st
 import pandas as pd
+from data_store import load_dataset
 import pickle
 import openrouteservice
 from openrouteservice import convert
+from route_cache import RouteCache
+from ride_offers import build_offers
+from distance_matrix import load_distance_matrix
 import folium
 from streamlit_folium import st_folium
 
@@ -28,7 +32,7 @@ st.markdown("""
 # ---- Data Load ----
 @st.cache_resource
 def load_data():
-    df = pd.read_csv("car-data.csv")
+    df = load_dataset("car-data.csv")
     # Add random owners, times, ratings for 8000+ rows if needed
     return df
 
@@ -62,6 +66,7 @@ coords_dict = {
     "Beliaghata": (22.5631, 88.393)
     
 }
+road_matrix = load_distance_matrix()
 
 # ---- Fare calculation model (as per your formula) ----
 def calc_fare(distance_km):
@@ -111,7 +116,7 @@ if st.session_state.get('show_results', False):
         org_coords = (coords_dict[pickup][1], coords_dict[pickup][0])  
         dest_coords = (coords_dict[drop][1], coords_dict[drop][0])
 
-        client = openrouteservice.Client(key=ORS_API_KEY)
+        client = RouteCache(openrouteservice.Client(key=ORS_API_KEY))
         try:
             # (lng, lat) order!
             coords = [org_coords, dest_coords] 
@@ -144,19 +149,20 @@ if st.session_state.get('show_results', False):
 
         except Exception as e:
             st.error("Failed to get realistic route. (API key correct? Cities valid?)")
+            # Precomputed road distance when the route is known, rough guess otherwise
+            distance_km, duration_min = road_matrix.lookup(pickup, drop, default=(12, 30))
+            fair_price = calc_fare(distance_km)
 
     # Cards for available rides (demo, can be enhanced)
     st.markdown(f"### Available Rides")
     sample_names = [("Aarav Singh", 4.7), ("Krishna Verma", 4.5), ("Sneha Das", 4.2), ("Priya Sen", 4.8)]
-    for name, rating in sample_names:
-        with st.container():
-            st.markdown(
-    f"<div class='card'><b>{name}</b> &nbsp; ⭐ <b>{rating}</b><br>"
-    f"🟢 <b>From:</b> {pickup} &nbsp; 🔴 <b>To:</b> {drop}<br>"
-    f"🗓️ <b>Date:</b> {date.strftime('%b %d, %Y')}<br>"
-    f"<span style='font-size:1.2rem; color:#02ac5a;font-weight:700;'>₹{fair_price} per seat</span></div>",
-    unsafe_allow_html=True
-)
+    offers = build_offers(sample_names, fair_price, modifiers=None)
+    st.markdown("".join(
+        f"<div class='card'><b>{offer['name']}</b> &nbsp; ⭐ <b>{offer['rating']}</b><br>"
+        f"🟢 <b>From:</b> {pickup} &nbsp; 🔴 <b>To:</b> {drop}<br>"
+        f"🗓️ <b>Date:</b> {date.strftime('%b %d, %Y')}<br>"
+        f"<span style='font-size:1.2rem; color:#02ac5a;font-weight:700;'>₹{offer['price']} per seat</span></div>"
+        for offer in offers), unsafe_allow_html=True)
 
 
     st.session_state['show_results'] = True  # So user must click search again for new results
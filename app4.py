@@ -1,11 +1,14 @@
 #different timing availability for drivers 
 import streamlit as st
 import pandas as pd
+from data_store import load_dataset
 import openrouteservice
 from openrouteservice import convert
+from route_cache import RouteCache
+from ride_offers import build_offers
+from distance_matrix import load_distance_matrix
 import folium
 from streamlit_folium import st_folium
-import random
 
 # ---- API Key for OpenRouteService -----
 # For Streamlit Cloud production, do: ORS_API_KEY = st.secrets["ORS_API_KEY"]
@@ -30,7 +33,7 @@ st.markdown("""
 # ---- Data Load ----
 @st.cache_resource
 def load_data():
-    df = pd.read_csv("car-data.csv")
+    df = load_dataset("car-data.csv")
     return df
 
 df = load_data()
@@ -61,6 +64,7 @@ coords_dict = {
     "Serampore":       (22.7525, 88.3421),
     "Beliaghata":      (22.5631, 88.393)
 }
+road_matrix = load_distance_matrix()
 
 # ---- Fare calculation model (as per your formula) ----
 def calc_fare(distance_km):
@@ -135,7 +139,7 @@ if st.session_state.get('show_results', False):
         org_coords = (coords_dict[pickup][1], coords_dict[pickup][0])
         dest_coords = (coords_dict[drop][1], coords_dict[drop][0])
 
-        client = openrouteservice.Client(key=ORS_API_KEY)
+        client = RouteCache(openrouteservice.Client(key=ORS_API_KEY))
         try:
             coords = [org_coords, dest_coords]
             routes = client.directions(coords, profile='driving-car', format='geojson')
@@ -166,23 +170,22 @@ if st.session_state.get('show_results', False):
 
         except Exception as e:
             st.error("Failed to get realistic route. (API key correct? Cities valid?)")
+            # Precomputed road distance when the route is known, rough guess otherwise
+            distance_km, duration_min = road_matrix.lookup(pickup, drop, default=(12, 30))
+            fair_price = calc_fare(distance_km)
 
     # Cards for available rides (demo, can be enhanced)
     st.markdown(f"### Available Rides")
     sample_names = [("Aarav Singh", 4.7), ("Krishna Verma", 4.5), ("Sneha Das", 4.2), ("Priya Sen", 4.8)]
-    for name, rating in sample_names:
-        slot = random.choice(time_slots)
-        with st.container():
-            st.markdown(
-                f"""<div class='card'>
-                <b>{name}</b> &nbsp; ⭐ <b>{rating}</b><br>
-                🟢 <b>From:</b> {pickup} &nbsp; 🔴 <b>To:</b> {drop}<br>
-                🗓️ <b>Date:</b> {date.strftime('%b %d, %Y')}<br>
-                <span style='font-size:1.2rem; color:#02ac5a;font-weight:700;'>₹{fair_price} per seat</span><br>
-                <span style='font-size:1rem; color:#764ba2;font-weight:500;'>🕒 Available: {slot}</span>
-                </div>""",
-                unsafe_allow_html=True
-            )
+    offers = build_offers(sample_names, fair_price, modifiers=None, time_slots=time_slots)
+    st.markdown("".join(
+        f"""<div class='card'>
+        <b>{offer['name']}</b> &nbsp; ⭐ <b>{offer['rating']}</b><br>
+        🟢 <b>From:</b> {pickup} &nbsp; 🔴 <b>To:</b> {drop}<br>
+        🗓️ <b>Date:</b> {date.strftime('%b %d, %Y')}<br>
+        <span style='font-size:1.2rem; color:#02ac5a;font-weight:700;'>₹{offer['price']} per seat</span><br>
+        <span style='font-size:1rem; color:#764ba2;font-weight:500;'>🕒 Available: {offer['slot']}</span>
+        </div>""" for offer in offers), unsafe_allow_html=True)
 
 else:
     st.info("Select pickup, drop, and date, then click Search Rides.")
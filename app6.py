@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
+from data_store import load_dataset
 import openrouteservice
 from openrouteservice import convert
+from route_cache import RouteCache
+from ride_offers import build_offers
+from distance_matrix import load_distance_matrix
 import folium
 from streamlit_folium import st_folium
-import random
 from datetime import time
 
 # ---- API Key for OpenRouteService -----
@@ -29,7 +32,7 @@ st.markdown("""
 # ---- Data Load ----
 @st.cache_resource
 def load_data():
-    df = pd.read_csv("car-data.csv")
+    df = load_dataset("car-data.csv")
     return df
 
 df = load_data()
@@ -60,6 +63,7 @@ coords_dict = {
     "Serampore":       (22.7525, 88.3421),
     "Beliaghata":      (22.5631, 88.393)
 }
+road_matrix = load_distance_matrix()
 
 # ---- Fare calculation model ----
 def calc_fare(distance_km):
@@ -148,7 +152,7 @@ if st.session_state.get('show_results', False):
         org_coords = (coords_dict[pickup][1], coords_dict[pickup][0])
         dest_coords = (coords_dict[drop][1], coords_dict[drop][0])
 
-        client = openrouteservice.Client(key=ORS_API_KEY)
+        client = RouteCache(openrouteservice.Client(key=ORS_API_KEY))
         try:
             coords = [org_coords, dest_coords]
             routes = client.directions(coords, profile='driving-car', format='geojson')
@@ -176,37 +180,23 @@ if st.session_state.get('show_results', False):
 
         except Exception as e:
             st.error("Failed to get realistic route. (API key correct? Cities valid?)")
-            distance_km = 12
-            duration_min = 30
+            # Precomputed road distance when the route is known, rough guess otherwise
+            distance_km, duration_min = road_matrix.lookup(pickup, drop, default=(12, 30))
             fair_price = calc_fare(distance_km)
 
     # ---- DIFFERENT DRIVER PRICES ----
     st.markdown(f"### Available Rides")
     sample_names = [("Aarav Singh", 4.7), ("Krishna Verma", 4.5), ("Sneha Das", 4.2), ("Priya Sen", 4.8)]
-    price_modifiers = [0.85, 0.95, 1.0, 1.1, 1.15, 1.25, 1.3]
-    used_mods = set()
-    
-    for name, rating in sample_names:
-        while True:
-            mod = random.choice(price_modifiers)
-            if mod not in used_mods or len(used_mods) == len(price_modifiers):
-                used_mods.add(mod)
-                break
-        
-        slot = random.choice(time_slots)
-        driver_price = int(fair_price * mod)
-        
-        with st.container():
-            st.markdown(
-                f"""<div class='card'>
-                <b>{name}</b> &nbsp; ⭐ <b>{rating}</b><br>
-                🟢 <b>From:</b> {pickup} &nbsp; 🔴 <b>To:</b> {drop}<br>
-                🗓️ <b>Date:</b> {date.strftime('%b %d, %Y')} &nbsp; 🕐 <b>Time:</b> {ride_time.strftime('%I:%M %p')}<br>
-                <span style='font-size:1.2rem; color:#02ac5a;font-weight:700;'>₹{driver_price} per seat</span><br>
-                <span style='font-size:1rem; color:#764ba2;font-weight:500;'>🕒 Available: {slot}</span>
-                </div>""",
-                unsafe_allow_html=True
-            )
+    # Each driver prices the route differently (distinct modifiers), random slot
+    offers = build_offers(sample_names, fair_price, time_slots=time_slots)
+    st.markdown("".join(
+        f"""<div class='card'>
+        <b>{offer['name']}</b> &nbsp; ⭐ <b>{offer['rating']}</b><br>
+        🟢 <b>From:</b> {pickup} &nbsp; 🔴 <b>To:</b> {drop}<br>
+        🗓️ <b>Date:</b> {date.strftime('%b %d, %Y')} &nbsp; 🕐 <b>Time:</b> {ride_time.strftime('%I:%M %p')}<br>
+        <span style='font-size:1.2rem; color:#02ac5a;font-weight:700;'>₹{offer['price']} per seat</span><br>
+        <span style='font-size:1rem; color:#764ba2;font-weight:500;'>🕒 Available: {offer['slot']}</span>
+        </div>""" for offer in offers), unsafe_allow_html=True)
 
 else:
     st.info("Select pickup, drop, date, and time, then click Search Rides.")
@@ -1,24 +1,44 @@
 import streamlit as st
 import pandas as pd
-import pickle
 import openrouteservice
 from openrouteservice import convert
+from route_cache import RouteCache
+from distance_matrix import load_distance_matrix
+from road_router import FallbackDirections, load_offline_router
+from spatial_index import LocationIndex
+from ride_offers import build_offers
 import folium
 from streamlit_folium import st_folium
-import random
 from datetime import time, datetime, date as date_module, timedelta
 import numpy as np
+from model_bundle import load_bundle, bundle_hash
+from fare_table import load_fare_table, predict_fare
+from prediction_cache import PredictionCache
 
 # ---- API Key for OpenRouteService -----
 ORS_API_KEY = st.secrets["ORS_API_KEY"]
 
 
-# ---- Load model/encoders/data ----
-with open("carpool_model.pkl", "rb") as f_model:
-    model = pickle.load(f_model)
-with open("encoders.pkl", "rb") as f_enc:
-    encoders = pickle.load(f_enc)
-df = pd.read_csv("car-data.csv")
+# ---- Load model bundle/data ----
+@st.cache_resource
+def load_model():
+    bundle = load_bundle()
+    return {"bundle": bundle, "fare_table": load_fare_table(bundle), "cache": PredictionCache()}
+
+
+def current_model(model, road_matrix):
+    """Bundle and fare table, reloaded when the manifest or the distance matrix changed on disk."""
+    if bundle_hash() != model["bundle"].content_hash:
+        model["bundle"] = load_bundle()
+    distances = road_matrix.pairs() if road_matrix.locations else None
+    if not model["fare_table"].is_current(model["bundle"], distances):
+        model["fare_table"] = load_fare_table(model["bundle"], distances=distances)
+    return model["bundle"], model["fare_table"]
+
+
+model = load_model()
+bundle, fare_cache = model["bundle"], model["cache"]
+encoders = bundle.encoders
 
 # ---- Coordinates ----
 coords_dict = { "Ballygunge":      (22.5226, 88.3715),
@@ -47,10 +67,13 @@ coords_dict = { "Ballygunge":      (22.5226, 88.3715),
     "Beliaghata":      (22.5631, 88.393)
 
  }  # Use your full coords from app7.py
+road_matrix = load_distance_matrix()
+offline_router = load_offline_router()   # None until road_graph.npz is built
 
 # ---- Only allow cities known to encoder ----
 allowed_pickups = sorted(list(encoders['pickup location'].classes_))
 allowed_drops = sorted(list(encoders['drop location'].classes_))
+pickup_index = LocationIndex({name: coords_dict[name] for name in allowed_pickups if name in coords_dict})
 
 # ---- Styles/Title ----
 st.set_page_config(page_title="RideShare", page_icon="🚗", layout="wide", initial_sidebar_state="collapsed")
@@ -80,6 +103,18 @@ st.markdown("""
 col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 1])
 with col1:
     pickup = st.selectbox("From (City)", allowed_pickups)
+    pin = st.text_input("…or GPS pin (lat, lon)", placeholder="22.5726, 88.3639")
+    if pin:
+        try:
+            pin_lat, pin_lon = (float(v) for v in pin.split(","))
+            snapped = pickup_index.snap(pin_lat, pin_lon)
+        except ValueError:
+            snapped = None
+        if snapped:
+            pickup = snapped
+            st.caption(f"📍 Nearest pickup point: {snapped}")
+        else:
+            st.caption("No pickup point near that pin.")
 with col2:
     drop = st.selectbox("To (City)", allowed_drops)
 with col3:
@@ -111,14 +146,22 @@ if st.session_state.get('show_results', False):
     else:
         org_coords = (coords_dict[pickup][1], coords_dict[pickup][0])
         dest_coords = (coords_dict[drop][1], coords_dict[drop][0])
-        client = openrouteservice.Client(key=ORS_API_KEY)
+        # ORS (through the route cache), the local road graph when ORS is unreachable
+        client = FallbackDirections(RouteCache(openrouteservice.Client(key=ORS_API_KEY)), offline_router)
+        bundle, fare_table = current_model(model, road_matrix)
         try:
             coords = [org_coords, dest_coords]
             routes = client.directions(coords, profile='driving-car', format='geojson')
             geom = routes['features'][0]['geometry']
             distance_km = routes['features'][0]['properties']['segments'][0]['distance'] / 1000
             duration_min = routes['features'][0]['properties']['segments'][0]['duration'] / 60
+        except Exception as e:
+            #st.error("Failed to get realistic route. (API key correct? Cities valid?)")
+            # Precomputed road distance when the route is known, rough guess otherwise
+            geom = None
+            distance_km, duration_min = road_matrix.lookup(pickup, drop, default=(12, 30))
 
+        if geom is not None:
             map_center = [(coords_dict[pickup][0] + coords_dict[drop][0])/2, (coords_dict[pickup][1] + coords_dict[drop][1])/2]
             m = folium.Map(location=map_center, zoom_start=12, tiles="CartoDB Positron")
             folium.Marker(coords_dict[pickup], popup="Start", icon=folium.Icon(color="green")).add_to(m)
@@ -132,33 +175,11 @@ if st.session_state.get('show_results', False):
             <span style="color:#f54b4b;font-size:19px;">🔴 {drop}</span> <span style="font-size:15px; color:#999;">({coords_dict[drop][0]}, {coords_dict[drop][1]})</span><br>
             <span style="color:#0066ff;font-size:18px;">🔵 Blue route line shows the path</span></div>""", unsafe_allow_html=True)
 
-            st.markdown(f"**Distance:** `{distance_km:.2f} km`   |   **Estimated Time:** `{duration_min:.0f} min`   |   **Date:** `{date.strftime('%b %d, %Y')}`   |   **Time:** `{ride_time.strftime('%I:%M %p')}`")
-
-            # --------- ML Model-based fare prediction ---------
-            # Use median for other features, encode pickup/drop
-            median_vals = df.median(numeric_only=True)
-            input_dict = {
-                "pickup location": encoders['pickup location'].transform([pickup])[0],
-                "drop location": encoders['drop location'].transform([drop])[0],
-                "travelling distance(km)": distance_km,
-                "fuel type": median_vals['fuel type'],
-                "fuel price": median_vals['fuel price'],
-                "seats": median_vals['seats'],
-                "car_age": median_vals['car_age'],
-                "owner": median_vals['owner'],
-                "engine_cc": median_vals['engine_cc'],
-                "max_power_bhp": median_vals['max_power_bhp'],
-                "mileage": median_vals['mileage'],
-            }
-            input_order = [col for col in df.drop('price', axis=1).columns]
-            input_values = np.array([input_dict[col] for col in input_order]).reshape(1, -1)
-            fair_price = int(model.predict(input_values)[0])
+            st.markdown(f"**Distance:** `{distance_km:.2f} km`   |   **Estimated Time:** `{duration_min:.0f} min`   |   **Date:** `{date.strftime('%b %d, %Y')}`   |   **Time:** `{ride_time.strftime('%I:%M %p')}`")
 
-        except Exception as e:
-            #st.error("Failed to get realistic route. (API key correct? Cities valid?)")
-            distance_km = 12
-            duration_min = 30
-            fair_price = 300
+        # --------- ML Model-based fare prediction ---------
+        # Precomputed fare for known routes, cached/live model otherwise
+        fair_price = int(predict_fare(bundle, fare_table, pickup, drop, distance_km, cache=fare_cache))
 
         # ---- Time slots ----
         available_time_slots = [
@@ -169,24 +190,14 @@ if st.session_state.get('show_results', False):
         # ---- Sample drivers and rides ----
         st.markdown(f"### Available Rides")
         sample_names = [("Aarav Singh", 4.7), ("Krishna Verma", 4.5), ("Sneha Das", 4.2), ("Priya Sen", 4.8)]
-        price_modifiers = [0.85, 0.95, 1.0, 1.1, 1.15, 1.25, 1.3]
-        used_mods = set()
-        for idx, (name, rating) in enumerate(sample_names):
-            while True:
-                mod = random.choice(price_modifiers)
-                if mod not in used_mods or len(used_mods) == len(price_modifiers):
-                    used_mods.add(mod)
-                    break
-            slot = available_time_slots[idx % len(available_time_slots)]
-            driver_price = int(fair_price * mod)
-            st.markdown(
-                f"""<div class='card'>
-                <b>{name}</b> &nbsp; ⭐ <b>{rating}</b><br>
-                🟢 <b>From:</b> {pickup} &nbsp; 🔴 <b>To:</b> {drop}<br>
-                🗓️ <b>Date:</b> {date.strftime('%b %d, %Y')} &nbsp; 🕐 <b>Time:</b> {slot}<br>
-                <span style='font-size:1.2rem; color:#02ac5a;font-weight:700;'>₹{driver_price} per seat</span>
-                </div>""",
-                unsafe_allow_html=True
-            )
+        # Distinct price modifier per driver; time slots assigned in turn
+        offers = build_offers(sample_names, fair_price, time_slots=available_time_slots, cycle_slots=True)
+        st.markdown("".join(
+            f"""<div class='card'>
+            <b>{offer['name']}</b> &nbsp; ⭐ <b>{offer['rating']}</b><br>
+            🟢 <b>From:</b> {pickup} &nbsp; 🔴 <b>To:</b> {drop}<br>
+            🗓️ <b>Date:</b> {date.strftime('%b %d, %Y')} &nbsp; 🕐 <b>Time:</b> {offer['slot']}<br>
+            <span style='font-size:1.2rem; color:#02ac5a;font-weight:700;'>₹{offer['price']} per seat</span>
+            </div>""" for offer in offers), unsafe_allow_html=True)
 else:
     st.info("Select pickup, drop, date, and time, then click Search Rides.")
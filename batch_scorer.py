@@ -0,0 +1,136 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from fare_predictor import predict_fares
+from model_bundle import load_bundle, BUNDLE_DIR
+
+# ============================================================================
+# STREAMING JSONL BATCH SCORER
+# ============================================================================
+# Usage:
+#   python batch_scorer.py rides.jsonl priced.jsonl --chunk-size 20000 --workers 4
+#
+# Each input line is one ride request object with the same fields
+# predict_fares() accepts ("pickup location", "drop location",
+# "travelling distance(km)", "fuel type", "seats", ...). Every output line is
+# the input object plus "predicted_fare" (null for unseen categories or
+# unparsable lines, which also get an "error" field). Blank lines are skipped.
+#
+# The file is read in chunks of --chunk-size lines. At most 2 chunks per
+# worker are in flight at any time and results are written in input order as
+# soon as the oldest chunk finishes, so memory stays constant no matter how
+# large the file is. Each worker process maps the model bundle once.
+
+_bundle = None
+
+
+def _init_worker(bundle_path):
+    global _bundle
+    _bundle = load_bundle(bundle_path)
+
+
+def _score_chunk(lines):
+    """Price one chunk of raw JSONL lines; returns (output_text, n_rows, seconds)."""
+    start = time.perf_counter()
+    records, errors = [], {}
+    for i, line in enumerate(lines):
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("not a JSON object")
+        except ValueError as e:
+            record, errors[i] = {}, f"invalid request: {e}"
+        records.append(record)
+
+    # Explicit index so a chunk of only-invalid lines still has one row per line
+    requests = pd.DataFrame(records, index=pd.RangeIndex(len(records)))
+    fares = predict_fares(requests, _bundle).to_numpy()
+
+    out = []
+    for i, (record, fare) in enumerate(zip(records, fares)):
+        if i in errors:
+            record = {"error": errors[i], "predicted_fare": None}
+        else:
+            record["predicted_fare"] = None if math.isnan(fare) else round(float(fare), 2)
+        out.append(json.dumps(record))
+    out.append("")
+    return "\n".join(out), len(lines), time.perf_counter() - start
+
+
+def _read_chunks(f, chunk_size):
+    lines = (line for line in f if line.strip())
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_file(input_path, output_path, chunk_size=10_000, workers=None,
+               bundle_path=BUNDLE_DIR, report_every=1.0, log=sys.stderr):
+    """Stream input_path through a process pool into output_path; returns a summary dict."""
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    chunk_latencies = deque(maxlen=1000)   # recent chunks only, for bounded memory
+    busy_seconds = 0.0
+    n_rows = n_chunks = 0
+    start = last_report = time.perf_counter()
+
+    def report(final=False):
+        elapsed = time.perf_counter() - start
+        p50, p99 = (np.percentile(chunk_latencies, [50, 99]) * 1000) if chunk_latencies else (0, 0)
+        per_worker = n_rows / busy_seconds if busy_seconds else 0.0
+        print(f"{'done' if final else 'progress'}: {n_rows:,} rows  {n_chunks} chunks  "
+              f"{n_rows / max(elapsed, 1e-9):,.0f} rows/s  {per_worker:,.0f} rows/s/worker  "
+              f"chunk p50 {p50:.0f} ms  p99 {p99:.0f} ms", file=log)
+
+    with open(input_path) as f_in, open(output_path, "w") as f_out, \
+            Pool(workers, initializer=_init_worker, initargs=(bundle_path,)) as pool:
+        pending = deque()
+
+        def drain_oldest():
+            nonlocal n_rows, n_chunks, busy_seconds, last_report
+            text, rows, seconds = pending.popleft().get()
+            f_out.write(text)
+            n_rows += rows
+            n_chunks += 1
+            busy_seconds += seconds
+            chunk_latencies.append(seconds)
+            if report_every is not None and time.perf_counter() - last_report >= report_every:
+                report()
+                last_report = time.perf_counter()
+
+        for chunk in _read_chunks(f_in, chunk_size):
+            if len(pending) >= max_in_flight:
+                drain_oldest()
+            pending.append(pool.apply_async(_score_chunk, (chunk,)))
+        while pending:
+            drain_oldest()
+
+    if report_every is not None:
+        report(final=True)
+    elapsed = time.perf_counter() - start
+    return {"rows": n_rows, "chunks": n_chunks, "seconds": elapsed, "workers": workers}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Price a JSONL file of ride requests.")
+    parser.add_argument("input", help="JSONL file, one ride request per line")
+    parser.add_argument("output", help="JSONL file to write priced requests to")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="lines per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPUs)")
+    parser.add_argument("--bundle", default=BUNDLE_DIR, help="model bundle directory")
+    args = parser.parse_args()
+
+    summary = score_file(args.input, args.output, args.chunk_size, args.workers, args.bundle)
+    print(f"✅ Priced {summary['rows']:,} requests in {summary['seconds']:.1f}s -> {args.output}")
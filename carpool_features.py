@@ -0,0 +1,41 @@
+import pandas as pd
+
+# ============================================================================
+# SHARED FEATURE ENGINEERING
+# ============================================================================
+# Used by the training script and by every serving path, so a ride request is
+# turned into model inputs exactly the way the training rows were.
+
+REFERENCE_YEAR = 2025
+
+CATEGORICAL_COLUMNS = ['fuel type', 'pickup location', 'drop location', 'owner']
+
+NUMERIC_COLUMNS = [
+    'engine_cc', 'max_power_bhp', 'mileage', 'car_age',
+    'seats', 'fuel price', 'travelling distance(km)'
+]
+
+# Irrelevant/redundant raw columns removed before training
+DROP_COLUMNS = [
+    'Car_Name', 'engine', 'max_power', 'torque', 'fuel_unitPrice',
+    'mileage(kmph)', 'total_litres', 'car_number', 'owner_name'
+]
+
+
+def add_engineered_features(df):
+    """Derive numeric car features from the raw CSV columns (in place).
+
+    Each feature is only derived when its source column is present and the
+    feature itself is not, so already-engineered frames pass through.
+    """
+    if 'engine_cc' not in df.columns and 'engine' in df.columns:
+        df['engine_cc'] = df['engine'].astype(str).str.extract(r'(\d+)')[0].astype(float)
+    if 'max_power_bhp' not in df.columns and 'max_power' in df.columns:
+        df['max_power_bhp'] = df['max_power'].astype(str).str.extract(r'(\d+\.?\d*)')[0].astype(float)
+    if 'mileage' not in df.columns and 'mileage(kmph)' in df.columns:
+        df['mileage'] = pd.to_numeric(df['mileage(kmph)'], errors='coerce')
+    if 'car_age' not in df.columns and 'Year of buying' in df.columns:
+        df['car_age'] = REFERENCE_YEAR - df['Year of buying']
+    if 'Year of buying' not in df.columns and 'car_age' in df.columns:
+        df['Year of buying'] = REFERENCE_YEAR - df['car_age']
+    return df
@@ -1,55 +1,30 @@
+import argparse
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
-from sklearn.preprocessing import LabelEncoder
 import matplotlib.pyplot as plt
 import pickle
-
-# ----- DATA LOADING -----
-df = pd.read_csv("car-data-all-locations.csv")  # <-- Use your all-locations CSV
-
-# ----- FEATURE ENGINEERING -----
-df['engine_cc'] = df['engine'].str.extract(r'(\d+)').astype(float)
-df['max_power_bhp'] = df['max_power'].str.extract(r'(\d+\.?\d*)').astype(float)
-df['mileage'] = pd.to_numeric(df['mileage(kmph)'], errors='coerce')
-df['car_age'] = 2025 - df['Year of buying']
-
-# Drop irrelevant/redundant columns with safety check
-to_drop = [
-    'Car_Name', 'engine', 'max_power', 'torque', 'fuel_unitPrice',
-    'mileage(kmph)', 'total_litres', 'car_number', 'owner_name'
-]
-df = df.drop([col for col in to_drop if col in df.columns], axis=1)
-
-# Fill missing categorical values
-for col in ['fuel type', 'pickup location', 'drop location', 'owner']:
-    if col in df.columns:
-        df[col] = df[col].fillna("Unknown")
-
-# Fill missing numeric values with median
-num_cols = [
-    'engine_cc', 'max_power_bhp', 'mileage', 'car_age',
-    'seats', 'fuel price', 'travelling distance(km)'
-]
-for col in num_cols:
-    if col in df.columns:
-        df[col] = df[col].fillna(df[col].median())
-
-# ----- CATEGORICAL ENCODING -----
-encoders = {}
-cat_cols = ['fuel type', 'pickup location', 'drop location', 'owner']
-for col in cat_cols:
-    if col in df.columns:
-        enc = LabelEncoder()
-        df[col] = enc.fit_transform(df[col])
-        encoders[col] = enc
-
-# ----- SELECT FEATURES & TARGET -----
-assert 'price' in df.columns, "Error: 'price' column is missing in data!"
-X = df.drop('price', axis=1)
-y = df['price']
+import sklearn
+from feature_cache import load_training_features
+from fast_forest import FlatForest
+from model_bundle import save_bundle, load_bundle, BUNDLE_DIR
+from fare_table import load_fare_table, FARE_TABLE_PATH
+from minimal_forest import grow_minimal_forest
+from hyperparam_search import best_params, RESULTS_PATH
+
+parser = argparse.ArgumentParser(description="Train the fare model and save the serving bundle.")
+parser.add_argument("--minimal-forest", type=float, nargs="?", const=0.01, default=None, metavar="TOL",
+                    help="grow up to n_estimators trees and keep the fewest within TOL of the best OOB error")
+parser.add_argument("--tuned", nargs="?", const=RESULTS_PATH, default=None, metavar="RESULTS",
+                    help=f"train with the best settings of a hyperparam_search.py run (default {RESULTS_PATH})")
+args = parser.parse_args()
+
+# ----- DATA LOADING & FEATURES -----
+# Engineered, imputed and encoded once per dataset/code version (feature_cache/)
+# For datasets larger than RAM use streaming_train.py (same bundle format)
+X, y, encoders = load_training_features("car-data-all-locations.csv")  # <-- Use your all-locations CSV
 
 # ----- TRAIN/TEST SPLIT -----
 X_train, X_test, y_train, y_test = train_test_split(
@@ -57,8 +32,25 @@ X_train, X_test, y_train, y_test = train_test_split(
 )
 
 # ----- MODEL TRAINING -----
-model = RandomForestRegressor(n_estimators=200, max_depth=14, random_state=42)
-model.fit(X_train, y_train)
+# Fixed settings unless --tuned picks the winner of a hyperparam_search.py run
+forest_params = {"n_estimators": 200, "max_depth": 14}
+if args.tuned:
+    tuned = best_params(args.tuned, X, y)
+    if tuned is None:
+        parser.error(f"no finished search on this dataset in {args.tuned}; run hyperparam_search.py first")
+    forest_params = tuned
+    print(f"Tuned settings from {args.tuned}: {tuned}")
+
+if args.minimal_forest is None:
+    model = RandomForestRegressor(**forest_params, random_state=42)
+    model.fit(X_train, y_train)
+else:
+    max_trees = forest_params["n_estimators"]
+    model, _, oob_curve = grow_minimal_forest(
+        X_train, y_train, max_trees=max_trees, tolerance=args.minimal_forest, random_state=42,
+        **{k: v for k, v in forest_params.items() if k != "n_estimators"})
+    print(f"Minimal forest: {model.n_estimators} of {max_trees} trees "
+          f"(OOB R2 {model.oob_score_:.3f}, best {oob_curve['oob_r2'].max():.3f})")
 
 # ----- MODEL EVALUATION -----
 def reg_results(y_true, y_pred, split="Train"):
@@ -69,8 +61,8 @@ def reg_results(y_true, y_pred, split="Train"):
     return r2, mae, rmse
 
 print("\nResults:")
-reg_results(y_train, model.predict(X_train), split="Train")
-reg_results(y_test, model.predict(X_test), split="Test")
+train_r2, train_mae, train_rmse = reg_results(y_train, model.predict(X_train), split="Train")
+test_r2, test_mae, test_rmse = reg_results(y_test, model.predict(X_test), split="Test")
 
 # ----- FEATURE IMPORTANCE PLOT -----
 plt.figure(figsize=(10, 5))
@@ -80,17 +72,38 @@ plt.title("Feature Importance")
 plt.tight_layout()
 plt.show()
 
-# ----- SAVE MODEL & ENCODERS -----
+# ----- SAVE MODEL BUNDLE -----
+# Serving reads the bundle (manifest + memory-mapped tree arrays); the
+# pickled estimator is kept only for offline tools that need sklearn itself.
 with open("carpool_model.pkl", "wb") as f_model:
     pickle.dump(model, f_model)
-with open("encoders.pkl", "wb") as f_enc:
-    pickle.dump(encoders, f_enc)
-print("✅ Model and encoders saved to carpool_model.pkl and encoders.pkl.")
 
-# Save column order to ensure app prediction input consistency
-with open("model_columns.pkl", "wb") as f_cols:
-    pickle.dump(list(X.columns), f_cols)
-print("✅ Model columns saved for prediction input consistency.")
+feature_defaults = {col: float(X[col].median()) for col in X.columns}
+for col, enc in encoders.items():
+    feature_defaults[col] = str(enc.classes_[int(X[col].mode()[0])])
+
+manifest = save_bundle(
+    FlatForest.from_sklearn(model),
+    columns=list(X.columns),
+    vocabularies={col: list(enc.classes_) for col, enc in encoders.items()},
+    feature_defaults=feature_defaults,
+    metadata={
+        "source": "car-data-all-locations.csv",
+        "n_rows": int(len(X)),
+        "estimator": type(model).__name__,
+        "params": model.get_params(),
+        "sklearn_version": sklearn.__version__,
+        "train": {"r2": train_r2, "mae": train_mae, "rmse": train_rmse},
+        "test": {"r2": test_r2, "mae": test_mae, "rmse": test_rmse},
+    },
+    path=BUNDLE_DIR,
+)
+print(f"✅ Model bundle saved to {BUNDLE_DIR}/ (hash {manifest['content_hash'][:12]}).")
+
+# ----- FARE LOOKUP TABLE -----
+# Rebuilt here so the first app start after training does not pay for it.
+load_fare_table(load_bundle(BUNDLE_DIR))
+print(f"✅ Fare lookup table refreshed in {FARE_TABLE_PATH}.")
 
 
 '''
@@ -0,0 +1,148 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from carpool_features import add_engineered_features
+
+# ============================================================================
+# COLUMNAR RIDE DATASET STORE
+# ============================================================================
+# The apps and the training script used to re-parse the CSVs (and re-run the
+# engine/max_power regexes) on every start. load_dataset() reads a Parquet
+# copy next to the CSV instead:
+#
+#   car-data.csv  ->  car-data.parquet
+#
+# The Parquet file already holds the engineered numeric columns (engine_cc,
+# max_power_bhp, mileage, car_age), stores low-cardinality text columns
+# (locations, fuel type, owner, ...) as dictionary-encoded categoricals and
+# integer columns in the smallest dtype that holds them. Float columns are
+# only narrowed when that is lossless, so training sees the same values as
+# from the CSV.
+#
+# The CSV stays the source of truth: the Parquet file records the CSV's size
+# and mtime and is rebuilt automatically when they change. Without pyarrow
+# load_dataset() falls back to parsing the CSV.
+#
+#   python data_store.py convert car-data.csv car-data-all-locations.csv
+#   python data_store.py bench car-data-all-locations.csv
+
+SOURCE_KEY = b"carpool.source"
+CATEGORY_MAX_RATIO = 0.5   # text columns with fewer unique values than this share become categorical
+
+
+def parquet_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def _source_stamp(csv_path):
+    st = os.stat(csv_path)
+    return f"{st.st_size}:{st.st_mtime_ns}".encode()
+
+
+def compact_dtypes(df):
+    """Categoricals for repetitive text, smallest lossless numeric dtypes (in place)."""
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            narrow = series.astype(np.float32)
+            if np.array_equal(narrow.to_numpy(np.float64), series.to_numpy(np.float64), equal_nan=True):
+                df[col] = narrow
+        elif series.dtype == object or pd.api.types.is_string_dtype(series):
+            if series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * max(len(series), 1):
+                df[col] = series.astype("category")
+    return df
+
+
+def convert_csv(csv_path, out_path=None):
+    """Parse, engineer and compact csv_path into a Parquet file; returns its path."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    out_path = out_path or parquet_path(csv_path)
+    stamp = _source_stamp(csv_path)
+    df = compact_dtypes(add_engineered_features(pd.read_csv(csv_path)))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SOURCE_KEY: stamp})
+    tmp_path = out_path + ".tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def is_stale(csv_path, out_path=None):
+    """True if the Parquet copy is missing or was built from another version of the CSV."""
+    import pyarrow.parquet as pq
+
+    out_path = out_path or parquet_path(csv_path)
+    if not os.path.exists(out_path):
+        return True
+    if not os.path.exists(csv_path):
+        return False   # Parquet shipped on its own
+    metadata = pq.read_schema(out_path).metadata or {}
+    return metadata.get(SOURCE_KEY) != _source_stamp(csv_path)
+
+
+def load_dataset(csv_path="car-data.csv", columns=None, memory_map=True):
+    """The dataset as a DataFrame with engineered features, from Parquet when possible.
+
+    columns limits what is read from disk; memory_map maps the file instead
+    of copying it through read() calls.
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        df = add_engineered_features(pd.read_csv(csv_path))
+        return df if columns is None else df[columns]
+
+    out_path = parquet_path(csv_path)
+    if is_stale(csv_path, out_path):
+        convert_csv(csv_path, out_path)
+    return pq.read_table(out_path, columns=columns, memory_map=memory_map).to_pandas()
+
+
+def benchmark(csv_path, columns=None, repeats=5):
+    """CSV parse + feature engineering vs Parquet load: seconds and resident bytes."""
+    def best_of(fn):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            df = fn()
+            times.append(time.perf_counter() - start)
+        return min(times), int(df.memory_usage(deep=True).sum())
+
+    def from_csv():
+        df = add_engineered_features(pd.read_csv(csv_path))
+        return df if columns is None else df[columns]
+
+    load_dataset(csv_path)   # make sure the Parquet copy exists
+    csv_s, csv_bytes = best_of(from_csv)
+    pq_s, pq_bytes = best_of(lambda: load_dataset(csv_path, columns))
+    return {"csv_s": csv_s, "csv_bytes": csv_bytes, "parquet_s": pq_s, "parquet_bytes": pq_bytes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parquet copies of the ride datasets.")
+    parser.add_argument("command", choices=["convert", "bench"])
+    parser.add_argument("csv", nargs="+")
+    parser.add_argument("--columns", nargs="*", default=None, help="column projection for bench")
+    args = parser.parse_args()
+
+    for csv_path in args.csv:
+        if args.command == "convert":
+            out = convert_csv(csv_path)
+            print(f"✅ {csv_path} -> {out} ({os.path.getsize(csv_path) / 1e3:.0f} KB -> "
+                  f"{os.path.getsize(out) / 1e3:.0f} KB)")
+        else:
+            r = benchmark(csv_path, args.columns)
+            print(f"{csv_path}: CSV {r['csv_s'] * 1000:.1f} ms / {r['csv_bytes'] / 1e6:.2f} MB   "
+                  f"Parquet {r['parquet_s'] * 1000:.1f} ms / {r['parquet_bytes'] / 1e6:.2f} MB   "
+                  f"({r['csv_s'] / r['parquet_s']:.1f}x faster, "
+                  f"{r['csv_bytes'] / r['parquet_bytes']:.1f}x smaller)")
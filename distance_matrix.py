@@ -0,0 +1,120 @@
+import argparse
+import os
+
+import numpy as np
+
+from locations import coords_dict
+
+# ============================================================================
+# ALL-PAIRS ROAD DISTANCE / DURATION MATRIX
+# ============================================================================
+# The dataset generator used straight-line haversine distances while the apps
+# price on ORS road distances. This module computes the road distance and
+# duration between every pair of registry locations once and stores them as
+# two float32 N x N arrays (about 2 KB each for 24 locations):
+#
+#   distance_matrix.npz    locations[N], distance_km[N, N], duration_min[N, N]
+#
+# Generator, fare table and apps look routes up by location id in O(1).
+#
+# The routing backend is pluggable: anything with an ORS-style
+# directions(coords, profile=..., format="geojson") method works (an
+# openrouteservice.Client, a RouteCache, the offline StubDirectionsClient),
+# and a client that also has distance_matrix() is asked for all pairs in a
+# single request.
+
+DISTANCE_MATRIX_PATH = "distance_matrix.npz"
+
+
+class DistanceMatrix:
+    """Road distance (km) and duration (min) between registry locations."""
+
+    def __init__(self, locations, distance_km, duration_min):
+        self.locations = list(locations)
+        self.distance_km = np.asarray(distance_km, dtype=np.float32)
+        self.duration_min = np.asarray(duration_min, dtype=np.float32)
+        self.index = {name: i for i, name in enumerate(self.locations)}
+
+    def __contains__(self, pair):
+        pickup, drop = pair
+        return pickup in self.index and drop in self.index
+
+    def lookup(self, pickup, drop, default=(None, None)):
+        """(distance_km, duration_min) for a pair, or default if unknown."""
+        i = self.index.get(pickup)
+        j = self.index.get(drop)
+        if i is None or j is None:
+            return default
+        return float(self.distance_km[i, j]), float(self.duration_min[i, j])
+
+    def pairs(self):
+        """{(pickup, drop): km} for every ordered pair of distinct locations."""
+        return {(a, b): float(self.distance_km[i, j])
+                for i, a in enumerate(self.locations)
+                for j, b in enumerate(self.locations) if i != j}
+
+    def save(self, path=DISTANCE_MATRIX_PATH):
+        np.savez(path, locations=np.array(self.locations), distance_km=self.distance_km,
+                 duration_min=self.duration_min)
+
+    @classmethod
+    def load(cls, path=DISTANCE_MATRIX_PATH):
+        with np.load(path) as data:
+            return cls([str(s) for s in data["locations"]], data["distance_km"], data["duration_min"])
+
+
+def load_distance_matrix(path=DISTANCE_MATRIX_PATH):
+    """The saved matrix, or an empty one (every lookup misses) if not built yet."""
+    if not os.path.exists(path):
+        return DistanceMatrix([], np.zeros((0, 0)), np.zeros((0, 0)))
+    return DistanceMatrix.load(path)
+
+
+def build_distance_matrix(client, coords=None, profile="driving-car"):
+    """Query the routing backend for every ordered pair of locations."""
+    coords = coords or coords_dict
+    names = list(coords)
+    points = [(lon, lat) for lat, lon in (coords[name] for name in names)]
+    n = len(names)
+
+    if hasattr(client, "distance_matrix"):
+        reply = client.distance_matrix(points, profile=profile, metrics=["distance", "duration"])
+        distance_km = np.asarray(reply["distances"], dtype=np.float64) / 1000
+        duration_min = np.asarray(reply["durations"], dtype=np.float64) / 60
+    else:
+        distance_km = np.zeros((n, n))
+        duration_min = np.zeros((n, n))
+        for i in range(n):
+            for j in range(n):
+                if i == j:
+                    continue
+                routes = client.directions([points[i], points[j]], profile=profile, format="geojson")
+                segment = routes["features"][0]["properties"]["segments"][0]
+                distance_km[i, j] = segment["distance"] / 1000
+                duration_min[i, j] = segment["duration"] / 60
+
+    return DistanceMatrix(names, distance_km, duration_min)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the all-pairs road distance matrix.")
+    parser.add_argument("--path", default=DISTANCE_MATRIX_PATH)
+    parser.add_argument("--stub", action="store_true",
+                        help="offline straight-line backend instead of OpenRouteService")
+    parser.add_argument("--matrix-api", action="store_true",
+                        help="one ORS matrix request instead of per-pair (cached) directions")
+    args = parser.parse_args()
+
+    from route_cache import RouteCache, StubDirectionsClient
+
+    if args.stub:
+        client = StubDirectionsClient()
+    else:
+        import openrouteservice
+        client = openrouteservice.Client(key=os.environ["ORS_API_KEY"])
+        if not args.matrix_api:
+            client = RouteCache(client)
+
+    matrix = build_distance_matrix(client)
+    matrix.save(args.path)
+    print(f"✅ {len(matrix.locations)}x{len(matrix.locations)} road distance matrix saved to {args.path}")
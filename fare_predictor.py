@@ -0,0 +1,75 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from carpool_features import add_engineered_features
+from category_encoder import UNKNOWN
+from model_bundle import load_bundle
+
+# ============================================================================
+# BATCH FARE PREDICTION
+# ============================================================================
+# predict_fares() prices a whole DataFrame of ride requests with column
+# operations only: engineered features are derived per column, categories
+# are encoded through the bundle's hash-index encoders, missing columns and
+# values take the training defaults, and the forest runs once for all rows.
+#
+# Accepted columns are the training CSV's raw columns (location names,
+# 'travelling distance(km)', 'fuel type', 'seats', 'engine', 'max_power',
+# 'Year of buying', ...) or the already-engineered ones ('engine_cc',
+# 'car_age', ...). Anything the model needs but the frame lacks is filled
+# from bundle.feature_defaults.
+
+
+def build_feature_matrix(requests, bundle):
+    """Return (X, unknown_mask): the float feature matrix in bundle.columns order
+    and a boolean mask of rows that contain a category unseen in training."""
+    df = add_engineered_features(requests.copy())
+    n_rows = len(df)
+    X = np.empty((n_rows, len(bundle.columns)), dtype=np.float64)
+    unknown = np.zeros(n_rows, dtype=bool)
+
+    for j, col in enumerate(bundle.columns):
+        default = bundle.feature_defaults[col]
+        if col not in df.columns:
+            X[:, j] = bundle.encoders[col].transform_one(default) if col in bundle.encoders else default
+        elif col in bundle.encoders:
+            codes = bundle.encoders[col].transform(df[col].fillna(default).astype(str))
+            unknown |= codes == UNKNOWN
+            X[:, j] = codes
+        else:
+            X[:, j] = pd.to_numeric(df[col], errors="coerce").fillna(default).to_numpy(dtype=np.float64)
+    return X, unknown
+
+
+def predict_fares(requests, bundle=None, unknown="nan"):
+    """Predict the fare of every row of a requests DataFrame in one model call.
+
+    unknown="nan" returns NaN for rows with an unseen location/fuel/owner,
+    unknown="encode" prices them with the reserved unknown code instead.
+    Returns a float Series aligned with requests.index.
+    """
+    if unknown not in ("nan", "encode"):
+        raise ValueError(f"unknown must be 'nan' or 'encode', got {unknown!r}")
+    bundle = bundle or load_bundle()
+    X, unknown_rows = build_feature_matrix(requests, bundle)
+    fares = bundle.predict(X) if len(X) else np.empty(0)
+    if unknown == "nan":
+        fares[unknown_rows] = np.nan
+    return pd.Series(fares, index=requests.index, name="predicted_fare")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python fare_predictor.py <requests.csv> <priced.csv>")
+        sys.exit(1)
+
+    rides = pd.read_csv(sys.argv[1])
+    start = time.perf_counter()
+    rides["predicted_fare"] = predict_fares(rides)
+    elapsed = time.perf_counter() - start
+    rides.to_csv(sys.argv[2], index=False)
+    print(f"✅ Priced {len(rides)} rides in {elapsed:.2f}s "
+          f"({len(rides) / max(elapsed, 1e-9):,.0f} rows/s) -> {sys.argv[2]}")
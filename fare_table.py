@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from distance_matrix import load_distance_matrix
+from model_bundle import load_bundle
+
+# ============================================================================
+# ALL-PAIRS FARE LOOKUP TABLE
+# ============================================================================
+# The apps only offer a couple of dozen locations, so every fare the default
+# search can ask for fits in a small dense cube:
+#
+#   fares[pickup, drop, fuel type, seats]      (float64, ~75 KB)
+#
+# Each cell is the model's prediction for that route at the route's distance
+# and the training-default vehicle profile (car age, engine, power, owner,
+# ...). Serving answers with one index lookup and only runs the forest when
+# the request is off the grid (unknown location, other distance, other car).
+#
+# The table file stores the content hash of the bundle it was built from and
+# a hash of the route distances (matrix_hash); load_fare_table() rebuilds it
+# whenever either changes, so a retrained model or a rebuilt
+# distance_matrix.npz never leaves stale fares or distances behind.
+
+FARE_TABLE_PATH = "fare_table.npz"
+SEAT_OPTIONS = (4, 5, 6, 7)
+DISTANCE_TOLERANCE_KM = 0.05
+
+
+def route_distances(csv_path="car-data-all-locations.csv"):
+    """Road distance per (pickup, drop) pair from the distance matrix, or the
+    median travelling distance per pair in the training data if none is built."""
+    road_matrix = load_distance_matrix()
+    if road_matrix.locations:
+        return road_matrix.pairs()
+    df = pd.read_csv(csv_path, usecols=["pickup location", "drop location", "travelling distance(km)"])
+    med = df.groupby(["pickup location", "drop location"])["travelling distance(km)"].median()
+    return {pair: float(km) for pair, km in med.items()}
+
+
+def matrix_hash(distances):
+    """Short hash of a {(pickup, drop): km} mapping."""
+    items = sorted([pickup, drop, round(float(km), 6)] for (pickup, drop), km in distances.items())
+    return hashlib.sha256(json.dumps(items).encode()).hexdigest()[:16]
+
+
+class FareTable:
+    """Dense fare cube over locations x locations x fuel types x seat counts."""
+
+    def __init__(self, fares, distance_km, locations, fuel_types, seat_values, bundle_hash,
+                 default_fuel, default_seats, matrix_hash=None):
+        self.fares = fares
+        self.distance_km = distance_km
+        self.locations = list(locations)
+        self.fuel_types = list(fuel_types)
+        self.seat_values = [float(s) for s in seat_values]
+        self.bundle_hash = bundle_hash
+        self.matrix_hash = matrix_hash
+        self.default_fuel = default_fuel
+        self.default_seats = float(default_seats)
+        self._loc_index = {name: i for i, name in enumerate(self.locations)}
+        self._fuel_index = {name: i for i, name in enumerate(self.fuel_types)}
+        self._seat_index = {value: i for i, value in enumerate(self.seat_values)}
+
+    def lookup(self, pickup, drop, distance_km=None, fuel_type=None, seats=None):
+        """Tabulated fare, or None when the request is off the grid.
+
+        fuel_type/seats default to the training profile; distance_km, if
+        given, must match the route distance the table was built with.
+        """
+        i = self._loc_index.get(pickup)
+        j = self._loc_index.get(drop)
+        k = self._fuel_index.get(self.default_fuel if fuel_type is None else fuel_type)
+        s = self._seat_index.get(self.default_seats if seats is None else float(seats))
+        if i is None or j is None or k is None or s is None:
+            return None
+        route_km = self.distance_km[i, j]
+        if np.isnan(route_km):
+            return None
+        if distance_km is not None and abs(distance_km - route_km) > DISTANCE_TOLERANCE_KM:
+            return None
+        return float(self.fares[i, j, k, s])
+
+    def is_current(self, bundle, distances=None):
+        """True when built from this bundle (and, if given, these route distances)."""
+        if self.bundle_hash != bundle.content_hash:
+            return False
+        return distances is None or self.matrix_hash == matrix_hash(distances)
+
+    def save(self, path=FARE_TABLE_PATH):
+        meta = {
+            "locations": self.locations, "fuel_types": self.fuel_types,
+            "seat_values": self.seat_values, "bundle_hash": self.bundle_hash,
+            "matrix_hash": self.matrix_hash, "default_fuel": self.default_fuel, "default_seats": self.default_seats,
+        }
+        np.savez(path, fares=self.fares, distance_km=self.distance_km, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path=FARE_TABLE_PATH):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(data["fares"], data["distance_km"], **meta)
+
+
+def build_fare_table(bundle, distances=None, seat_options=SEAT_OPTIONS):
+    """Evaluate the model over every grid cell in one batched predict call.
+
+    distances maps (pickup, drop) -> km; pairs missing from it are left out
+    of the table (NaN) and always fall back to the live model.
+    """
+    distances = route_distances() if distances is None else distances
+    defaults = bundle.feature_defaults
+    locations = list(bundle.vocabularies["pickup location"])
+    fuel_types = list(bundle.vocabularies["fuel type"])
+    seat_values = sorted({float(s) for s in seat_options} | {float(defaults["seats"])})
+
+    n_loc, n_fuel, n_seat = len(locations), len(fuel_types), len(seat_values)
+    distance_km = np.full((n_loc, n_loc), np.nan)
+    for (pickup, drop), km in distances.items():
+        if pickup in locations and drop in locations:
+            distance_km[locations.index(pickup), locations.index(drop)] = km
+
+    # One feature row per cell, in C order of the cube's axes.
+    pi, di, fi, si = np.meshgrid(np.arange(n_loc), np.arange(n_loc), np.arange(n_fuel),
+                                 np.arange(n_seat), indexing="ij")
+    pi, di, fi, si = pi.ravel(), di.ravel(), fi.ravel(), si.ravel()
+    columns = {}
+    for col in bundle.columns:
+        if col in bundle.encoders:
+            columns[col] = np.full(len(pi), bundle.encoders[col].transform_one(defaults[col]))
+        else:
+            columns[col] = np.full(len(pi), float(defaults[col]))
+    columns["pickup location"] = bundle.encoders["pickup location"].transform(locations)[pi]
+    columns["drop location"] = bundle.encoders["drop location"].transform(locations)[di]
+    columns["fuel type"] = bundle.encoders["fuel type"].transform(fuel_types)[fi]
+    columns["seats"] = np.asarray(seat_values)[si]
+    columns["travelling distance(km)"] = np.nan_to_num(distance_km[pi, di])
+
+    X = np.column_stack([columns[col] for col in bundle.columns])
+    fares = bundle.predict(X).reshape(n_loc, n_loc, n_fuel, n_seat)
+    return FareTable(fares, distance_km, locations, fuel_types, seat_values, bundle.content_hash,
+                     default_fuel=defaults["fuel type"], default_seats=defaults["seats"],
+                     matrix_hash=matrix_hash(distances))
+
+
+def load_fare_table(bundle, path=FARE_TABLE_PATH, distances=None):
+    """Load the table for this bundle and route distances, rebuilding it if missing or stale."""
+    distances = route_distances() if distances is None else distances
+    if os.path.exists(path):
+        table = FareTable.load(path)
+        if table.is_current(bundle, distances):
+            return table
+    table = build_fare_table(bundle, distances)
+    table.save(path)
+    return table
+
+
+def predict_fare(bundle, table, pickup, drop, distance_km, fuel_type=None, seats=None, cache=None,
+                 surrogate=None):
+    """Fare from the table when on the grid, otherwise from the live model.
+
+    With RouteSurrogates, off-grid requests on a distilled route are answered
+    by the route's linear surrogate; with a PredictionCache, the remaining
+    ones go through the cache first.
+    """
+    fare = table.lookup(pickup, drop, distance_km, fuel_type, seats)
+    if fare is not None:
+        return fare
+
+    request = {"pickup location": pickup, "drop location": drop,
+               "travelling distance(km)": distance_km, "fuel type": fuel_type, "seats": seats}
+    row = dict(bundle.feature_defaults)
+    row.update({col: value for col, value in request.items() if value is not None})
+    for col, enc in bundle.encoders.items():
+        row[col] = enc.transform_one(row[col])
+    X = np.array([[row[col] for col in bundle.columns]], dtype=float)
+
+    if surrogate is not None:
+        fare = surrogate.predict(X)[0]
+        if not np.isnan(fare):
+            return float(fare)
+    if cache is not None:
+        return cache.predict(request)
+    return float(bundle.predict(X)[0])
+
+
+if __name__ == "__main__":
+    bundle = load_bundle()
+    table = build_fare_table(bundle)
+    table.save()
+    n_routes = int((~np.isnan(table.distance_km)).sum())
+    print(f"✅ Fare table saved to {FARE_TABLE_PATH}: {table.fares.shape} cells, "
+          f"{n_routes} routes, bundle {bundle.content_hash[:12]}")
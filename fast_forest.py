@@ -0,0 +1,233 @@
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# FLAT-ARRAY FOREST INFERENCE
+# ============================================================================
+# sklearn's RandomForestRegressor.predict validates the input and dispatches
+# one job per tree on every call, which costs far more than the tree walks
+# themselves when the app prices a single ride. FlatForest copies every tree
+# of a fitted forest into a few contiguous arrays (structure-of-arrays) and
+# walks all trees for all rows together with NumPy fancy indexing.
+#
+# Predictions are bit-identical to sklearn: inputs are cast to float32 like
+# sklearn does, thresholds stay float64, and the per-tree outputs are summed
+# in tree order before dividing by the number of trees.
+#
+# forest_compression.py can shrink a forest: float32 thresholds (still exact)
+# and leaf values stored as uint16 codes, value = value_offset + code x
+# value_scale (not exact; the error is bounded by value_scale / 2).
+
+# From this many rows on, predict() walks tree by tree instead of walking
+# all trees at once; per-call overhead stops mattering and cache locality wins.
+TREE_MAJOR_MIN_ROWS = 2048
+
+
+class FlatForest:
+    """Structure-of-arrays copy of a fitted sklearn tree ensemble."""
+
+    ARRAY_NAMES = ("feature", "threshold", "children", "value", "missing_left", "roots")
+
+    def __init__(self, feature, threshold, children, value, missing_left, roots,
+                 max_depth, n_features, value_scale=None, value_offset=0.0):
+        self.feature = feature            # int32   [n_nodes] split feature (0 at leaves)
+        self.threshold = threshold        # float64 [n_nodes] go left if x <= threshold (or float32)
+        self.children = children          # int32   [2 * n_nodes] interleaved left/right ids
+        self.value = value                # float64 [n_nodes] node prediction (or uint16 codes)
+        self.missing_left = missing_left  # bool    [n_nodes] NaN goes left
+        self.roots = roots                # int32   [n_trees] global id of each root
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.value_scale = None if value_scale is None else float(value_scale)
+        self.value_offset = float(value_offset)
+
+    @property
+    def quantized(self):
+        return self.value_scale is not None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def left(self):
+        return self.children[0::2]
+
+    @property
+    def right(self):
+        return self.children[1::2]
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAY_NAMES)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Convert a fitted RandomForestRegressor (or single DecisionTreeRegressor)."""
+        estimators = getattr(model, "estimators_", [model])
+        return cls.from_trees([est.tree_ for est in estimators], model.n_features_in_)
+
+    @classmethod
+    def from_trees(cls, trees, n_features):
+        """Concatenate sklearn-style tree arrays (anything shaped like a Tree object)."""
+        feature, threshold, left, right, value, missing_left, roots = [], [], [], [], [], [], []
+        offset, max_depth = 0, 0
+
+        for tree in trees:
+            if tree.n_outputs != 1:
+                raise ValueError("FlatForest only supports single-output regressors")
+            n = tree.node_count
+            ids = np.arange(offset, offset + n, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            # Leaves point at themselves so the traversal can run a fixed
+            # number of steps without masking finished rows.
+            left.append(np.where(is_leaf, ids, tree.children_left + offset).astype(np.int32))
+            right.append(np.where(is_leaf, ids, tree.children_right + offset).astype(np.int32))
+            feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold).astype(np.float64))
+            value.append(tree.value[:, 0, 0].astype(np.float64))
+            missing = getattr(tree, "missing_go_to_left", None)
+            missing_left.append(np.zeros(n, dtype=bool) if missing is None
+                                else np.asarray(missing, dtype=bool) & ~is_leaf)
+            roots.append(offset)
+
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        # Left and right ids are interleaved so one take() picks the branch.
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            children=np.stack([np.concatenate(left), np.concatenate(right)], axis=1).ravel(),
+            value=np.concatenate(value),
+            missing_left=np.concatenate(missing_left),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            n_features=n_features,
+        )
+
+    def arrays(self):
+        """Name -> array mapping, used when the forest is written to disk."""
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}
+
+    @classmethod
+    def from_arrays(cls, arrays, max_depth, n_features, value_scale=None, value_offset=0.0):
+        return cls(**{name: arrays[name] for name in cls.ARRAY_NAMES},
+                   max_depth=max_depth, n_features=n_features,
+                   value_scale=value_scale, value_offset=value_offset)
+
+    def _as_input(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        return X
+
+    def _walk(self, node, flat_X, row_base, has_nan):
+        """Advance node ids max_depth steps; leaves loop onto themselves."""
+        for _ in range(self.max_depth):
+            x = flat_X.take(row_base + self.feature.take(node))
+            go_right = x > self.threshold.take(node)
+            if has_nan:
+                go_right |= np.isnan(x) & ~self.missing_left.take(node)
+            node = self.children.take(2 * node + go_right)
+        return node
+
+    def apply(self, X):
+        """Return the global leaf id reached in every tree, shape [n_trees, n_rows]."""
+        X = self._as_input(X)
+        row_base = np.arange(X.shape[0]) * self.n_features
+        node = np.repeat(self.roots[:, None], X.shape[0], axis=1)
+        return self._walk(node, X.ravel(), row_base[None, :], np.isnan(X).any())
+
+    def predict(self, X):
+        """Predict one row (1-D) or a batch (2-D); returns a 1-D float64 array."""
+        X = self._as_input(X)
+
+        if X.shape[0] < TREE_MAJOR_MIN_ROWS:
+            leaf_values = self.value.take(self.apply(X))
+            if self.quantized:
+                # Integer codes sum exactly in any order
+                return self.value_offset + leaf_values.sum(axis=0, dtype=np.float64) * self.value_scale / self.n_trees
+            # cumsum adds the trees strictly in order, like sklearn's accumulator;
+            # sum() would switch to pairwise summation and differ in the last bit.
+            return np.cumsum(leaf_values, axis=0)[-1] / self.n_trees
+
+        # Large batches: walk one tree at a time over all rows, which keeps the
+        # working set to a single tree's nodes and accumulates in tree order.
+        flat_X = X.ravel()
+        row_base = np.arange(X.shape[0]) * self.n_features
+        has_nan = np.isnan(X).any()
+        out = np.zeros(X.shape[0])
+        for root in self.roots:
+            node = np.full(X.shape[0], root, dtype=np.int64)
+            out += self.value.take(self._walk(node, flat_X, row_base, has_nan))
+        if self.quantized:
+            return self.value_offset + out * self.value_scale / self.n_trees
+        return out / self.n_trees
+
+
+# ============================================================================
+# LATENCY COMPARISON
+# ============================================================================
+
+def _sample_inputs(forest, n_rows, seed=0):
+    """Random rows spanning the threshold range of each feature."""
+    rng = np.random.default_rng(seed)
+    X = np.zeros((n_rows, forest.n_features))
+    is_split = forest.left != np.arange(forest.n_nodes)
+    for f in range(forest.n_features):
+        thr = forest.threshold[is_split & (forest.feature == f)]
+        lo, hi = (thr.min() - 1, thr.max() + 1) if len(thr) else (0.0, 1.0)
+        X[:, f] = rng.uniform(lo, hi, n_rows)
+    return X
+
+
+def _median_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def benchmark(model, forest=None, batch_size=1000, repeats=50):
+    """Compare model.predict with FlatForest.predict on single rows and a batch."""
+    forest = forest or FlatForest.from_sklearn(model)
+    columns = getattr(model, "feature_names_in_", None)
+
+    results = []
+    for n_rows in (1, batch_size):
+        X = _sample_inputs(forest, n_rows)
+        X_model = pd.DataFrame(X, columns=columns) if columns is not None else X
+        identical = np.array_equal(model.predict(X_model), forest.predict(X))
+        sk_ms = _median_ms(lambda: model.predict(X_model), repeats)
+        flat_ms = _median_ms(lambda: forest.predict(X), repeats)
+        results.append({
+            "rows": n_rows,
+            "sklearn_ms": round(sk_ms, 3),
+            "flat_ms": round(flat_ms, 3),
+            "speedup": round(sk_ms / flat_ms, 1),
+            "identical": identical,
+        })
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    with open("carpool_model.pkl", "rb") as f_model:
+        model = pickle.load(f_model)
+
+    forest = FlatForest.from_sklearn(model)
+    print(f"Trees: {forest.n_trees}   Nodes: {forest.n_nodes}   "
+          f"Max depth: {forest.max_depth}   Size: {forest.nbytes / 1e6:.2f} MB")
+    print(benchmark(model, forest).to_string(index=False))
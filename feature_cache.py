@@ -0,0 +1,125 @@
+import argparse
+import glob
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import time
+
+from carpool_features import add_engineered_features, CATEGORICAL_COLUMNS, NUMERIC_COLUMNS, DROP_COLUMNS
+from category_encoder import CategoryEncoder, fit_encoders
+from data_store import load_dataset
+
+# ============================================================================
+# CONTENT-HASH FEATURE CACHE FOR TRAINING
+# ============================================================================
+# Preparing the training matrix (feature engineering, median imputation,
+# category encoding) is the same work on every run while only the model
+# changes. load_training_features() stores the result:
+#
+#   feature_cache/<dataset>-<key>.pkl      X, y and the encoder vocabularies
+#
+# key = sha256(dataset bytes + feature code version). The code version
+# hashes the source of every module that shapes the features, so editing
+# carpool_features.py, category_encoder.py, data_store.py or
+# prepare_training_frame() below invalidates the cache just like a changed
+# dataset. Older entries for the same dataset are removed on write.
+
+FEATURE_CACHE_DIR = "feature_cache"
+FEATURE_FORMAT_VERSION = 1   # bump to drop every cached entry
+
+
+def prepare_training_frame(df):
+    """Raw ride rows -> (X, y, encoders) exactly as the model is trained on."""
+    df = add_engineered_features(df)
+
+    # Drop irrelevant/redundant columns with safety check
+    df = df.drop([col for col in DROP_COLUMNS if col in df.columns], axis=1)
+
+    # Fill missing categorical values (Parquet loads them as pandas
+    # categoricals, which reject a new "Unknown" value; go back to object)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(object).fillna("Unknown")
+
+    # Fill missing numeric values with median
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna(df[col].median())
+
+    encoders = fit_encoders(df, CATEGORICAL_COLUMNS)
+
+    assert 'price' in df.columns, "Error: 'price' column is missing in data!"
+    return df.drop('price', axis=1), df['price'], encoders
+
+
+def file_digest(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def feature_code_version():
+    """Hash of the source code that determines the feature matrix."""
+    h = hashlib.sha256(str(FEATURE_FORMAT_VERSION).encode())
+    for module_name in ("carpool_features", "category_encoder", "data_store"):
+        h.update(inspect.getsource(sys.modules[module_name]).encode())
+    h.update(inspect.getsource(prepare_training_frame).encode())
+    return h.hexdigest()
+
+
+def cache_key(source_path):
+    return hashlib.sha256((file_digest(source_path) + feature_code_version()).encode()).hexdigest()[:16]
+
+
+def _entry_path(source_path, key, cache_dir):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{key}.pkl")
+
+
+def load_training_features(source_path, cache_dir=FEATURE_CACHE_DIR, log=print):
+    """(X, y, encoders) for source_path, from the cache when inputs and code are unchanged."""
+    key = cache_key(source_path)
+    path = _entry_path(source_path, key, cache_dir)
+
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+        encoders = {col: CategoryEncoder(classes) for col, classes in entry["vocabularies"].items()}
+        if log:
+            log(f"Feature cache hit: {path}")
+        return entry["X"], entry["y"], encoders
+
+    start = time.perf_counter()
+    X, y, encoders = prepare_training_frame(load_dataset(source_path))
+    entry = {"X": X, "y": y, "source": source_path, "key": key,
+             "vocabularies": {col: list(enc.classes_) for col, enc in encoders.items()}}
+
+    os.makedirs(cache_dir, exist_ok=True)
+    stale = glob.glob(_entry_path(source_path, "*", cache_dir))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    for old in stale:
+        if old != path:
+            os.remove(old)
+    if log:
+        log(f"Feature cache miss: prepared {len(X):,} rows in {time.perf_counter() - start:.2f}s -> {path}")
+    return X, y, encoders
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepare (or show) the cached training features.")
+    parser.add_argument("source", nargs="?", default="car-data-all-locations.csv")
+    parser.add_argument("--cache-dir", default=FEATURE_CACHE_DIR)
+    args = parser.parse_args()
+
+    for attempt in ("first", "second"):
+        start = time.perf_counter()
+        X, y, _ = load_training_features(args.source, args.cache_dir)
+        print(f"{attempt} load: {len(X):,} rows x {X.shape[1]} features in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
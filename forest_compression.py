@@ -0,0 +1,209 @@
+import argparse
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from fast_forest import FlatForest
+from feature_cache import load_training_features
+from model_bundle import load_bundle, save_bundle, BUNDLE_DIR
+from model_comparison import latency_ms
+
+# ============================================================================
+# FOREST COMPRESSION
+# ============================================================================
+# Usage:
+#   python forest_compression.py                                  # report only
+#   python forest_compression.py --ccp-alpha 2 --max-shift 1 --bundle carpool_model_bundle_small
+#
+# Shrinks the fitted forest in carpool_model.pkl in four steps, each measured
+# against the step before (accuracy, bytes, predict time):
+#
+#   prune      minimal cost-complexity pruning of every tree: keep the subtree
+#              minimizing R(T) + ccp_alpha x leaves, the same subtree sklearn
+#              grows with ccp_alpha=..., found bottom-up without refitting
+#   drop       remove trees greedily, each time the one whose removal moves the
+#              ensemble least, while the validation predictions stay within
+#              max_shift (RMSE) of the full forest's
+#   float32    thresholds t -> the largest float32 <= t; inputs are float32
+#              already, so every comparison and prediction is unchanged
+#   quantize   leaf values -> uint16 codes on one linear scale; each prediction
+#              moves by at most half a step ((max - min) / 65535 / 2)
+#
+# Trees are dropped on one half of the test split and the report uses the
+# other half. --bundle writes the result as a bundle (format v2 when
+# quantized) with the current bundle's columns, vocabularies and defaults,
+# and refuses to when the current bundle does not serve the pickled model
+# (e.g. after streaming_train.py, which rewrites only the bundle).
+
+MODEL_PATH = "carpool_model.pkl"
+
+
+# ----- TREE ARRAYS -----
+def tree_arrays(tree):
+    """Plain-array copy of a fitted sklearn Tree (what FlatForest.from_trees reads)."""
+    return SimpleNamespace(
+        node_count=tree.node_count, n_outputs=tree.n_outputs, max_depth=tree.max_depth,
+        children_left=np.array(tree.children_left), children_right=np.array(tree.children_right),
+        feature=np.array(tree.feature), threshold=np.array(tree.threshold), value=np.array(tree.value),
+        impurity=np.array(tree.impurity), weighted_n_node_samples=np.array(tree.weighted_n_node_samples),
+        missing_go_to_left=np.array(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, bool))),
+    )
+
+
+def prune_tree(tree, ccp_alpha):
+    """Minimal cost-complexity subtree of tree_arrays(...) output for ccp_alpha."""
+    left, right = tree.children_left, tree.children_right
+    risk = tree.impurity * tree.weighted_n_node_samples / tree.weighted_n_node_samples[0]
+    best = risk + ccp_alpha
+    collapse = np.ones(tree.node_count, dtype=bool)
+    # sklearn numbers children after their parent, so reverse id order is bottom-up
+    for node in range(tree.node_count - 1, -1, -1):
+        if left[node] != -1:
+            subtree = best[left[node]] + best[right[node]]
+            collapse[node] = best[node] <= subtree
+            best[node] = min(best[node], subtree)
+
+    keep, depth, new_id = [], {}, {}
+    stack = [(0, 0)]
+    while stack:
+        node, d = stack.pop()
+        new_id[node] = len(keep)
+        keep.append(node)
+        depth[node] = d
+        if left[node] != -1 and not collapse[node]:
+            stack.append((right[node], d + 1))
+            stack.append((left[node], d + 1))
+    keep = np.array(keep)
+    is_leaf = (left[keep] == -1) | collapse[keep]
+    remap = lambda children: np.array([-1 if leaf else new_id[c] for c, leaf in zip(children[keep], is_leaf)])
+    return SimpleNamespace(
+        node_count=len(keep), n_outputs=tree.n_outputs, max_depth=max(depth.values()),
+        children_left=remap(left), children_right=remap(right),
+        feature=np.where(is_leaf, -2, tree.feature[keep]), threshold=np.where(is_leaf, -2.0, tree.threshold[keep]),
+        value=tree.value[keep], impurity=tree.impurity[keep],
+        weighted_n_node_samples=tree.weighted_n_node_samples[keep],
+        missing_go_to_left=tree.missing_go_to_left[keep] & ~is_leaf,
+    )
+
+
+# ----- TREE SELECTION -----
+def select_trees(forest, X, max_shift):
+    """Indices of the trees to keep: greedy removal while RMSE vs the full forest <= max_shift."""
+    per_tree = forest.value.take(forest.apply(X))   # [n_trees, n_rows]
+    reference = per_tree.mean(axis=0)
+    active = list(range(forest.n_trees))
+    total = per_tree.sum(axis=0)
+    while len(active) > 1:
+        candidates = (total[None, :] - per_tree[active]) / (len(active) - 1)
+        shift = np.sqrt(np.mean((candidates - reference) ** 2, axis=1))
+        i = int(np.argmin(shift))
+        if shift[i] > max_shift:
+            break
+        total -= per_tree[active[i]]
+        del active[i]
+    return active
+
+
+# ----- ENCODING -----
+def float32_thresholds(forest):
+    """Same forest with float32 thresholds, rounded down so float32 inputs split identically."""
+    t32 = forest.threshold.astype(np.float32)
+    above = t32.astype(np.float64) > forest.threshold
+    t32[above] = np.nextafter(t32[above], np.float32(-np.inf))
+    return FlatForest(forest.feature, t32, forest.children, forest.value, forest.missing_left, forest.roots,
+                      forest.max_depth, forest.n_features, forest.value_scale, forest.value_offset)
+
+
+def quantize_leaves(forest, bits=16):
+    """Same forest with leaf values as unsigned integer codes on one linear scale."""
+    if forest.quantized:
+        return forest
+    dtype = np.uint16 if bits <= 16 else np.uint32
+    is_leaf = forest.left == np.arange(forest.n_nodes)
+    lo, hi = forest.value[is_leaf].min(), forest.value[is_leaf].max()
+    scale = (hi - lo) / (2 ** bits - 1) or 1.0
+    codes = np.clip(np.round((forest.value - lo) / scale), 0, 2 ** bits - 1).astype(dtype)
+    return FlatForest(forest.feature, forest.threshold, forest.children, codes, forest.missing_left,
+                      forest.roots, forest.max_depth, forest.n_features, value_scale=scale, value_offset=lo)
+
+
+def matches_bundle(model, bundle):
+    """True when the bundle serves exactly the trees of the fitted sklearn model."""
+    ours, theirs = FlatForest.from_sklearn(model).arrays(), bundle.forest.arrays()
+    return all(np.array_equal(array, theirs[name]) for name, array in ours.items())
+
+
+# ----- PIPELINE -----
+def compress(model, X_val, X_test, y_test, ccp_alpha=0.0, max_shift=0.0, bits=16):
+    """(compressed FlatForest, per-step report DataFrame)."""
+    X_val = np.asarray(X_val, dtype=np.float64)
+    X_test = np.asarray(X_test, dtype=np.float64)
+    y_test = np.asarray(y_test, dtype=np.float64)
+    trees = [tree_arrays(est.tree_) for est in model.estimators_]
+    n_features = model.n_features_in_
+
+    steps = [("original", FlatForest.from_trees(trees, n_features))]
+    pruned = [prune_tree(t, ccp_alpha) for t in trees] if ccp_alpha > 0 else trees
+    steps.append(("prune", FlatForest.from_trees(pruned, n_features)))
+    keep = select_trees(steps[-1][1], X_val, max_shift) if max_shift > 0 else range(len(pruned))
+    steps.append(("drop", FlatForest.from_trees([pruned[i] for i in keep], n_features)))
+    steps.append(("float32", float32_thresholds(steps[-1][1])))
+    if bits:
+        steps.append(("quantize", quantize_leaves(steps[-1][1], bits)))
+
+    rows = []
+    original = steps[0][1].predict(X_test)
+    for name, forest in steps:
+        pred = forest.predict(X_test)
+        rows.append({
+            "step": name, "trees": forest.n_trees, "nodes": forest.n_nodes, "kb": forest.nbytes / 1e3,
+            "test_rmse": float(np.sqrt(np.mean((pred - y_test) ** 2))),
+            "max_abs_change": float(np.abs(pred - original).max()),
+            "single_ms": latency_ms(forest.predict, X_test, 1, 200, np.random.default_rng(0))[0],
+            "batch_ms": latency_ms(forest.predict, X_test, min(1000, len(X_test)), 20, np.random.default_rng(0))[0],
+        })
+    report = pd.DataFrame(rows)
+    report.insert(report.columns.get_loc("test_rmse") + 1, "d_rmse", report["test_rmse"].diff().fillna(0.0))
+    report["saved_kb"] = report["kb"].iloc[0] - report["kb"]
+    report["speedup"] = report["single_ms"].iloc[0] / report["single_ms"]
+    return steps[-1][1], report
+
+
+if __name__ == "__main__":
+    from sklearn.model_selection import train_test_split
+
+    parser = argparse.ArgumentParser(description="Prune, thin and re-encode the fare forest.")
+    parser.add_argument("source", nargs="?", default="car-data-all-locations.csv")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--ccp-alpha", type=float, default=2.0, help="0 disables pruning")
+    parser.add_argument("--max-shift", type=float, default=1.0,
+                        help="allowed prediction RMSE vs the full forest when dropping trees (0 disables)")
+    parser.add_argument("--bits", type=int, default=16, help="leaf code width (0 keeps float64 leaves)")
+    parser.add_argument("--bundle", default=None, help="write the compressed forest as a bundle here")
+    args = parser.parse_args()
+
+    with open(args.model, "rb") as f_model:
+        model = pickle.load(f_model)
+    X, y, _ = load_training_features(args.source)
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.20, random_state=42)
+    X_val, X_report, _, y_report = train_test_split(X_test, y_test, test_size=0.50, random_state=0)
+
+    forest, report = compress(model, X_val, X_report, y_report, args.ccp_alpha, args.max_shift, args.bits)
+    with pd.option_context("display.width", 200, "display.float_format", "{:.3f}".format):
+        print(report.to_string(index=False))
+
+    if args.bundle:
+        current = load_bundle(BUNDLE_DIR)
+        if not matches_bundle(model, current) or current.columns != list(X.columns):
+            parser.error(f"{BUNDLE_DIR}/ (hash {current.content_hash[:12]}) does not serve the model in "
+                         f"{args.model}; retrain with complete_carpool_model.py first")
+        manifest = save_bundle(
+            forest, current.columns, current.vocabularies, current.feature_defaults,
+            metadata={**current.metadata, "compression": {
+                "from": current.content_hash, "ccp_alpha": args.ccp_alpha,
+                "max_shift": args.max_shift, "bits": args.bits,
+                "test_rmse": float(report["test_rmse"].iloc[-1])}},
+            path=args.bundle)
+        print(f"✅ Compressed bundle saved to {args.bundle}/ (hash {manifest['content_hash'][:12]}).")
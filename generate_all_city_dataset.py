@@ -1,87 +1,213 @@
+import argparse
+import json
+import os
+import time
+from collections import deque
+from multiprocessing import Pool
+
+import numpy as np
 import pandas as pd
-import random
-
-coords_dict = {
-    "Ballygunge":      (22.5226, 88.3715),
-    "Dumdum":          (22.6325, 88.4433),
-    "Garia":           (22.4495, 88.4113),
-    "Howrah":          (22.5892, 88.3104),
-    "Salt Lake":       (22.6065, 88.3963),
-    "Park Street":     (22.5535, 88.3507),
-    "Jadavpur":        (22.4953, 88.3695),
-    "Tollygunge":      (22.5019, 88.3420),
-    "Behala":          (22.5017, 88.3073),
-    "Esplanade":       (22.5637, 88.3508),
-    "Shyambazar":      (22.6133, 88.3735),
-    "Lake Town":       (22.6067, 88.4043),
-    "Kasba":           (22.5204, 88.3882),
-    "Barasat":         (22.7206, 88.4807),
-    "Baguiati":        (22.6135, 88.4277),
-    "Newtown":         (22.5958, 88.4795),
-    "Cossipore":       (22.6297, 88.3625),
-    "Alipore":         (22.5362, 88.3342),
-    "Kankurgachi":     (22.5731, 88.3841),
-    "Sodepur":         (22.6996, 88.3734),
-    "Baranagar":       (22.6613, 88.3794),
-    "Bandel":          (22.9236, 88.3855),
-    "Serampore":       (22.7525, 88.3421),
-    "Beliaghata":      (22.5631, 88.393)
+
+from distance_matrix import load_distance_matrix
+from geo import pairwise
+from locations import coords_dict
+
+# ============================================================================
+# SYNTHETIC ALL-LOCATIONS RIDE DATASET
+# ============================================================================
+# Usage:
+#   python generate_all_city_dataset.py                      # 3 x all pairs -> car-data-all-locations.csv
+#   python generate_all_city_dataset.py --rows 200000000 --chunk-rows 2000000 \
+#       --workers 8 --output rides_parquet/                  # partitioned Parquet
+#
+# Rows walk the ordered (pickup, drop) pairs cyclically, so --rows of k x
+# pairs gives every route k times. Distances come from the road distance
+# matrix where it has the pair, haversine otherwise. Every other column is
+# drawn from small vocabularies in one vectorized pass per chunk and kept
+# categorical until it is written.
+#
+# Chunks are generated by a process pool. Chunk i draws from its own RNG
+# stream, SeedSequence(seed, spawn_key=(i,)), so the output depends only on
+# seed and chunk size, not on the number of workers. An --output ending in
+# .csv or .parquet is one file written in chunk order; anything else is a
+# directory of part-00000.<format> files that the workers write themselves.
+# For single-file output at most 2 x workers chunks are in flight, drained in
+# order, so a slow writer does not let finished chunks pile up; memory stays
+# at a few chunks per worker either way.
+
+DATASET_PATH = "car-data-all-locations.csv"
+PASSES = 3   # default rows = PASSES x all ordered pairs
+
+COLUMNS = ["Car_Name", "pickup location", "drop location", "travelling distance(km)",
+           "fuel type", "fuel price", "seats", "Year of buying", "owner", "price",
+           "engine", "max_power", "torque", "mileage(kmph)"]
+
+VOCABULARIES = {
+    "Car_Name": ["Swift Dzire", "WagonR", "Honda City", "Hyundai i10", "Creta", "XUV500"],
+    "fuel type": ["Diesel", "Petrol", "CNG", "LPG"],
+    "fuel price": [95, 98, 99, 108],
+    "seats": [4, 5, 6, 7],
+    "Year of buying": list(range(2012, 2023)),
+    "owner": ["Aarav Singh", "Sneha Das", "Priya Sen", "Vikram Sinha", "Neha Patel", "Rohit Menon"],
+    "engine": [f"{cc} CC" for cc in (1197, 1248, 1493, 1591, 1798)],
+    "max_power": [f"{bhp} bhp" for bhp in (74, 83, 99, 110, 125, 140)],
+    "torque": [f"{nm} Nm" for nm in range(130, 251)],
+    "mileage(kmph)": [15, 18, 20, 22],
 }
-cities = list(coords_dict.keys())
-
-# --- Helper: Haversine distance ---
-from math import radians, sin, cos, sqrt, atan2
-
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1)*cos(lat2)*sin(dlon/2)**2
-    return R * 2 * atan2(sqrt(a), sqrt(1-a))
-
-# --- Generate synthetic rides ---
-rows = []
-fuel_types = ["Diesel", "Petrol", "CNG", "LPG"]
-owners = ["Aarav Singh", "Sneha Das", "Priya Sen", "Vikram Sinha", "Neha Patel", "Rohit Menon"]
-years = list(range(2012, 2023))
-car_names = ["Swift Dzire", "WagonR", "Honda City", "Hyundai i10", "Creta", "XUV500"]
-for _ in range(3):  # 3x redundant, more variation, not pure all-to-all
-    for pickup in cities:
-        for drop in cities:
-            if pickup == drop:
-                continue
-            lat1, lon1 = coords_dict[pickup]
-            lat2, lon2 = coords_dict[drop]
-            distance = round(haversine(lat1, lon1, lat2, lon2), 2)
-            seats = random.choice([4, 5, 6, 7])
-            owner = random.choice(owners)
-            car_age = 2025 - random.choice(years)
-            engine_cc = random.choice([1197, 1248, 1493, 1591, 1798])
-            max_power = random.choice([74, 83, 99, 110, 125, 140])
-            mileage = random.choice([15, 18, 20, 22])
-            fuel_type = random.choice(fuel_types)
-            fuel_price = random.choice([95, 98, 99, 108])
-            # Add realistic price randomness so model can't overfit!
-            price = int(50 + distance * random.uniform(7, 10) + random.randint(-30, 80))
-            car_name = random.choice(car_names)
-            rows.append({
-                "Car_Name": car_name,
-                "pickup location": pickup,
-                "drop location": drop,
-                "travelling distance(km)": distance,
-                "fuel type": fuel_type,
-                "fuel price": fuel_price,
-                "seats": seats,
-                "Year of buying": 2025 - car_age,
-                "owner": owner,
-                "price": price,
-                "engine": f"{engine_cc} CC",
-                "max_power": f"{max_power} bhp",
-                "torque": f"{random.randint(130,250)} Nm",
-                "mileage(kmph)": mileage
-            })
-
-df = pd.DataFrame(rows)
-df.to_csv("car-data-all-locations.csv", index=False)
-print(f"✅ New dataset with all locations created: car-data-all-locations.csv ({len(df)} rows)")
+STRING_COLUMNS = ("Car_Name", "fuel type", "owner", "engine", "max_power", "torque")
+
+# price = base + distance * U(per_km) + randint(offset), inclusive bounds.
+# The noise keeps the model from fitting price exactly.
+NOISE_MODEL = {"base": 50, "per_km": [7, 10], "offset": [-30, 80]}
+
+
+# ----- LOCATIONS AND ROUTES -----
+def load_locations(path=None):
+    """{name: (lat, lon)} from a CSV with name,lat,lon columns, or the registry."""
+    if path is None:
+        return dict(coords_dict)
+    table = pd.read_csv(path)
+    return {str(n): (float(lat), float(lon)) for n, lat, lon in zip(table["name"], table["lat"], table["lon"])}
+
+
+def route_table(locations):
+    """(names, pickup_idx, drop_idx, distance_km) over all ordered pairs of distinct locations."""
+    names = list(locations)
+    lats = np.array([locations[n][0] for n in names])
+    lons = np.array([locations[n][1] for n in names])
+    km = pairwise(lats, lons)
+
+    road = load_distance_matrix()
+    in_matrix = np.array([road.index.get(n, -1) for n in names])
+    known = np.flatnonzero(in_matrix >= 0)
+    if len(known):
+        rows = in_matrix[known]
+        km[np.ix_(known, known)] = road.distance_km[np.ix_(rows, rows)]
+
+    pickup, drop = np.nonzero(~np.eye(len(names), dtype=bool))
+    return names, pickup, drop, np.round(km[pickup, drop], 2)
+
+
+# ----- CHUNK GENERATION -----
+def generate_chunk(routes, start_row, n_rows, rng, noise=None):
+    """DataFrame for rows [start_row, start_row + n_rows) of the dataset."""
+    names, pickup, drop, distance_km = routes
+    noise = {**NOISE_MODEL, **(noise or {})}
+    pair = (start_row + np.arange(n_rows)) % len(pickup)
+    distance = distance_km[pair]
+
+    data = {}
+    for column, vocab in VOCABULARIES.items():
+        codes = rng.integers(0, len(vocab), n_rows)
+        if column in STRING_COLUMNS:
+            data[column] = pd.Categorical.from_codes(codes, categories=vocab)
+        else:
+            data[column] = np.asarray(vocab)[codes]
+    data["pickup location"] = pd.Categorical.from_codes(pickup[pair], categories=names)
+    data["drop location"] = pd.Categorical.from_codes(drop[pair], categories=names)
+    data["travelling distance(km)"] = distance
+    data["price"] = (noise["base"] + distance * rng.uniform(*noise["per_km"], n_rows)
+                     + rng.integers(noise["offset"][0], noise["offset"][1] + 1, n_rows)).astype(np.int64)
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def _write(df, path, fmt, header=True):
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, header=header, mode="w" if header else "a")
+
+
+_routes = None
+
+
+def _init_worker(locations):
+    global _routes
+    _routes = route_table(locations)
+
+
+def _chunk_task(task):
+    """Generate one chunk; write it to part_path, or return it when part_path is None."""
+    index, start_row, n_rows, seed, noise, part_path, fmt = task
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    df = generate_chunk(_routes, start_row, n_rows, rng, noise)
+    if part_path is None:
+        return df
+    _write(df, part_path, fmt)
+    return n_rows
+
+
+def _ordered_chunks(pool, tasks, max_in_flight):
+    """Chunk DataFrames in task order, never more than max_in_flight pending."""
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(_chunk_task, (task,)))
+    while pending:
+        yield pending.popleft().get()
+
+
+def generate_dataset(output=DATASET_PATH, rows=None, chunk_rows=1_000_000, workers=None,
+                     seed=0, locations=None, noise=None, fmt=None):
+    """Generate rows rows into output; returns a summary dict."""
+    locations = locations or dict(coords_dict)
+    n_pairs = len(locations) * (len(locations) - 1)
+    rows = PASSES * n_pairs if rows is None else rows
+    single_file = output.endswith((".csv", ".parquet"))
+    fmt = fmt or ("parquet" if output.endswith(".parquet") else "csv")
+    workers = workers or os.cpu_count() or 1
+
+    tasks = []
+    if not single_file:
+        os.makedirs(output, exist_ok=True)
+    for index, start_row in enumerate(range(0, rows, chunk_rows)):
+        part = None if single_file else os.path.join(output, f"part-{index:05d}.{fmt}")
+        tasks.append((index, start_row, min(chunk_rows, rows - start_row), seed, noise, part, fmt))
+
+    start = time.perf_counter()
+    workers = min(workers, len(tasks)) or 1
+    with Pool(workers, initializer=_init_worker, initargs=(locations,)) as pool:
+        if not single_file:
+            written = sum(pool.imap_unordered(_chunk_task, tasks))
+        elif fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            writer = None
+            written = 0
+            for df in _ordered_chunks(pool, tasks, 2 * workers):
+                # Vocabularies are fixed, so every chunk has the same dictionary schema
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                writer = writer or pq.ParquetWriter(output, table.schema)
+                writer.write_table(table)
+                written += len(df)
+            if writer:
+                writer.close()
+        else:
+            written = 0
+            for df in _ordered_chunks(pool, tasks, 2 * workers):
+                _write(df, output, fmt, header=written == 0)
+                written += len(df)
+    return {"rows": written, "chunks": len(tasks), "seconds": time.perf_counter() - start}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the synthetic all-locations ride dataset.")
+    parser.add_argument("--output", default=DATASET_PATH,
+                        help="a .csv/.parquet file, or a directory for partitioned output")
+    parser.add_argument("--rows", type=int, default=None, help=f"default: {PASSES} x all ordered pairs")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None,
+                        help="part file format for directory output (default csv)")
+    parser.add_argument("--locations", help="CSV with name,lat,lon (default: the registry)")
+    parser.add_argument("--noise", type=json.loads, default=None,
+                        help=f"JSON overrides for the price noise model {json.dumps(NOISE_MODEL)}")
+    args = parser.parse_args()
+
+    summary = generate_dataset(args.output, args.rows, args.chunk_rows, args.workers, args.seed,
+                               load_locations(args.locations), args.noise, args.format)
+    print(f"✅ New dataset with all locations created: {args.output} "
+          f"({summary['rows']:,} rows, {summary['chunks']} chunks, {summary['seconds']:.1f}s)")
@@ -0,0 +1,120 @@
+import argparse
+import time
+from math import radians, sin, cos, sqrt, asin
+
+import numpy as np
+
+# ============================================================================
+# VECTORIZED GREAT-CIRCLE DISTANCES
+# ============================================================================
+# One haversine for the whole repo. All functions take degrees and return
+# kilometres:
+#
+#   haversine(lat1, lon1, lat2, lon2)      element-wise, numpy broadcasting
+#   one_to_many(lat, lon, lats, lons)      one point against an array
+#   pairwise(lats, lons[, lats2, lons2])   full N x M matrix, row-chunked
+#   iter_pairwise(...)                     the same matrix one block at a time
+#   haversine_scalar(...)                  plain floats, for per-step loops
+#
+# dtype=np.float32 halves memory and is accurate to a few metres at city
+# scale. pairwise() computes chunk_rows rows at a time so the temporaries
+# stay at chunk_rows x M no matter how large N is.
+
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_CHUNK_ROWS = 1024
+
+
+def _prepare(lats, lons, dtype):
+    lat = np.radians(np.asarray(lats, dtype=dtype))
+    lon = np.radians(np.asarray(lons, dtype=dtype))
+    return lat, lon, np.cos(lat)
+
+
+def _distance(lat1, lon1, cos1, lat2, lon2, cos2):
+    a = np.sin((lat2 - lat1) * 0.5) ** 2 + cos1 * cos2 * np.sin((lon2 - lon1) * 0.5) ** 2
+    np.clip(a, 0, 1, out=a)
+    return (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(a, out=a), out=a)
+
+
+def haversine(lat1, lon1, lat2, lon2, dtype=np.float64):
+    """Great-circle km between points; the four arguments broadcast together."""
+    lat1, lon1, cos1 = _prepare(lat1, lon1, dtype)
+    lat2, lon2, cos2 = _prepare(lat2, lon2, dtype)
+    a = np.asarray(np.sin((lat2 - lat1) * 0.5) ** 2 + cos1 * cos2 * np.sin((lon2 - lon1) * 0.5) ** 2)
+    d = (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    return d.astype(dtype, copy=False)
+
+
+def one_to_many(lat, lon, lats, lons, dtype=np.float64):
+    """km from one point to each of lats/lons."""
+    return haversine(lat, lon, lats, lons, dtype=dtype)
+
+
+def iter_pairwise(lats, lons, other_lats=None, other_lons=None, dtype=np.float64,
+                  chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield (row_start, block) with block[i, j] = km from row_start + i to j."""
+    lat1, lon1, cos1 = _prepare(lats, lons, dtype)
+    if other_lats is None:
+        lat2, lon2, cos2 = lat1, lon1, cos1
+    else:
+        lat2, lon2, cos2 = _prepare(other_lats, other_lons, dtype)
+    for start in range(0, len(lat1), chunk_rows):
+        rows = slice(start, start + chunk_rows)
+        yield start, _distance(lat1[rows, None], lon1[rows, None], cos1[rows, None],
+                               lat2[None, :], lon2[None, :], cos2[None, :]).astype(dtype, copy=False)
+
+
+def pairwise(lats, lons, other_lats=None, other_lons=None, dtype=np.float64,
+             chunk_rows=DEFAULT_CHUNK_ROWS):
+    """N x M matrix of km between two point sets (N x N with itself)."""
+    m = len(lons) if other_lons is None else len(other_lons)
+    out = np.empty((len(lats), m), dtype=dtype)
+    for start, block in iter_pairwise(lats, lons, other_lats, other_lons, dtype, chunk_rows):
+        out[start:start + len(block)] = block
+    return out
+
+
+def haversine_scalar(lat1, lon1, lat2, lon2):
+    """km between two points as plain floats.
+
+    numpy has ~1 µs overhead per call, so search loops that need one
+    distance at a time (A* heuristics) use this instead.
+    """
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def benchmark(n=2000, seed=0):
+    """Scalar loop vs pairwise() over n random points around Kolkata."""
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(22.4, 22.95, n)
+    lons = rng.uniform(88.25, 88.5, n)
+
+    sample = min(n, 300)   # the scalar loop is timed on a subset and scaled
+    start = time.perf_counter()
+    loop = [[haversine_scalar(lats[i], lons[i], lats[j], lons[j]) for j in range(n)] for i in range(sample)]
+    loop_s = (time.perf_counter() - start) * n / sample
+
+    results = {"points": n, "scalar_loop_s": loop_s}
+    for dtype in (np.float64, np.float32):
+        start = time.perf_counter()
+        matrix = pairwise(lats, lons, dtype=dtype)
+        seconds = time.perf_counter() - start
+        err = float(np.max(np.abs(matrix[:sample] - np.array(loop))))
+        results[np.dtype(dtype).name] = {"seconds": seconds, "max_abs_err_km": err,
+                                         "bytes": matrix.nbytes}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark vectorized haversine.")
+    parser.add_argument("--points", type=int, default=2000)
+    args = parser.parse_args()
+
+    r = benchmark(args.points)
+    print(f"{r['points']:,} x {r['points']:,} distances")
+    print(f"  python loop      {r['scalar_loop_s'] * 1000:10.1f} ms (extrapolated)")
+    for name in ("float64", "float32"):
+        print(f"  pairwise {name}  {r[name]['seconds'] * 1000:10.1f} ms   "
+              f"max err {r[name]['max_abs_err_km'] * 1000:.2f} m   {r[name]['bytes'] / 1e6:.1f} MB")
@@ -0,0 +1,253 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from fast_forest import FlatForest
+from feature_cache import load_training_features
+from model_comparison import latency_ms
+
+# ============================================================================
+# SUCCESSIVE-HALVING SEARCH FOR THE FARE FOREST
+# ============================================================================
+# Usage:
+#   python hyperparam_search.py --configs 27 --eta 3          # resumes hyperparam_search.jsonl
+#   python hyperparam_search.py --resource trees --latency-weight 5
+#
+# Samples n_configs forests from SEARCH_SPACE and races them in rungs:
+#
+#   rung 0   every config on the smallest budget
+#   rung r   the best 1/eta of rung r-1 on eta x the budget
+#   last     the survivors on the full budget
+#
+# The budget is the training subsample (--resource rows) or the number of
+# trees (--resource trees; the config's n_estimators is scaled down). Trials
+# of a rung run in a process pool over memory-mapped matrices.
+#
+#   objective = validation RMSE + latency_weight x single-row predict ms
+#
+# with the latency measured on the FlatForest the apps serve (p50, so the
+# concurrent fits disturb it little). Search data is the training split of
+# complete_carpool_model.py (test_size=0.20, random_state=42) cut again into
+# fit/validation, so the held-out test rows are never looked at.
+#
+# Every finished trial is appended to the results file at once. Re-running
+# with the same settings and data (the settings record a hash of X and y)
+# skips the trials already there, so an interrupted search resumes where it
+# stopped; different settings or data need another --results.
+# complete_carpool_model.py --tuned trains with the best final-rung config.
+
+RESULTS_PATH = "hyperparam_search.jsonl"
+
+SEARCH_SPACE = {
+    "max_depth": [6, 8, 10, 14, 18, None],
+    "n_estimators": [25, 50, 100, 200, 400],
+    "min_samples_leaf": [1, 2, 5, 10, 20],
+    "max_features": [1.0, 0.7, 0.5, "sqrt"],
+}
+
+
+def sample_configs(n_configs, seed=0, space=SEARCH_SPACE):
+    """n_configs distinct configs drawn from the grid (all of it when smaller)."""
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    rng = np.random.default_rng(seed)
+    picks = rng.permutation(len(grid))[:n_configs]
+    return [grid[i] for i in sorted(picks)]
+
+
+def config_key(config):
+    return json.dumps(config, sort_keys=True)
+
+
+def rung_budgets(n_rungs, eta, min_fraction):
+    """Budget fraction of every rung, ending at 1.0."""
+    return [max(min_fraction, float(eta) ** (r - n_rungs + 1)) for r in range(n_rungs)]
+
+
+# ----- TRIALS -----
+_data = None
+
+
+def _init_worker(data_dir):
+    global _data
+    _data = {name: np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode="r")
+             for name in ("X_fit", "y_fit", "X_val", "y_val")}
+
+
+def _trial(task):
+    """Fit one config on one budget; returns the result record."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    config, rung, fraction, resource, latency_weight, seed = task
+    X_fit, y_fit = _data["X_fit"], _data["y_fit"]
+    params = dict(config)
+    if resource == "rows":
+        n = max(int(len(y_fit) * fraction), 2)
+        rows = np.sort(np.random.default_rng(seed).permutation(len(y_fit))[:n])
+        X_fit, y_fit = X_fit[rows], y_fit[rows]
+    else:
+        params["n_estimators"] = max(1, round(config["n_estimators"] * fraction))
+
+    model = RandomForestRegressor(**params, random_state=seed, n_jobs=1)
+    start = time.perf_counter()
+    model.fit(X_fit, y_fit)
+    fit_s = time.perf_counter() - start
+
+    forest = FlatForest.from_sklearn(model)
+    pred = forest.predict(_data["X_val"])
+    rmse = float(np.sqrt(np.mean((pred - _data["y_val"]) ** 2)))
+    single_ms = latency_ms(forest.predict, _data["X_val"], 1, 50, np.random.default_rng(0))[0]
+    return {"config": config, "rung": rung, "fraction": fraction, "rmse": rmse,
+            "latency_ms": single_ms, "objective": rmse + latency_weight * single_ms,
+            "fit_s": fit_s, "n_trees": forest.n_trees, "n_nodes": forest.n_nodes}
+
+
+# ----- RESULTS FILE -----
+def _settings_id(settings):
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def data_digest(X, y):
+    """Hash of the feature matrix and target, so a changed dataset never resumes."""
+    h = hashlib.sha256()
+    for array in (X, y):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        h.update(str(array.shape).encode())
+        h.update(array.data)
+    return h.hexdigest()[:16]
+
+
+def _records(lines):
+    for line in lines:
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue   # torn line of an interrupted run
+
+
+def _header(f):
+    """Settings header of an open results file, or None when empty or torn."""
+    try:
+        header = json.loads(f.readline())
+    except json.JSONDecodeError:
+        return None
+    return header if isinstance(header, dict) and "settings" in header else None
+
+
+def load_results(path, settings):
+    """Finished trials {(config key, rung): record}; starts the file when missing."""
+    if os.path.exists(path):
+        with open(path) as f:
+            header = _header(f)
+            if header is not None:
+                if header.get("id") != _settings_id(settings):
+                    raise ValueError(f"{path} belongs to a search with other settings "
+                                     f"({header.get('settings')}); pass another --results")
+                return {(config_key(r["config"]), r["rung"]): r for r in _records(f)}
+            if f.read().strip():
+                raise ValueError(f"{path} has no readable settings header; pass another --results")
+        # empty, or the first write was interrupted: nothing to resume
+    with open(path, "w") as f:
+        f.write(json.dumps({"settings": settings, "id": _settings_id(settings)}) + "\n")
+    return {}
+
+
+def best_params(path=RESULTS_PATH, X=None, y=None):
+    """Config of the best trial on the last rung of a results file, or None.
+
+    With X and y, only a search that ran on exactly this data counts.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        header = _header(f)
+        if header is None:
+            return None
+        settings = header["settings"]
+        if X is not None and settings.get("data") != data_digest(X, y):
+            return None
+        records = list(_records(f))
+    final = [r for r in records if r["rung"] == settings["n_rungs"] - 1]
+    return min(final, key=lambda r: r["objective"])["config"] if final else None
+
+
+# ----- SEARCH -----
+def successive_halving(X, y, n_configs=27, eta=3, n_rungs=None, min_fraction=0.05,
+                       resource="rows", latency_weight=0.0, workers=None, seed=0,
+                       results_path=RESULTS_PATH, log=print):
+    """Run (or resume) the search; returns the final-rung records, best first."""
+    from sklearn.model_selection import train_test_split
+
+    if resource not in ("rows", "trees"):
+        raise ValueError("resource must be 'rows' or 'trees'")
+    n_rungs = n_rungs or max(1, int(np.floor(np.log(n_configs) / np.log(eta))) + 1)
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    settings = {"n_configs": n_configs, "eta": eta, "n_rungs": n_rungs, "min_fraction": min_fraction,
+                "resource": resource, "latency_weight": latency_weight, "seed": seed, "n_rows": len(y),
+                "data": data_digest(X, y)}
+    done = load_results(results_path, settings)
+
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.20, random_state=42)
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.25, random_state=seed)
+
+    configs = sample_configs(n_configs, seed)
+    budgets = rung_budgets(n_rungs, eta, min_fraction)
+    data_dir = tempfile.mkdtemp(prefix="hyperparam_search-")
+    try:
+        for name, array in (("X_fit", X_fit), ("y_fit", y_fit), ("X_val", X_val), ("y_val", y_val)):
+            np.save(os.path.join(data_dir, f"{name}.npy"), array)
+        with Pool(workers or os.cpu_count() or 1, initializer=_init_worker, initargs=(data_dir,)) as pool, \
+                open(results_path, "a+") as out:
+            out.seek(0, os.SEEK_END)
+            if out.tell():
+                out.seek(out.tell() - 1)
+                if out.read(1) != "\n":
+                    out.write("\n")
+            for rung, fraction in enumerate(budgets):
+                tasks = [(c, rung, fraction, resource, latency_weight, seed) for c in configs
+                         if (config_key(c), rung) not in done]
+                start = time.perf_counter()
+                for record in pool.imap_unordered(_trial, tasks):
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+                    done[(config_key(record["config"]), rung)] = record
+                ranked = sorted((done[(config_key(c), rung)] for c in configs), key=lambda r: r["objective"])
+                log(f"rung {rung}: {len(configs)} configs at {fraction:.0%} {resource} "
+                    f"({len(configs) - len(tasks)} resumed, {time.perf_counter() - start:.1f}s), "
+                    f"best RMSE {ranked[0]['rmse']:.2f} / {ranked[0]['latency_ms']:.3f} ms")
+                if rung < n_rungs - 1:
+                    configs = [r["config"] for r in ranked[:max(1, len(ranked) // eta)]]
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return ranked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Successive-halving search over the fare forest settings.")
+    parser.add_argument("source", nargs="?", default="car-data-all-locations.csv")
+    parser.add_argument("--configs", type=int, default=27)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--rungs", type=int, default=None, help="default: floor(log_eta(configs)) + 1")
+    parser.add_argument("--min-fraction", type=float, default=0.05)
+    parser.add_argument("--resource", choices=["rows", "trees"], default="rows")
+    parser.add_argument("--latency-weight", type=float, default=0.0, help="RMSE units per ms of latency")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results", default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    X, y, _ = load_training_features(args.source)
+    final = successive_halving(X, y, args.configs, args.eta, args.rungs, args.min_fraction, args.resource,
+                               args.latency_weight, args.workers, args.seed, args.results)
+    for record in final:
+        print(f"  RMSE {record['rmse']:.2f}  {record['latency_ms']:.3f} ms  "
+              f"{record['n_trees']} trees / {record['n_nodes']:,} nodes  {record['config']}")
+    print(f"✅ Best: {final[0]['config']} (results in {args.results})")
@@ -0,0 +1,34 @@
+# ============================================================================
+# LOCATION REGISTRY
+# ============================================================================
+# The pickup/drop points offered by the apps, as (latitude, longitude).
+# Same list as the coords_dict in app3.py-app8.py.
+
+coords_dict = {
+    "Ballygunge":      (22.5226, 88.3715),
+    "Dumdum":          (22.6325, 88.4433),
+    "Garia":           (22.4495, 88.4113),
+    "Howrah":          (22.5892, 88.3104),
+    "Salt Lake":       (22.6065, 88.3963),
+    "Park Street":     (22.5535, 88.3507),
+    "Jadavpur":        (22.4953, 88.3695),
+    "Tollygunge":      (22.5019, 88.3420),
+    "Behala":          (22.5017, 88.3073),
+    "Esplanade":       (22.5637, 88.3508),
+    "Shyambazar":      (22.6133, 88.3735),
+    "Lake Town":       (22.6067, 88.4043),
+    "Kasba":           (22.5204, 88.3882),
+    "Barasat":         (22.7206, 88.4807),
+    "Baguiati":        (22.6135, 88.4277),
+    "Newtown":         (22.5958, 88.4795),
+    "Cossipore":       (22.6297, 88.3625),
+    "Alipore":         (22.5362, 88.3342),
+    "Kankurgachi":     (22.5731, 88.3841),
+    "Sodepur":         (22.6996, 88.3734),
+    "Baranagar":       (22.6613, 88.3794),
+    "Bandel":          (22.9236, 88.3855),
+    "Serampore":       (22.7525, 88.3421),
+    "Beliaghata":      (22.5631, 88.393)
+}
+
+locations = list(coords_dict.keys())
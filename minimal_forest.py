@@ -0,0 +1,111 @@
+import argparse
+import copy
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from fast_forest import FlatForest
+from feature_cache import load_training_features
+from model_comparison import latency_ms
+
+# ============================================================================
+# MINIMAL FOREST BY OUT-OF-BAG ERROR
+# ============================================================================
+# Usage:
+#   python minimal_forest.py --max-trees 200 --step 10 --tolerance 0.01
+#   python complete_carpool_model.py --minimal-forest 0.01    # train + save it
+#
+# Prediction latency and bundle size grow linearly with the number of trees,
+# but the error curve flattens early on a noisy target. grow_minimal_forest()
+# grows one forest step trees at a time (warm_start, so earlier trees are
+# kept, not refitted) and records the out-of-bag RMSE after every step. It
+# then keeps the first n trees, n being the smallest size whose OOB RMSE is
+# within tolerance (relative) of the best size seen.
+#
+# With warm_start the first n trees are exactly the forest that
+# n_estimators=n would have grown, so truncating loses nothing. Sizes at which
+# some training rows have no out-of-bag tree yet (sklearn warns) are recorded
+# but never chosen, since their OOB error is not comparable.
+
+STEP = 10
+TOLERANCE = 0.01
+
+
+def grow_forest(X, y, max_trees=200, step=STEP, **forest_params):
+    """(forest of max_trees trees, OOB curve DataFrame), growing step trees at a time."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    y = np.asarray(y, dtype=np.float64)
+    model = RandomForestRegressor(n_estimators=0, warm_start=True, oob_score=True, bootstrap=True,
+                                  **forest_params)
+    curve = []
+    for n_trees in range(step, max_trees + step, step):
+        model.n_estimators = min(n_trees, max_trees)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            model.fit(X, y)
+        complete = not any("OOB" in str(w.message) for w in caught)
+        rmse = float(np.sqrt(np.mean((model.oob_prediction_ - y) ** 2)))
+        curve.append({"n_trees": model.n_estimators, "oob_r2": float(model.oob_score_),
+                      "oob_rmse": rmse, "complete": complete})
+    model.warm_start = False
+    return model, pd.DataFrame(curve)
+
+
+def minimal_size(curve, tolerance=TOLERANCE):
+    """Smallest n_trees whose OOB RMSE is within tolerance of the best one."""
+    usable = curve[curve["complete"]] if curve["complete"].any() else curve
+    limit = usable["oob_rmse"].min() * (1 + tolerance)
+    return int(usable.loc[usable["oob_rmse"] <= limit, "n_trees"].iloc[0])
+
+
+def truncate_forest(model, n_trees, curve=None):
+    """Copy of model keeping its first n_trees trees."""
+    small = copy.copy(model)
+    small.estimators_ = model.estimators_[:n_trees]
+    small.n_estimators = n_trees
+    if hasattr(small, "oob_prediction_"):
+        del small.oob_prediction_   # belonged to the full-size forest
+    if curve is not None:
+        small.oob_score_ = float(curve.loc[curve["n_trees"] == n_trees, "oob_r2"].iloc[0])
+    return small
+
+
+def grow_minimal_forest(X, y, max_trees=200, step=STEP, tolerance=TOLERANCE, **forest_params):
+    """(forest cut to the minimal size, full-size forest, OOB curve)."""
+    full, curve = grow_forest(X, y, max_trees, step, **forest_params)
+    return truncate_forest(full, minimal_size(curve, tolerance), curve), full, curve
+
+
+def serving_cost(model, X, batch_rows=1000, repeats=200):
+    """Trees, KB and single-row / batch predict p50 (ms) of the served FlatForest."""
+    forest = FlatForest.from_sklearn(model)
+    X = np.asarray(X, dtype=np.float64)
+    return {"trees": forest.n_trees, "kb": forest.nbytes / 1e3,
+            "single_ms": latency_ms(forest.predict, X, 1, repeats, np.random.default_rng(0))[0],
+            "batch_ms": latency_ms(forest.predict, X, batch_rows, 20, np.random.default_rng(0))[0]}
+
+
+if __name__ == "__main__":
+    from sklearn.model_selection import train_test_split
+
+    parser = argparse.ArgumentParser(description="Smallest forest within tolerance of the best OOB error.")
+    parser.add_argument("source", nargs="?", default="car-data-all-locations.csv")
+    parser.add_argument("--max-trees", type=int, default=200)
+    parser.add_argument("--step", type=int, default=STEP)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="relative OOB RMSE slack")
+    parser.add_argument("--max-depth", type=int, default=14)
+    args = parser.parse_args()
+
+    X, y, _ = load_training_features(args.source)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.20, random_state=42)
+    model, full, curve = grow_minimal_forest(X_train, y_train, args.max_trees, args.step, args.tolerance,
+                                             max_depth=args.max_depth, random_state=42)
+    print(curve.to_string(index=False))
+
+    for label, m in (("full", full), ("minimal", model)):
+        cost = serving_cost(m, X_test)
+        rmse = float(np.sqrt(np.mean((m.predict(X_test) - np.asarray(y_test)) ** 2)))
+        print(f"{label:>8}: {cost['trees']:4d} trees  test RMSE {rmse:.2f}  {cost['kb']:8.0f} KB  "
+              f"single row {cost['single_ms']:.3f} ms  batch {cost['batch_ms']:.2f} ms")
@@ -0,0 +1,188 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+from category_encoder import CategoryEncoder
+from fast_forest import FlatForest
+
+# ============================================================================
+# VERSIONED MODEL BUNDLE
+# ============================================================================
+# One directory replaces carpool_model.pkl + encoders.pkl + model_columns.pkl
+# for serving:
+#
+#   carpool_model_bundle -> carpool_model_bundle.<id>/     (symlink)
+#       manifest.json     format version, columns, encoder vocabularies,
+#                         feature defaults, training metadata, content hash
+#       feature.npy ...   one raw .npy buffer per FlatForest array
+#
+# Arrays are opened with np.load(mmap_mode="r"), so loading only maps the
+# files: pages are read lazily on first use and every app process maps the
+# same page-cache pages instead of unpickling its own private copy.
+#
+# Every save writes a new version directory and then repoints the symlink
+# with one os.replace, so a reader finds either the old or the new bundle,
+# never a missing or half-written one. load_bundle() resolves the link once
+# and reads manifest and arrays from the same version. The previous version
+# is kept for readers that resolved the link just before the swap; older
+# ones are removed, and a reader that still lands on one resolves again.
+
+BUNDLE_DIR = "carpool_model_bundle"
+BUNDLE_VERSION = 1
+QUANTIZED_BUNDLE_VERSION = 2   # uint16 leaf codes; older readers would misread them
+MANIFEST_NAME = "manifest.json"
+
+
+def _content_hash(arrays, manifest_fields):
+    """sha256 over the forest arrays and everything that affects prediction."""
+    h = hashlib.sha256()
+    h.update(json.dumps(manifest_fields, sort_keys=True).encode())
+    for name in FlatForest.ARRAY_NAMES:
+        arr = np.ascontiguousarray(arrays[name])
+        h.update(f"{name}:{arr.dtype.str}:{arr.shape}".encode())
+        h.update(arr.data)
+    return h.hexdigest()
+
+
+def save_bundle(forest, columns, vocabularies, feature_defaults=None, metadata=None,
+                path=BUNDLE_DIR):
+    """Write a bundle directory and return its manifest.
+
+    vocabularies maps each encoded column to its ordered class list (the
+    position of a class is its code, as with LabelEncoder.classes_).
+    """
+    arrays = forest.arrays()
+    fields = {
+        "columns": [str(c) for c in columns],
+        "vocabularies": {col: [str(v) for v in vocab] for col, vocab in vocabularies.items()},
+        "feature_defaults": feature_defaults or {},
+        "forest": {"max_depth": forest.max_depth, "n_features": forest.n_features,
+                   "n_trees": forest.n_trees, "n_nodes": forest.n_nodes},
+    }
+    if forest.quantized:
+        fields["forest"].update(value_scale=forest.value_scale, value_offset=forest.value_offset)
+    manifest = {
+        "format_version": QUANTIZED_BUNDLE_VERSION if forest.quantized else BUNDLE_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        **fields,
+        "metadata": metadata or {},
+        "content_hash": _content_hash(arrays, fields),
+    }
+
+    path = os.path.normpath(path)
+    version = tempfile.mkdtemp(prefix=os.path.basename(path) + ".", dir=os.path.dirname(path) or ".")
+    os.chmod(version, 0o755)   # mkdtemp makes it private to the training user
+    for name, arr in arrays.items():
+        np.save(os.path.join(version, f"{name}.npy"), np.ascontiguousarray(arr))
+    with open(os.path.join(version, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    _swap_in(version, path)
+    return manifest
+
+
+def _swap_in(version, path):
+    """Point path at the version directory; keep only the previous version besides it."""
+    previous = os.path.realpath(path) if os.path.islink(path) else None
+    if os.path.isdir(path) and not os.path.islink(path):
+        # Bundle saved before versioned directories: it becomes the previous version
+        previous = version + ".previous"
+        os.replace(path, previous)
+    link = version + ".link"
+    try:
+        os.symlink(os.path.basename(version), link, target_is_directory=True)
+        os.replace(link, path)
+    except OSError:
+        # No symlinks (Windows without the privilege): path stays a plain
+        # directory and is replaced by a rename
+        os.replace(version, path)
+
+    keep = {os.path.realpath(path), previous and os.path.realpath(previous)}
+    for old in glob.glob(glob.escape(path) + ".*"):
+        if os.path.islink(old):
+            os.remove(old)   # link left by an interrupted save
+        elif os.path.isdir(old) and os.path.realpath(old) not in keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def read_manifest(path=BUNDLE_DIR):
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") not in (BUNDLE_VERSION, QUANTIZED_BUNDLE_VERSION):
+        raise ValueError(
+            f"Unsupported model bundle version {manifest.get('format_version')} "
+            f"(expected {BUNDLE_VERSION} or {QUANTIZED_BUNDLE_VERSION}); retrain with complete_carpool_model.py"
+        )
+    return manifest
+
+
+def bundle_hash(path=BUNDLE_DIR):
+    """Content hash of the bundle on disk, without touching the arrays."""
+    return read_manifest(path)["content_hash"]
+
+
+class ModelBundle:
+    """A loaded bundle: the flat forest plus everything needed to build its inputs."""
+
+    def __init__(self, manifest, forest, path):
+        self.manifest = manifest
+        self.forest = forest
+        self.path = path
+        self.columns = manifest["columns"]
+        self.vocabularies = manifest["vocabularies"]
+        self.feature_defaults = manifest["feature_defaults"]
+        self.metadata = manifest["metadata"]
+        self.content_hash = manifest["content_hash"]
+        self.encoders = {col: CategoryEncoder(vocab) for col, vocab in self.vocabularies.items()}
+
+    def predict(self, X):
+        return self.forest.predict(X)
+
+
+def load_bundle(path=BUNDLE_DIR, mmap=True, verify=False):
+    """Open a bundle. With mmap=True the arrays are read-only memory maps.
+
+    verify=True recomputes the content hash, which reads every page.
+    """
+    mmap_mode = "r" if mmap else None
+    while True:
+        version = os.path.realpath(path)   # one version even if a save swaps the link meanwhile
+        try:
+            manifest = read_manifest(version)
+            arrays = {name: np.load(os.path.join(version, f"{name}.npy"), mmap_mode=mmap_mode)
+                      for name in FlatForest.ARRAY_NAMES}
+            break
+        except FileNotFoundError:
+            if os.path.realpath(path) == version:
+                raise
+            # the version was removed by later saves; read the current one
+
+    if verify:
+        fields = {k: manifest[k] for k in ("columns", "vocabularies", "feature_defaults", "forest")}
+        if _content_hash(arrays, fields) != manifest["content_hash"]:
+            raise ValueError(f"Model bundle at {path} does not match its content hash")
+
+    forest = FlatForest.from_arrays(arrays, max_depth=manifest["forest"]["max_depth"],
+                                    n_features=manifest["forest"]["n_features"],
+                                    value_scale=manifest["forest"].get("value_scale"),
+                                    value_offset=manifest["forest"].get("value_offset", 0.0))
+    return ModelBundle(manifest, forest, path)
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    bundle = load_bundle()
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"Bundle:  {bundle.path}  (format v{bundle.manifest['format_version']})")
+    print(f"Hash:    {bundle.content_hash}")
+    print(f"Forest:  {bundle.forest.n_trees} trees, {bundle.forest.n_nodes} nodes, "
+          f"{bundle.forest.nbytes / 1e6:.2f} MB mapped")
+    print(f"Columns: {bundle.columns}")
+    print(f"Loaded in {load_ms:.1f} ms")
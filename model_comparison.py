@@ -0,0 +1,180 @@
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from fast_forest import FlatForest
+from feature_cache import load_training_features
+
+# ============================================================================
+# MODEL COMPARISON: ACCURACY vs SERVING COST
+# ============================================================================
+# Usage:
+#   python model_comparison.py                       # all candidates -> model_comparison.csv
+#   python model_comparison.py --workers 2 --only "Linear Regression" "Random Forest (200 trees)"
+#
+# Trains every candidate in CANDIDATES in its own pool process and writes one
+# row per model to model_comparison.csv:
+#
+#   Train/Test R2, MAE, RMSE        accuracy, as before
+#   Fit_s                           wall-clock fit time
+#   Single_p50_ms / Single_p99_ms   predict() on one row (what the apps do)
+#   Batch_p50_ms / Batch_p99_ms     predict() on batch_rows rows
+#   Size_KB                         pickled size of the serving predictor
+#   Peak_RSS_MB                     peak resident memory of the worker process
+#   Pareto                          not beaten on Test_RMSE, Single_p99_ms and
+#                                   Size_KB by any other candidate at once
+#
+# The train/test matrices are written once as .npy files and every worker
+# memory-maps them read-only, so N concurrent fits share one copy of the
+# data. Each worker handles a single model (maxtasksperchild=1), which keeps
+# Peak_RSS_MB per model. Workers send back the pickled predictor and the
+# latencies are measured afterwards in this process, one model at a time, so
+# concurrent fits do not distort them. Forests are timed and sized as the
+# FlatForest the apps serve; other models as fitted.
+
+COMPARISON_PATH = "model_comparison.csv"
+
+# name -> (estimator factory, serve as FlatForest)
+CANDIDATES = {
+    "Linear Regression": (lambda: _sk("linear_model", "LinearRegression")(), False),
+    "Ridge Regression (α=1.0)": (lambda: _sk("linear_model", "Ridge")(alpha=1.0), False),
+    "Lasso Regression (α=0.1)": (lambda: _sk("linear_model", "Lasso")(alpha=0.1), False),
+    "Random Forest (200 trees)": (lambda: _sk("ensemble", "RandomForestRegressor")(
+        n_estimators=200, max_depth=14, random_state=42, n_jobs=1), True),
+    "Gradient Boosting (100 trees)": (lambda: _sk("ensemble", "GradientBoostingRegressor")(
+        n_estimators=100, random_state=42), False),
+}
+
+
+def _sk(module, name):
+    import importlib
+
+    return getattr(importlib.import_module(f"sklearn.{module}"), name)
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:   # Windows
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3   # bytes on macOS, KB elsewhere
+
+
+def latency_ms(predict, X, rows, repeats, rng):
+    """p50/p99 of predict() over repeats calls on random row blocks of X."""
+    predict(np.ascontiguousarray(X[:rows]))   # warm-up
+    times = []
+    for start in rng.integers(0, max(len(X) - rows, 0) + 1, repeats):
+        block = np.ascontiguousarray(X[start:start + rows])
+        t0 = time.perf_counter()
+        predict(block)
+        times.append((time.perf_counter() - t0) * 1000)
+    return float(np.percentile(times, 50)), float(np.percentile(times, 99))
+
+
+# ----- WORKER -----
+_data = None
+
+
+def _init_worker(data_dir):
+    global _data
+    _data = {name: np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode="r")
+             for name in ("X_train", "X_test", "y_train", "y_test")}
+
+
+def _evaluate(name):
+    """Fit one candidate on the shared matrices; (metrics row, pickled predictor)."""
+    from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
+
+    factory, flat = CANDIDATES[name]
+    X_train, X_test, y_train, y_test = (_data[k] for k in ("X_train", "X_test", "y_train", "y_test"))
+
+    model = factory()
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+
+    predictor = FlatForest.from_sklearn(model) if flat else model
+    row = {"Model": name}
+    for split, X, y in (("Train", X_train, y_train), ("Test", X_test, y_test)):
+        pred = predictor.predict(X)
+        row[f"{split}_R2"] = round(float(r2_score(y, pred)), 4)
+        row[f"{split}_MAE"] = round(float(mean_absolute_error(y, pred)), 2)
+        row[f"{split}_RMSE"] = round(float(np.sqrt(mean_squared_error(y, pred))), 2)
+    row["Fit_s"] = round(fit_s, 3)
+    row["Peak_RSS_MB"] = round(_peak_rss_mb(), 1)
+    return row, pickle.dumps(predictor, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+# ----- PARETO FRONT -----
+def pareto_front(df, objectives=("Test_RMSE", "Single_p99_ms", "Size_KB")):
+    """Boolean Series: True where no other row is <= on every objective and < on one."""
+    values = df[list(objectives)].to_numpy(np.float64)
+    no_worse = (values[None, :, :] <= values[:, None, :]).all(axis=2)
+    better = (values[None, :, :] < values[:, None, :]).any(axis=2)
+    return pd.Series(~(no_worse & better).any(axis=1), index=df.index)
+
+
+def compare_models(X, y, names=None, workers=None, test_size=0.20, random_state=42,
+                   single_repeats=300, batch_rows=1000, batch_repeats=30):
+    """Fit the candidates concurrently; DataFrame with one row per model."""
+    from sklearn.model_selection import train_test_split
+
+    names = list(names or CANDIDATES)
+    unknown = [n for n in names if n not in CANDIDATES]
+    if unknown:
+        raise KeyError(f"unknown candidates: {unknown}")
+    X_train, X_test, y_train, y_test = train_test_split(
+        np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64),
+        test_size=test_size, random_state=random_state)
+
+    data_dir = tempfile.mkdtemp(prefix="model_comparison-")
+    try:
+        for name, array in (("X_train", X_train), ("X_test", X_test), ("y_train", y_train), ("y_test", y_test)):
+            np.save(os.path.join(data_dir, f"{name}.npy"), array)
+        workers = min(workers or os.cpu_count() or 1, len(names))
+        with Pool(workers, initializer=_init_worker, initargs=(data_dir,), maxtasksperchild=1) as pool:
+            results = pool.map(_evaluate, names, chunksize=1)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    rows = []
+    for row, blob in results:
+        predictor = pickle.loads(blob)
+        rng = np.random.default_rng(0)
+        single = latency_ms(predictor.predict, X_test, 1, single_repeats, rng)
+        batch = latency_ms(predictor.predict, X_test, batch_rows, batch_repeats, rng)
+        rows.append({**row,
+                     "Single_p50_ms": round(single[0], 4), "Single_p99_ms": round(single[1], 4),
+                     "Batch_p50_ms": round(batch[0], 3), "Batch_p99_ms": round(batch[1], 3),
+                     "Size_KB": round(len(blob) / 1e3, 1)})
+    df = pd.DataFrame(rows)
+    df["Pareto"] = pareto_front(df)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare candidate fare models on accuracy and serving cost.")
+    parser.add_argument("source", nargs="?", default="car-data-all-locations.csv")
+    parser.add_argument("--only", nargs="+", default=None, metavar="MODEL", help="subset of CANDIDATES")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-rows", type=int, default=1000)
+    parser.add_argument("--output", default=COMPARISON_PATH)
+    args = parser.parse_args()
+
+    X, y, _ = load_training_features(args.source)
+    results = compare_models(X, y, args.only, args.workers, batch_rows=args.batch_rows)
+    results.to_csv(args.output, index=False)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(results.drop(columns=["Train_R2", "Train_MAE", "Train_RMSE"]).to_string(index=False))
+    print(f"✅ {len(results)} models compared -> {args.output} "
+          f"(Pareto front: {', '.join(results.loc[results['Pareto'], 'Model'])})")
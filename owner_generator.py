@@ -0,0 +1,75 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# SYNTHETIC RIDE OWNERS
+# ============================================================================
+# The listing data has no driver columns, so the apps invent an owner name,
+# an availability time and a rating for every row. generate_owners() draws
+# all three for n rows in one shot:
+#
+#   owners = generate_owners(len(df), seed=OWNER_SEED)
+#   df[owners.columns] = owners
+#
+# Owner_Name and Availability are categoricals over the small base
+# vocabularies (first x surname, 18 hours x 4 quarter hours), so a million
+# rows cost a few MB of integer codes instead of a million strings. The same
+# seed always gives the same listings.
+
+OWNER_SEED = 2025
+
+FIRST_NAMES = ('Aarav', 'Aditya', 'Arjun', 'Aryan', 'Ashok', 'Amit', 'Anand', 'Atul',
+               'Bhuvan', 'Bhavesh', 'Chirag', 'Chetan', 'Deepak', 'Devendra', 'Dhruv',
+               'Farhan', 'Fahim', 'Gaurav', 'Girish', 'Harsh', 'Harish', 'Ishan',
+               'Jayesh', 'Jayadev', 'Karan', 'Krishan', 'Lalit', 'Mahesh', 'Manish',
+               'Mohan', 'Naveen', 'Nilesh', 'Nikhil', 'Omkar', 'Pankaj', 'Prakash',
+               'Rahul', 'Rajesh', 'Ravi', 'Sandeep', 'Suresh', 'Sanjay', 'Tarun',
+               'Tushar', 'Varun', 'Vikram', 'Vikas', 'Vinay', 'Vivek', 'Wasim', 'Yash')
+
+SURNAMES = ('Singh', 'Kumar', 'Sharma', 'Patel', 'Gupta', 'Verma', 'Pandey', 'Mishra',
+            'Desai', 'Rao', 'Reddy', 'Roy', 'Ghosh', 'Dutta', 'Banerjee', 'Bhattacharya',
+            'Mukherjee', 'Das', 'Nair', 'Menon', 'Iyer', 'Iyengar', 'Krishnan', 'Pillay',
+            'Srivastava', 'Jain', 'Malhotra', 'Kapoor', 'Grover', 'Ahuja', 'Chopra',
+            'Khanna', 'Bhatia', 'Mittal', 'Saxena', 'Mehra', 'Kohli', 'Sethi', 'Talwar',
+            'Sinha', 'Bose', 'Dey', 'Chattopadhyay', 'Sen', 'Dasgupta', 'Nag', 'Bagchi',
+            'Mitra', 'Sarkar', 'Chatterjee', 'Basu', 'Saha')
+
+HOURS = range(6, 24)
+MINUTES = (0, 15, 30, 45)
+RATING_RANGE = (3.5, 5.0)
+
+
+def generate_owners(n, seed=None, first_names=FIRST_NAMES, surnames=SURNAMES):
+    """DataFrame of n rows: Owner_Name, Availability (categorical) and Rating."""
+    rng = np.random.default_rng(seed)
+
+    name_categories = [f"{first} {last}" for first in first_names for last in surnames]
+    name_codes = rng.integers(0, len(first_names), n) * len(surnames) + rng.integers(0, len(surnames), n)
+
+    time_categories = [f"{hour:02d}:{minute:02d}" for hour in HOURS for minute in MINUTES]
+    time_codes = rng.integers(0, len(time_categories), n)
+
+    ratings = np.round(rng.uniform(*RATING_RANGE, n), 1)
+
+    return pd.DataFrame({
+        "Owner_Name": pd.Categorical.from_codes(name_codes, categories=name_categories),
+        "Availability": pd.Categorical.from_codes(time_codes, categories=time_categories),
+        "Rating": ratings,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the synthetic owner generator.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=OWNER_SEED)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    owners = generate_owners(args.rows, args.seed)
+    seconds = time.perf_counter() - start
+    print(f"{args.rows:,} owners in {seconds * 1000:.0f} ms, "
+          f"{owners.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    print(owners.head())
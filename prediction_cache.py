@@ -0,0 +1,157 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from model_bundle import load_bundle, read_manifest, BUNDLE_DIR, MANIFEST_NAME
+
+# ============================================================================
+# LRU PREDICTION CACHE
+# ============================================================================
+# Most searches repeat the same popular routes, so the forest keeps being
+# asked the same question. PredictionCache keys each request on a canonical,
+# quantized feature tuple (encoded pickup/drop, distance rounded to
+# distance_step_km, the other encoded features) and remembers the fare.
+#
+# A miss predicts at the quantized distance, so every request that maps to a
+# key gets the same fare no matter which one came first.
+#
+# Eviction: least-recently-used once max_entries or max_bytes is exceeded,
+# and entries older than ttl_s are dropped on access. The cache watches the
+# bundle's manifest and clears itself when a new model is saved.
+#
+# One instance is shared by every Streamlit session (st.cache_resource), so
+# the entries, byte count and counters only change under self._lock. The
+# forest runs outside it.
+
+DISTANCE_COLUMN = "travelling distance(km)"
+ENTRY_OVERHEAD_BYTES = 100   # OrderedDict node + tuple wrapper, roughly
+
+
+class PredictionCache:
+    """Bounded LRU/TTL cache of fares keyed on quantized feature vectors."""
+
+    def __init__(self, bundle_path=BUNDLE_DIR, max_entries=50_000, max_bytes=32 << 20,
+                 ttl_s=None, distance_step_km=0.1, check_every_s=5.0):
+        self.bundle_path = bundle_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.distance_step_km = distance_step_km
+        self.check_every_s = check_every_s
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (fare, stored_at, size)
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+        self.bundle = load_bundle(bundle_path)
+        self._manifest_mtime = self._read_mtime()
+        self._last_check = time.monotonic()
+
+    # ----- keys -----
+    def make_key(self, request):
+        """Canonical feature tuple for a raw request dict (names, km, ...)."""
+        bundle = self.bundle
+        key = []
+        for col in bundle.columns:
+            value = request.get(col)
+            if value is None:
+                value = bundle.feature_defaults[col]
+            if col in bundle.encoders:
+                value = bundle.encoders[col].transform_one(value)
+            elif col == DISTANCE_COLUMN:
+                value = round(round(float(value) / self.distance_step_km) * self.distance_step_km, 6)
+            else:
+                value = float(value)
+            key.append(value)
+        return tuple(key)
+
+    # ----- lookups -----
+    def predict(self, request):
+        """Fare for one raw request, from the cache when possible."""
+        with self._lock:
+            self._check_bundle()
+            bundle = self.bundle
+            key = self.make_key(request)
+            now = time.monotonic()
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                fare, stored_at, size = entry
+                if self.ttl_s is None or now - stored_at <= self.ttl_s:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return fare
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+
+        fare = float(bundle.predict(np.array([key], dtype=np.float64))[0])
+        with self._lock:
+            if bundle is self.bundle:   # not if the model was swapped meanwhile
+                self._store(key, fare, now)
+        return fare
+
+    # _store, _remove and _check_bundle expect the caller to hold self._lock
+    def _store(self, key, fare, now):
+        if key in self._entries:
+            self._remove(key)
+        size = sys.getsizeof(key) + sum(sys.getsizeof(v) for v in key) + ENTRY_OVERHEAD_BYTES
+        self._entries[key] = (fare, now, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    # ----- invalidation -----
+    def _read_mtime(self):
+        try:
+            return os.stat(os.path.join(self.bundle_path, MANIFEST_NAME)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _check_bundle(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_every_s:
+            return
+        self._last_check = now
+        mtime = self._read_mtime()
+        if mtime is None or mtime == self._manifest_mtime:
+            return
+        self._manifest_mtime = mtime
+        if read_manifest(self.bundle_path)["content_hash"] != self.bundle.content_hash:
+            self.bundle = load_bundle(self.bundle_path)
+            self._clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "model": self.bundle.content_hash[:12],
+            }
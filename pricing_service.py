@@ -0,0 +1,218 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+
+import pandas as pd
+
+from fare_predictor import predict_fares
+from model_bundle import load_bundle, BUNDLE_DIR
+
+# ============================================================================
+# ASYNCIO PRICING MICROSERVICE
+# ============================================================================
+# Usage:
+#   python pricing_service.py --port 8080 --max-batch-size 64 --max-wait-us 2000
+#
+# Endpoints (JSON over HTTP/1.1, keep-alive supported):
+#   POST /predict   one ride request object -> {"predicted_fare": 231.4}
+#                   or a list of them       -> {"predicted_fares": [...]}
+#   GET  /health    liveness plus batching counters
+#   GET  /ready     200 once the model is loaded and the batcher is running
+#
+# Concurrent requests are queued and answered in micro-batches: a batch is
+# flushed as soon as it holds max_batch_size requests, or max_wait_us after
+# its first request arrived, whichever comes first. A request that arrives
+# while the queue is idle therefore waits at most max_wait_us, and under load
+# batches fill up without waiting at all. Each batch is one predict_fares()
+# call, run in a worker thread so the event loop keeps accepting requests.
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_US = 2000
+MAX_BODY_BYTES = 1 << 20
+
+
+class MicroBatcher:
+    """Collects single requests into batches and prices each batch in one call."""
+
+    def __init__(self, bundle, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_us=DEFAULT_MAX_WAIT_US):
+        self.bundle = bundle
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1e6
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.requests = 0
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def submit(self, record):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((record, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            records = [record for record, _ in batch]
+            try:
+                frame = pd.DataFrame(records, index=pd.RangeIndex(len(records)))
+                fares = await loop.run_in_executor(None, predict_fares, frame, self.bundle)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+            for (_, future), fare in zip(batch, fares):
+                if not future.done():
+                    future.set_result(None if math.isnan(fare) else round(float(fare), 2))
+
+
+class PricingService:
+    def __init__(self, bundle_path=BUNDLE_DIR, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_us=DEFAULT_MAX_WAIT_US):
+        self.bundle_path = bundle_path
+        self.max_batch_size = max_batch_size
+        self.max_wait_us = max_wait_us
+        self.batcher = None
+        self.started_at = time.time()
+
+    async def start(self, host="127.0.0.1", port=8080):
+        bundle = load_bundle(self.bundle_path)
+        self.batcher = MicroBatcher(bundle, self.max_batch_size, self.max_wait_us)
+        self.batcher.start()
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    # ----- HTTP handling -----
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = headers.get("connection", "").lower() != "close" and \
+                    version.strip() == "HTTP/1.1"
+                status, payload = await self._route(method, path.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  413: "Payload Too Large", 500: "Internal Server Error",
+                  503: "Service Unavailable"}[status]
+        body = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _route(self, method, path, body):
+        if path == "/health":
+            return 200, {
+                "status": "ok",
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "requests": self.batcher.requests if self.batcher else 0,
+                "batches": self.batcher.batches if self.batcher else 0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_us": self.max_wait_us,
+            }
+        if path == "/ready":
+            if self.batcher and self.batcher.running:
+                return 200, {"ready": True, "model": self.batcher.bundle.content_hash}
+            return 503, {"ready": False}
+        if path != "/predict":
+            return 404, {"error": f"unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return 400, {"error": "body must be JSON"}
+        try:
+            if isinstance(data, dict):
+                return 200, {"predicted_fare": await self.batcher.submit(data)}
+            if isinstance(data, list) and all(isinstance(r, dict) for r in data):
+                fares = await asyncio.gather(*(self.batcher.submit(r) for r in data))
+                return 200, {"predicted_fares": list(fares)}
+        except Exception as e:
+            return 500, {"error": f"prediction failed: {e}"}
+        return 400, {"error": "body must be a request object or a list of them"}
+
+
+async def serve(host, port, bundle_path, max_batch_size, max_wait_us):
+    service = PricingService(bundle_path, max_batch_size, max_wait_us)
+    server = await service.start(host, port)
+    print(f"✅ Pricing service on http://{host}:{port} "
+          f"(max batch {max_batch_size}, max wait {max_wait_us} µs)")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-batching fare prediction service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--bundle", default=BUNDLE_DIR, help="model bundle directory")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-us", type=int, default=DEFAULT_MAX_WAIT_US,
+                        help="longest a request waits for its batch to fill (microseconds)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.bundle, args.max_batch_size, args.max_wait_us))
+    except KeyboardInterrupt:
+        pass
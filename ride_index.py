@@ -0,0 +1,108 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# RIDE INVENTORY INDEX
+# ============================================================================
+# Ride search used to filter the whole listing table with two boolean masks
+# per click (plus a third scan for the pickup-only fallback). RideIndex is
+# built once when the listings are loaded and maps
+#
+#   (pickup, drop) -> row positions        pickup -> row positions
+#
+# Positions are ascending, i.e. in listing order, and are slices of one
+# sorted int64 array per key type, so the index costs 8 bytes per row per
+# key type. A search is a dict lookup plus df.iloc on the result:
+#
+#   index = RideIndex(df)
+#   route_data = df.iloc[index.search(pickup, drop)]
+
+PICKUP_COLUMN = "pickup location"
+DROP_COLUMN = "drop location"
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+def _group_positions(codes, keys):
+    """{key: ascending positions of rows with that code}; code -1 (NaN) is skipped."""
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    uniq, starts = np.unique(sorted_codes, return_index=True)
+    ends = np.append(starts[1:], len(sorted_codes))
+    return {keys(code): order[start:end]
+            for code, start, end in zip(uniq.tolist(), starts.tolist(), ends.tolist()) if code >= 0}
+
+
+class RideIndex:
+    """Row positions of listed rides per (pickup, drop) pair and per pickup."""
+
+    def __init__(self, df, pickup_column=PICKUP_COLUMN, drop_column=DROP_COLUMN):
+        pickup_codes, pickups = pd.factorize(df[pickup_column])
+        drop_codes, drops = pd.factorize(df[drop_column])
+        pickup_codes = pickup_codes.astype(np.int64)
+        drop_codes = drop_codes.astype(np.int64)
+        n_drops = max(len(drops), 1)
+
+        route_codes = np.where((pickup_codes < 0) | (drop_codes < 0), -1,
+                               pickup_codes * n_drops + drop_codes)
+        self.routes = _group_positions(route_codes,
+                                       lambda c: (pickups[c // n_drops], drops[c % n_drops]))
+        self.pickups = _group_positions(pickup_codes, lambda c: pickups[c])
+        self.n_rows = len(df)
+
+    def route(self, pickup, drop):
+        """Positions of rides from pickup to drop."""
+        return self.routes.get((pickup, drop), _EMPTY)
+
+    def from_pickup(self, pickup):
+        """Positions of all rides leaving pickup."""
+        return self.pickups.get(pickup, _EMPTY)
+
+    def search(self, pickup, drop, limit=None):
+        """Rides on the route, or every ride from pickup if the route has none."""
+        positions = self.route(pickup, drop)
+        if len(positions) == 0:
+            positions = self.from_pickup(pickup)
+        return positions if limit is None else positions[:limit]
+
+
+def benchmark(n_rows=1_000_000, n_locations=24, n_queries=200, seed=0):
+    """Boolean-mask search vs RideIndex on a synthetic listing table."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Location {i}" for i in range(n_locations)], dtype=object)
+    df = pd.DataFrame({PICKUP_COLUMN: names[rng.integers(0, n_locations, n_rows)],
+                       DROP_COLUMN: names[rng.integers(0, n_locations, n_rows)],
+                       "seats": rng.integers(4, 8, n_rows)})
+    queries = [tuple(names[rng.integers(0, n_locations, 2)]) for _ in range(n_queries)]
+
+    start = time.perf_counter()
+    index = RideIndex(df)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    masked = [df[(df[PICKUP_COLUMN] == p) & (df[DROP_COLUMN] == d)].head(6) for p, d in queries]
+    mask_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [df.iloc[index.search(p, d, limit=6)] for p, d in queries]
+    index_s = time.perf_counter() - start
+
+    same = all(a.index.equals(b.index) for a, b in zip(masked, indexed) if len(a))
+    return {"rows": n_rows, "queries": n_queries, "build_s": build_s,
+            "mask_ms": mask_s * 1000 / n_queries, "index_ms": index_s * 1000 / n_queries,
+            "identical": same}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ride inventory index.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    r = benchmark(args.rows)
+    print(f"{r['rows']:,} listed rides (index built in {r['build_s'] * 1000:.0f} ms)")
+    print(f"  boolean masks  {r['mask_ms']:8.3f} ms/search")
+    print(f"  RideIndex      {r['index_ms']:8.3f} ms/search")
+    print(f"  same rides: {r['identical']}")
@@ -0,0 +1,591 @@
+import argparse
+import heapq
+import os
+import time
+from math import radians, cos
+
+import numpy as np
+
+from geo import haversine, haversine_scalar
+from locations import coords_dict
+from route_cache import _route_response
+from spatial_index import GridIndex
+
+# ============================================================================
+# OFFLINE ROAD ROUTING ENGINE
+# ============================================================================
+# When ORS is unreachable the apps used to fall back to a fixed 12 km route.
+# OfflineRouter answers the same directions() call from a local road graph:
+#
+#   road_graph.npz      node_lat[N], node_lon[N]             (float32)
+#                       indptr[N+1], targets[E]              (int32, CSR)
+#                       length_m[E], duration_s[E]           (float32)
+#   road_graph_ch.npz   optional contraction hierarchy over duration_s
+#
+# Queries snap both endpoints to the nearest graph node (through a GridIndex
+# over the nodes) and return the fastest path (distance, duration and a
+# LineString through the nodes); the straight legs from each pin to its node
+# count in both distance and duration, at PIN_LEG_SPEED_KMPH:
+#
+#   - A* over duration with a straight-line / top-speed lower bound, or
+#     bidirectional Dijkstra, on the plain graph;
+#   - with a hierarchy, a bidirectional upward search that settles a few
+#     hundred nodes instead of most of the city.
+#
+# Build a graph from a node/edge CSV export (e.g. OSM via osmnx) or, for
+# development without map data, a synthetic street grid over the registry:
+#   python road_router.py build --nodes nodes.csv --edges edges.csv
+#   python road_router.py build --synthetic
+#   python road_router.py contract
+#   python road_router.py route Garia Howrah
+
+ROAD_GRAPH_PATH = "road_graph.npz"
+ROAD_CH_PATH = "road_graph_ch.npz"
+PIN_LEG_SPEED_KMPH = 25.0   # same as the default edge speed in graph_from_csv()
+
+
+def _haversine_m(lat1, lon1, lat2, lon2):
+    return haversine_scalar(lat1, lon1, lat2, lon2) * 1000
+
+
+# ----- ROAD GRAPH -----
+class RoadGraph:
+    """Directed road network in CSR form."""
+
+    ARRAY_NAMES = ("node_lat", "node_lon", "indptr", "targets", "length_m", "duration_s")
+
+    def __init__(self, node_lat, node_lon, indptr, targets, length_m, duration_s):
+        self.node_lat = np.asarray(node_lat, dtype=np.float32)
+        self.node_lon = np.asarray(node_lon, dtype=np.float32)
+        self.indptr = np.asarray(indptr, dtype=np.int32)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.length_m = np.asarray(length_m, dtype=np.float32)
+        self.duration_s = np.asarray(duration_s, dtype=np.float32)
+        self._lists = None
+        self._reverse = None
+        self._max_speed = None
+        self._index = None
+
+    @property
+    def n_nodes(self):
+        return len(self.node_lat)
+
+    @property
+    def n_edges(self):
+        return len(self.targets)
+
+    @classmethod
+    def from_edges(cls, node_lat, node_lon, sources, targets, length_m, duration_s):
+        """CSR graph from parallel edge arrays (one entry per directed edge)."""
+        sources = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+        counts = np.bincount(sources, minlength=len(node_lat))
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        return cls(node_lat, node_lon, indptr, np.asarray(targets)[order],
+                   np.asarray(length_m)[order], np.asarray(duration_s)[order])
+
+    def save(self, path=ROAD_GRAPH_PATH):
+        np.savez(path, **{name: getattr(self, name) for name in self.ARRAY_NAMES})
+
+    @classmethod
+    def load(cls, path=ROAD_GRAPH_PATH):
+        with np.load(path) as data:
+            return cls(*(data[name] for name in cls.ARRAY_NAMES))
+
+    def adjacency(self):
+        """Plain-list copies of the arrays; the search loops index these."""
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.targets.tolist(),
+                           self.duration_s.astype(np.float64).tolist(),
+                           self.node_lat.astype(np.float64).tolist(),
+                           self.node_lon.astype(np.float64).tolist())
+        return self._lists
+
+    def reverse_adjacency(self):
+        """(indptr, sources, duration) of the transposed graph."""
+        if self._reverse is None:
+            sources = np.repeat(np.arange(self.n_nodes, dtype=np.int32), np.diff(self.indptr))
+            order = np.argsort(self.targets, kind="stable")
+            counts = np.bincount(self.targets, minlength=self.n_nodes)
+            indptr = np.concatenate([[0], np.cumsum(counts)])
+            self._reverse = (indptr.tolist(), sources[order].tolist(),
+                             self.duration_s[order].astype(np.float64).tolist())
+        return self._reverse
+
+    def nearest_node(self, lat, lon):
+        """Index of the graph node closest to (lat, lon)."""
+        if self._index is None:
+            self._index = GridIndex(self.node_lat, self.node_lon)
+        return int(self._index.knn(lat, lon)[0][0])
+
+    def edge(self, u, v):
+        """(length_m, duration_s) of the fastest direct edge u -> v."""
+        lo, hi = self.indptr[u], self.indptr[u + 1]
+        hits = np.flatnonzero(self.targets[lo:hi] == v) + lo
+        best = hits[np.argmin(self.duration_s[hits])]
+        return float(self.length_m[best]), float(self.duration_s[best])
+
+    def max_speed_mps(self):
+        """Top straight-line speed over any edge; keeps the A* bound admissible."""
+        if self._max_speed is not None:
+            return self._max_speed
+        sources = np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+        straight = haversine(self.node_lat[sources], self.node_lon[sources],
+                             self.node_lat[self.targets], self.node_lon[self.targets]) * 1000
+        span = np.maximum(straight, self.length_m)
+        self._max_speed = float(np.max(span / np.maximum(self.duration_s, 1e-3)))
+        return self._max_speed
+
+
+def _walk_back(parent, node):
+    path = []
+    while node != -1:
+        path.append(node)
+        node = parent[node]
+    return path[::-1]
+
+
+def astar(graph, source, target):
+    """Fastest path by A*; returns (duration_s, [nodes]) or (inf, [])."""
+    indptr, targets, weight, lat, lon = graph.adjacency()
+    inv_speed = 1.0 / graph.max_speed_mps() * 0.999   # float slack, stays a lower bound
+    t_lat, t_lon = lat[target], lon[target]
+
+    dist = {source: 0.0}
+    parent = {source: -1}
+    heap = [(_haversine_m(lat[source], lon[source], t_lat, t_lon) * inv_speed, 0.0, source)]
+    closed = set()
+    while heap:
+        _, d, u = heapq.heappop(heap)
+        if u in closed:
+            continue
+        if u == target:
+            return d, _walk_back(parent, target)
+        closed.add(u)
+        for e in range(indptr[u], indptr[u + 1]):
+            v = targets[e]
+            nd = d + weight[e]
+            if nd < dist.get(v, float("inf")):
+                dist[v] = nd
+                parent[v] = u
+                h = _haversine_m(lat[v], lon[v], t_lat, t_lon) * inv_speed
+                heapq.heappush(heap, (nd + h, nd, v))
+    return float("inf"), []
+
+
+def bidirectional_dijkstra(graph, source, target):
+    """Fastest path by meeting forward and backward searches; same return as astar()."""
+    if source == target:
+        return 0.0, [source]
+    f_indptr, f_targets, f_weight, _, _ = graph.adjacency()
+    b_indptr, b_targets, b_weight = graph.reverse_adjacency()
+    sides = ((f_indptr, f_targets, f_weight, {source: 0.0}, {source: -1}, [(0.0, source)], set()),
+             (b_indptr, b_targets, b_weight, {target: 0.0}, {target: -1}, [(0.0, target)], set()))
+    best, meet = float("inf"), -1
+
+    while sides[0][5] and sides[1][5]:
+        if sides[0][5][0][0] + sides[1][5][0][0] >= best:
+            break
+        side = 0 if sides[0][5][0][0] <= sides[1][5][0][0] else 1
+        indptr, adj, weight, dist, parent, heap, closed = sides[side]
+        other_dist = sides[1 - side][3]
+        d, u = heapq.heappop(heap)
+        if u in closed:
+            continue
+        closed.add(u)
+        for e in range(indptr[u], indptr[u + 1]):
+            v = adj[e]
+            nd = d + weight[e]
+            if nd < dist.get(v, float("inf")):
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd, v))
+            if v in other_dist and nd + other_dist[v] < best:
+                best, meet = nd + other_dist[v], v
+
+    if meet == -1:
+        return float("inf"), []
+    forward = _walk_back(sides[0][4], meet)
+    backward = _walk_back(sides[1][4], meet)[::-1]
+    return best, forward + backward[1:]
+
+
+# ----- CONTRACTION HIERARCHY -----
+class ContractionHierarchy:
+    """Node ranking plus upward shortcut graphs over duration_s.
+
+    up_* edges lead from a node to higher-ranked nodes: forward edges u -> x
+    are stored at u, backward edges x -> u (original direction) at u as well.
+    mid is the contracted node a shortcut bypasses, or -1 for a real edge.
+    """
+
+    ARRAY_NAMES = ("rank", "fwd_indptr", "fwd_targets", "fwd_weight", "fwd_mid",
+                   "bwd_indptr", "bwd_targets", "bwd_weight", "bwd_mid")
+
+    def __init__(self, rank, fwd_indptr, fwd_targets, fwd_weight, fwd_mid,
+                 bwd_indptr, bwd_targets, bwd_weight, bwd_mid):
+        self.rank = np.asarray(rank, dtype=np.int32)
+        self.fwd = (np.asarray(fwd_indptr, dtype=np.int32), np.asarray(fwd_targets, dtype=np.int32),
+                    np.asarray(fwd_weight, dtype=np.float64), np.asarray(fwd_mid, dtype=np.int32))
+        self.bwd = (np.asarray(bwd_indptr, dtype=np.int32), np.asarray(bwd_targets, dtype=np.int32),
+                    np.asarray(bwd_weight, dtype=np.float64), np.asarray(bwd_mid, dtype=np.int32))
+        self._lists = None
+        self._mid = None
+
+    @classmethod
+    def build(cls, graph, settle_limit=300, log=None):
+        """Contract every node, cheapest edge-difference first (lazy updates)."""
+        n = graph.n_nodes
+        out = [dict() for _ in range(n)]
+        inn = [dict() for _ in range(n)]
+        indptr, targets, weight, _, _ = graph.adjacency()
+        for u in range(n):
+            for e in range(indptr[u], indptr[u + 1]):
+                v, w = targets[e], weight[e]
+                if v != u and w < out[u].get(v, (float("inf"),))[0]:
+                    out[u][v] = (w, -1)
+                    inn[v][u] = (w, -1)
+
+        deleted_neighbours = [0] * n
+
+        def witness(u, skip, limit):
+            """Distances from u avoiding `skip`, settled up to `limit` seconds."""
+            dist = {u: 0.0}
+            heap = [(0.0, u)]
+            settled = 0
+            while heap and settled < settle_limit:
+                d, x = heapq.heappop(heap)
+                if d > limit:
+                    break
+                if d > dist[x]:
+                    continue
+                settled += 1
+                for y, (w, _) in out[x].items():
+                    if y == skip:
+                        continue
+                    nd = d + w
+                    if nd < dist.get(y, float("inf")):
+                        dist[y] = nd
+                        heapq.heappush(heap, (nd, y))
+            return dist
+
+        def shortcuts(v):
+            needed = []
+            for u, (w_in, _) in inn[v].items():
+                limit = w_in + max((w for w, _ in out[v].values()), default=0.0)
+                dist = witness(u, v, limit)
+                for x, (w_out, _) in out[v].items():
+                    if x != u and dist.get(x, float("inf")) > w_in + w_out:
+                        needed.append((u, x, w_in + w_out))
+            return needed
+
+        def priority(v):
+            return len(shortcuts(v)) - len(inn[v]) - len(out[v]) + deleted_neighbours[v]
+
+        heap = [(priority(v), v) for v in range(n)]
+        heapq.heapify(heap)
+        rank = np.zeros(n, dtype=np.int32)
+        up_fwd = [None] * n
+        up_bwd = [None] * n
+        next_rank = 0
+        start = time.perf_counter()
+
+        while heap:
+            _, v = heapq.heappop(heap)
+            p = priority(v)
+            if heap and p > heap[0][0]:
+                heapq.heappush(heap, (p, v))
+                continue
+
+            for u, x, w in shortcuts(v):
+                if w < out[u].get(x, (float("inf"),))[0]:
+                    out[u][x] = (w, v)
+                    inn[x][u] = (w, v)
+            up_fwd[v] = [(x, w, m) for x, (w, m) in out[v].items()]
+            up_bwd[v] = [(u, w, m) for u, (w, m) in inn[v].items()]
+            for x in out[v]:
+                del inn[x][v]
+                deleted_neighbours[x] += 1
+            for u in inn[v]:
+                del out[u][v]
+                deleted_neighbours[u] += 1
+            out[v].clear()
+            inn[v].clear()
+            rank[v] = next_rank
+            next_rank += 1
+            if log and next_rank % 5000 == 0:
+                log(f"contracted {next_rank:,}/{n:,} nodes ({time.perf_counter() - start:.0f}s)")
+
+        return cls(rank, *cls._to_csr(up_fwd), *cls._to_csr(up_bwd))
+
+    @staticmethod
+    def _to_csr(lists):
+        indptr = np.concatenate([[0], np.cumsum([len(edges) for edges in lists])])
+        flat = [edge for edges in lists for edge in edges]
+        targets = np.array([e[0] for e in flat], dtype=np.int32)
+        weight = np.array([e[1] for e in flat], dtype=np.float64)
+        mid = np.array([e[2] for e in flat], dtype=np.int32)
+        return indptr, targets, weight, mid
+
+    def arrays(self):
+        return dict(zip(self.ARRAY_NAMES, (self.rank, *self.fwd, *self.bwd)))
+
+    def save(self, path=ROAD_CH_PATH):
+        np.savez(path, **self.arrays())
+
+    @classmethod
+    def load(cls, path=ROAD_CH_PATH):
+        with np.load(path) as data:
+            return cls(*(data[name] for name in cls.ARRAY_NAMES))
+
+    def _adjacency(self):
+        if self._lists is None:
+            self._lists = tuple(tuple(a.tolist() for a in side[:3]) for side in (self.fwd, self.bwd))
+            # (from, to) in original direction -> bypassed node, for unpacking
+            self._mid = {}
+            for side, forward in ((self.fwd, True), (self.bwd, False)):
+                indptr, targets, _, mid = side
+                sources = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+                for a, b, m in zip(sources.tolist(), targets.tolist(), mid.tolist()):
+                    self._mid[(a, b) if forward else (b, a)] = m
+        return self._lists
+
+    def _unpack(self, u, x):
+        m = self._mid[(u, x)]
+        if m == -1:
+            return [u, x]
+        return self._unpack(u, m)[:-1] + self._unpack(m, x)
+
+    def query(self, source, target):
+        """Fastest path via upward searches from both ends; same return as astar()."""
+        if source == target:
+            return 0.0, [source]
+        sides = self._adjacency()
+        dist = ({source: 0.0}, {target: 0.0})
+        parent = ({source: -1}, {target: -1})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        best, meet = float("inf"), -1
+
+        # The forward search runs over its (small) upward graph to completion;
+        # the backward one stops once it cannot beat the best meeting node.
+        for side in (0, 1):
+            indptr, targets, weight = sides[side]
+            d_side, p_side, heap = dist[side], parent[side], heaps[side]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > d_side[u]:
+                    continue
+                if d >= best:
+                    break
+                if u in dist[1 - side] and d + dist[1 - side][u] < best:
+                    best, meet = d + dist[1 - side][u], u
+                for e in range(indptr[u], indptr[u + 1]):
+                    v = targets[e]
+                    nd = d + weight[e]
+                    if nd < d_side.get(v, float("inf")):
+                        d_side[v] = nd
+                        p_side[v] = u
+                        heapq.heappush(heap, (nd, v))
+        if meet == -1:
+            return float("inf"), []
+
+        up = _walk_back(parent[0], meet)
+        down = _walk_back(parent[1], meet)[::-1]
+        hops = up + down[1:]
+        path = [hops[0]]
+        for a, b in zip(hops, hops[1:]):
+            path += self._unpack(a, b)[1:]
+        return best, path
+
+
+# ----- DIRECTIONS INTERFACE -----
+class OfflineRouter:
+    """Drop-in for openrouteservice.Client.directions backed by a local graph."""
+
+    def __init__(self, graph, hierarchy=None, method="astar"):
+        self.graph = graph
+        self.hierarchy = hierarchy
+        self.method = method
+
+    def route(self, source, target):
+        if self.hierarchy is not None:
+            return self.hierarchy.query(source, target)
+        if self.method == "bidirectional":
+            return bidirectional_dijkstra(self.graph, source, target)
+        return astar(self.graph, source, target)
+
+    def directions(self, coords, profile="driving-car", format="geojson", **kwargs):
+        (lon1, lat1), (lon2, lat2) = coords[0], coords[-1]
+        g = self.graph
+        source, target = g.nearest_node(lat1, lon1), g.nearest_node(lat2, lon2)
+        duration_s, path = self.route(source, target)
+        if not path:
+            raise ValueError(f"no road route between {coords[0]} and {coords[-1]}")
+
+        distance_m = 0.0
+        for a, b in zip(path, path[1:]):
+            distance_m += g.edge(a, b)[0]
+        # Straight-line legs from the pins to the snapped nodes
+        legs_m = (_haversine_m(lat1, lon1, g.node_lat[source], g.node_lon[source])
+                  + _haversine_m(lat2, lon2, g.node_lat[target], g.node_lon[target]))
+        distance_m += legs_m
+        duration_s += legs_m / (PIN_LEG_SPEED_KMPH / 3.6)
+
+        line = [[lon1, lat1]] + [[float(g.node_lon[i]), float(g.node_lat[i])] for i in path] + [[lon2, lat2]]
+        return _route_response(distance_m, duration_s, {"type": "LineString", "coordinates": line})
+
+
+class FallbackDirections:
+    """directions() from the primary client, or the fallback when it raises."""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+
+    def directions(self, coords, **kwargs):
+        try:
+            return self.primary.directions(coords, **kwargs)
+        except Exception:
+            if self.fallback is None:
+                raise
+            return self.fallback.directions(coords, **kwargs)
+
+
+def load_offline_router(path=ROAD_GRAPH_PATH, ch_path=ROAD_CH_PATH):
+    """OfflineRouter over the saved graph (and hierarchy, if built), or None."""
+    if not os.path.exists(path):
+        return None
+    graph = RoadGraph.load(path)
+    hierarchy = None
+    if ch_path and os.path.exists(ch_path):
+        hierarchy = ContractionHierarchy.load(ch_path)
+        if len(hierarchy.rank) != graph.n_nodes:
+            hierarchy = None   # built for another graph
+    return OfflineRouter(graph, hierarchy)
+
+
+# ----- GRAPH SOURCES -----
+def graph_from_csv(nodes_csv, edges_csv, default_speed_kmph=25.0):
+    """nodes: id,lat,lon  edges: source,target,length_m[,duration_s][,oneway]"""
+    import pandas as pd
+
+    nodes = pd.read_csv(nodes_csv)
+    edges = pd.read_csv(edges_csv)
+    index = pd.Index(nodes["id"])
+    src = index.get_indexer(edges["source"])
+    dst = index.get_indexer(edges["target"])
+    if (src < 0).any() or (dst < 0).any():
+        raise ValueError("edges reference node ids missing from the nodes file")
+    length = edges["length_m"].to_numpy(dtype=np.float64)
+    if "duration_s" in edges:
+        duration = edges["duration_s"].to_numpy(dtype=np.float64)
+    else:
+        duration = length / (default_speed_kmph / 3.6)
+    oneway = edges["oneway"].to_numpy(dtype=bool) if "oneway" in edges else np.zeros(len(edges), bool)
+
+    two_way = ~oneway
+    sources = np.concatenate([src, dst[two_way]])
+    targets = np.concatenate([dst, src[two_way]])
+    return RoadGraph.from_edges(nodes["lat"], nodes["lon"], sources, targets,
+                                np.concatenate([length, length[two_way]]),
+                                np.concatenate([duration, duration[two_way]]))
+
+
+def synthetic_city_graph(coords=None, spacing_km=0.3, margin_km=1.0, seed=0):
+    """Jittered street grid over the registry's bounding box.
+
+    Every 6th row/column is an arterial (40 km/h), the rest local streets
+    (20 km/h) with a few segments missing. For development without map data.
+    """
+    coords = coords or coords_dict
+    rng = np.random.default_rng(seed)
+    lats = np.array([lat for lat, _ in coords.values()])
+    lons = np.array([lon for _, lon in coords.values()])
+    dlat = spacing_km / 111.0
+    dlon = spacing_km / (111.0 * cos(radians(lats.mean())))
+    m_lat, m_lon = margin_km / 111.0, margin_km / (111.0 * cos(radians(lats.mean())))
+    rows = int(np.ceil((lats.max() - lats.min() + 2 * m_lat) / dlat)) + 1
+    cols = int(np.ceil((lons.max() - lons.min() + 2 * m_lon) / dlon)) + 1
+
+    r, c = np.meshgrid(np.arange(rows), np.arange(cols), indexing="ij")
+    node_lat = lats.min() - m_lat + r.ravel() * dlat + rng.uniform(-0.2, 0.2, r.size) * dlat
+    node_lon = lons.min() - m_lon + c.ravel() * dlon + rng.uniform(-0.2, 0.2, c.size) * dlon
+    node_id = np.arange(rows * cols).reshape(rows, cols)
+
+    pairs = [(node_id[:, :-1].ravel(), node_id[:, 1:].ravel(), r[:, :-1].ravel() % 6 == 0),
+             (node_id[:-1, :].ravel(), node_id[1:, :].ravel(), c[:-1, :].ravel() % 6 == 0)]
+    src = np.concatenate([p[0] for p in pairs])
+    dst = np.concatenate([p[1] for p in pairs])
+    arterial = np.concatenate([p[2] for p in pairs])
+    keep = arterial | (rng.random(len(src)) > 0.08)
+    src, dst, arterial = src[keep], dst[keep], arterial[keep]
+
+    length = haversine(node_lat[src], node_lon[src], node_lat[dst], node_lon[dst]) * 1000 * 1.05
+    duration = length / (np.where(arterial, 40.0, 20.0) / 3.6)
+
+    return RoadGraph.from_edges(node_lat, node_lon, np.concatenate([src, dst]), np.concatenate([dst, src]),
+                                np.concatenate([length, length]), np.concatenate([duration, duration]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline road routing engine.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="write the road graph file")
+    build.add_argument("--nodes", help="CSV with id,lat,lon")
+    build.add_argument("--edges", help="CSV with source,target,length_m[,duration_s][,oneway]")
+    build.add_argument("--synthetic", action="store_true", help="street grid over the registry")
+    sub.add_parser("contract", help="precompute the contraction hierarchy")
+    route = sub.add_parser("route", help="route between two registry locations")
+    route.add_argument("pickup")
+    route.add_argument("drop")
+    sub.add_parser("bench", help="time A*, bidirectional Dijkstra and CH queries")
+    parser.add_argument("--graph", default=ROAD_GRAPH_PATH)
+    parser.add_argument("--ch", default=ROAD_CH_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if args.synthetic:
+            graph = synthetic_city_graph()
+        elif args.nodes and args.edges:
+            graph = graph_from_csv(args.nodes, args.edges)
+        else:
+            parser.error("build needs --nodes and --edges, or --synthetic")
+        graph.save(args.graph)
+        print(f"✅ Road graph: {graph.n_nodes:,} nodes, {graph.n_edges:,} edges -> {args.graph}")
+
+    elif args.command == "contract":
+        graph = RoadGraph.load(args.graph)
+        start = time.perf_counter()
+        ch = ContractionHierarchy.build(graph, log=print)
+        ch.save(args.ch)
+        print(f"✅ Contraction hierarchy: {len(ch.fwd[1]) + len(ch.bwd[1]):,} upward edges "
+              f"in {time.perf_counter() - start:.1f}s -> {args.ch}")
+
+    elif args.command == "route":
+        router = load_offline_router(args.graph, args.ch)
+        if router is None:
+            raise SystemExit(f"no road graph at {args.graph}")
+        (lat1, lon1), (lat2, lon2) = coords_dict[args.pickup], coords_dict[args.drop]
+        segment = router.directions([(lon1, lat1), (lon2, lat2)])["features"][0]["properties"]["segments"][0]
+        print(f"{args.pickup} -> {args.drop}: {segment['distance'] / 1000:.2f} km, "
+              f"{segment['duration'] / 60:.0f} min")
+
+    else:
+        graph = RoadGraph.load(args.graph)
+        hierarchy = ContractionHierarchy.load(args.ch) if os.path.exists(args.ch) else None
+        rng = np.random.default_rng(0)
+        queries = rng.integers(0, graph.n_nodes, size=(100, 2)).tolist()
+        runners = [("A*", lambda s, t: astar(graph, s, t)),
+                   ("bidirectional Dijkstra", lambda s, t: bidirectional_dijkstra(graph, s, t))]
+        if hierarchy is not None:
+            runners.append(("contraction hierarchy", hierarchy.query))
+        reference = None
+        for name, run in runners:
+            run(*queries[0])   # warm the list copies
+            start = time.perf_counter()
+            results = [run(s, t)[0] for s, t in queries]
+            ms = (time.perf_counter() - start) * 1000 / len(queries)
+            if reference is None:
+                reference = results
+            exact = np.allclose(results, reference, rtol=1e-6)
+            print(f"{name:<24} {ms:8.3f} ms/query   matches A*: {exact}")
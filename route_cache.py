@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+from geo import haversine_scalar
+from locations import coords_dict
+
+# ============================================================================
+# PERSISTENT OPENROUTESERVICE ROUTE CACHE
+# ============================================================================
+# Every "Search Rides" click asked ORS for the same few dozen routes. RouteCache
+# wraps an openrouteservice.Client and answers directions() from a local SQLite
+# file when it can:
+#
+#   client = RouteCache(openrouteservice.Client(key=ORS_API_KEY))
+#   routes = client.directions(coords, profile='driving-car', format='geojson')
+#
+# The reply has the same shape the apps read (features[0].geometry and
+# features[0].properties.segments[0].distance/duration), so the call sites do
+# not change. Rows are keyed on the rounded (origin, destination, profile)
+# coordinates and store distance, duration and the route geometry. Entries
+# older than ttl_s are refetched; beyond max_entries the least recently used
+# rows are deleted. A cached route never touches the network.
+#
+# Pre-populate every pair in coords_dict with:
+#   ORS_API_KEY=... python route_cache.py warm
+
+ROUTE_CACHE_PATH = "route_cache.sqlite"
+DEFAULT_TTL_S = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 20_000
+COORD_DECIMALS = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS routes (
+    origin_lon REAL, origin_lat REAL, dest_lon REAL, dest_lat REAL, profile TEXT,
+    distance_m REAL NOT NULL,
+    duration_s REAL NOT NULL,
+    geometry TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (origin_lon, origin_lat, dest_lon, dest_lat, profile)
+);
+CREATE INDEX IF NOT EXISTS routes_last_used ON routes (last_used);
+"""
+
+
+def _route_response(distance_m, duration_s, geometry):
+    """Minimal ORS geojson directions reply."""
+    return {
+        "type": "FeatureCollection",
+        "features": [{
+            "type": "Feature",
+            "geometry": geometry,
+            "properties": {
+                "segments": [{"distance": distance_m, "duration": duration_s}],
+                "summary": {"distance": distance_m, "duration": duration_s},
+            },
+        }],
+    }
+
+
+class RouteCache:
+    """SQLite-backed cache in front of a directions client."""
+
+    def __init__(self, client, path=ROUTE_CACHE_PATH, ttl_s=DEFAULT_TTL_S,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.client = client
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per call keeps this safe to share between
+        # Streamlit's script threads; WAL lets readers run during a write.
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _key(coords, profile):
+        (lon1, lat1), (lon2, lat2) = coords
+        return (round(lon1, COORD_DECIMALS), round(lat1, COORD_DECIMALS),
+                round(lon2, COORD_DECIMALS), round(lat2, COORD_DECIMALS), profile)
+
+    def get(self, coords, profile="driving-car"):
+        """Cached reply for a route, or None if it is missing or expired."""
+        key = self._key(coords, profile)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT distance_m, duration_s, geometry, fetched_at FROM routes "
+                "WHERE origin_lon=? AND origin_lat=? AND dest_lon=? AND dest_lat=? AND profile=?",
+                key).fetchone()
+            if row is None or (self.ttl_s is not None and now - row[3] > self.ttl_s):
+                return None
+            conn.execute(
+                "UPDATE routes SET last_used=? WHERE origin_lon=? AND origin_lat=? "
+                "AND dest_lon=? AND dest_lat=? AND profile=?", (now, *key))
+        return _route_response(row[0], row[1], json.loads(row[2]))
+
+    def put(self, coords, profile, routes):
+        segment = routes["features"][0]["properties"]["segments"][0]
+        geometry = routes["features"][0]["geometry"]
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*self._key(coords, profile), segment["distance"], segment["duration"],
+                 json.dumps(geometry), now, now))
+            if self.max_entries is not None:
+                conn.execute(
+                    "DELETE FROM routes WHERE rowid IN (SELECT rowid FROM routes "
+                    "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def directions(self, coords, profile="driving-car", format="geojson", **kwargs):
+        """Drop-in for openrouteservice.Client.directions (geojson, two points)."""
+        if format != "geojson" or len(coords) != 2 or kwargs:
+            return self.client.directions(coords, profile=profile, format=format, **kwargs)
+        cached = self.get(coords, profile)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        routes = self.client.directions(coords, profile=profile, format="geojson")
+        self.put(coords, profile, routes)
+        return routes
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM routes").fetchone()[0]
+
+
+def warm_up(cache, coords=None, profile="driving-car", pause_s=0.0, log=print):
+    """Fetch every ordered pair of locations that is not cached yet."""
+    coords = coords or coords_dict
+    fetched = 0
+    for pickup, (lat1, lon1) in coords.items():
+        for drop, (lat2, lon2) in coords.items():
+            if pickup == drop:
+                continue
+            route = [(lon1, lat1), (lon2, lat2)]
+            if cache.get(route, profile) is not None:
+                continue
+            cache.directions(route, profile=profile, format="geojson")
+            fetched += 1
+            if pause_s:
+                time.sleep(pause_s)   # stay inside the ORS rate limit
+    log(f"✅ Route cache warm: {fetched} fetched, {len(cache)} cached in {cache.path}")
+    return fetched
+
+
+class StubDirectionsClient:
+    """Offline stand-in for openrouteservice.Client: straight-line routes.
+
+    Distance is haversine x detour_factor at speed_kmph; the geometry is the
+    two endpoints. Counts calls so tests can assert the cache was used.
+    """
+
+    def __init__(self, detour_factor=1.3, speed_kmph=25.0):
+        self.detour_factor = detour_factor
+        self.speed_kmph = speed_kmph
+        self.calls = 0
+
+    def directions(self, coords, profile="driving-car", format="geojson", **kwargs):
+        self.calls += 1
+        (lon1, lat1), (lon2, lat2) = coords[0], coords[-1]
+        km = haversine_scalar(lat1, lon1, lat2, lon2) * self.detour_factor
+        geometry = {"type": "LineString", "coordinates": [list(coords[0]), list(coords[-1])]}
+        return _route_response(km * 1000, km / self.speed_kmph * 3600, geometry)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenRouteService route cache.")
+    parser.add_argument("command", choices=["warm", "stats"])
+    parser.add_argument("--path", default=ROUTE_CACHE_PATH)
+    parser.add_argument("--stub", action="store_true", help="use the offline stub client")
+    parser.add_argument("--pause", type=float, default=1.6,
+                        help="seconds between ORS calls (free tier: 40/min)")
+    args = parser.parse_args()
+
+    if args.stub or args.command == "stats":
+        client = StubDirectionsClient()
+    else:
+        import openrouteservice
+        client = openrouteservice.Client(key=os.environ["ORS_API_KEY"])
+
+    cache = RouteCache(client, args.path)
+    if args.command == "warm":
+        warm_up(cache, pause_s=0.0 if args.stub else args.pause)
+    else:
+        print(f"{len(cache)} routes cached in {args.path}")
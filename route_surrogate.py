@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from fare_table import route_distances
+from feature_cache import load_training_features
+from model_bundle import load_bundle
+
+# ============================================================================
+# PER-ROUTE PIECEWISE-LINEAR FARE SURROGATES
+# ============================================================================
+# Usage:
+#   python route_surrogate.py                   # distil -> route_surrogates.npz + fidelity report
+#   python route_surrogate.py --samples 512 --report route_surrogate_fidelity.csv
+#
+# The forest is distilled into one small linear model per (pickup, drop)
+# pair, fitted by least squares to the forest's own predictions:
+#
+#   fare = c0 + c1 d + sum_k h_k max(d - knot_k, 0)      piecewise linear in distance
+#          + sum_j w_j x_j                               other numeric features
+#          + fuel type / owner one-hot terms
+#
+# Knots sit at KNOT_RATIOS x the route's distance. The training inputs for
+# a route are training rows (so the other features keep their real joint
+# distribution) moved onto the route, at distances drawn uniformly from
+# DISTANCE_RANGE x the route's distance. A held-out draw of the same kind
+# gives the fidelity report against the forest.
+#
+# All routes share one basis, so the table is a single float32 array
+#
+#   coef[pickup code, drop code, basis]        (NaN for routes left out)
+#
+# and a prediction is one dot product. Like the fare table, the file records
+# the content hash of the bundle it was distilled from and
+# load_route_surrogates() rebuilds it when the bundle changes.
+# fare_table.predict_fare(..., surrogate=...) answers off-grid requests on a
+# known route from it instead of running the forest. Outside the band the
+# route was fitted on (DISTANCE_RANGE x route_km, stored per route) predict()
+# returns NaN, so those requests still go to the forest.
+
+SURROGATE_PATH = "route_surrogates.npz"
+DISTANCE_COLUMN = "travelling distance(km)"
+ROUTE_COLUMNS = ("pickup location", "drop location")
+KNOT_RATIOS = (0.8, 1.0, 1.2)
+DISTANCE_RANGE = (0.5, 1.5)
+MAX_ONE_HOT = 16   # larger vocabularies are left out of the basis
+
+
+class RouteSurrogates:
+    """Coefficient table of per-route piecewise-linear fare functions."""
+
+    def __init__(self, coef, knots, route_km, columns, numeric_columns, one_hot, bundle_hash):
+        self.coef = coef                  # float32 [n_pickup, n_drop, n_basis]
+        self.knots = knots                # float32 [n_pickup, n_drop, n_knots] in km
+        self.route_km = route_km          # float32 [n_pickup, n_drop], NaN for routes left out
+        self.columns = list(columns)      # bundle column order of the input rows
+        self.numeric_columns = list(numeric_columns)
+        self.one_hot = {col: int(n) for col, n in one_hot.items()}   # column -> vocabulary size
+        self.bundle_hash = bundle_hash
+        self._col = {col: j for j, col in enumerate(self.columns)}
+
+    @property
+    def n_basis(self):
+        return self.coef.shape[2]
+
+    def basis(self, X, knots):
+        """Basis rows [n, n_basis] for encoded feature rows X and their routes' knots [n, n_knots]."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        d = X[:, self._col[DISTANCE_COLUMN]]
+        parts = [np.ones((len(X), 1)), d[:, None], np.maximum(d[:, None] - knots, 0.0)]
+        parts.append(X[:, [self._col[col] for col in self.numeric_columns]])
+        for col, size in self.one_hot.items():
+            parts.append(X[:, self._col[col]][:, None] == np.arange(size)[None, :])
+        return np.hstack(parts)
+
+    def _routes(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        i = X[:, self._col[ROUTE_COLUMNS[0]]].astype(np.int64)
+        j = X[:, self._col[ROUTE_COLUMNS[1]]].astype(np.int64)
+        known = (i >= 0) & (i < self.coef.shape[0]) & (j >= 0) & (j < self.coef.shape[1])
+        return np.where(known, i, 0), np.where(known, j, 0), known
+
+    def predict(self, X):
+        """Fares for encoded rows in bundle column order; NaN for routes without a
+        surrogate and for distances outside the band it was fitted on."""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        i, j, known = self._routes(X)
+        d = X[:, self._col[DISTANCE_COLUMN]]
+        route_km = self.route_km[i, j]
+        fitted = known & (d >= DISTANCE_RANGE[0] * route_km) & (d <= DISTANCE_RANGE[1] * route_km)
+        out = np.einsum("nb,nb->n", self.basis(X, self.knots[i, j]), self.coef[i, j])
+        out[~fitted] = np.nan
+        return out
+
+    def save(self, path=SURROGATE_PATH):
+        meta = {"columns": self.columns, "numeric_columns": self.numeric_columns,
+                "one_hot": self.one_hot, "bundle_hash": self.bundle_hash}
+        np.savez(path, coef=self.coef, knots=self.knots, route_km=self.route_km, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path=SURROGATE_PATH):
+        with np.load(path) as data:
+            return cls(data["coef"], data["knots"], data["route_km"], **json.loads(str(data["meta"])))
+
+
+# ----- DISTILLATION -----
+def route_samples(X_pool, pickup_code, drop_code, route_km, n, rng, columns):
+    """n training rows moved onto one route at distances around route_km."""
+    rows = X_pool[rng.integers(0, len(X_pool), n)].copy()
+    rows[:, columns.index(ROUTE_COLUMNS[0])] = pickup_code
+    rows[:, columns.index(ROUTE_COLUMNS[1])] = drop_code
+    rows[:, columns.index(DISTANCE_COLUMN)] = route_km * rng.uniform(*DISTANCE_RANGE, n)
+    return rows
+
+
+def distill(bundle, X_pool, distances=None, samples_per_route=256, holdout=64, seed=0, ridge=1e-6):
+    """(RouteSurrogates, fidelity DataFrame with one row per route)."""
+    distances = route_distances() if distances is None else distances
+    columns = list(bundle.columns)
+    X_pool = np.asarray(X_pool, dtype=np.float64)
+    pickups = bundle.vocabularies[ROUTE_COLUMNS[0]]
+    drops = bundle.vocabularies[ROUTE_COLUMNS[1]]
+    one_hot = {col: len(vocab) for col, vocab in bundle.vocabularies.items()
+               if col not in ROUTE_COLUMNS and len(vocab) <= MAX_ONE_HOT}
+    numeric = [col for col in columns
+               if col not in bundle.vocabularies and col != DISTANCE_COLUMN]
+
+    pickup_enc, drop_enc = (bundle.encoders[col] for col in ROUTE_COLUMNS)
+    routes = [(pickup_enc.transform_one(p), drop_enc.transform_one(d), km)
+              for (p, d), km in distances.items() if km and km > 0]
+    routes = [(i, j, km) for i, j, km in routes if i >= 0 and j >= 0]
+    knots = np.full((len(pickups), len(drops), len(KNOT_RATIOS)), np.nan, dtype=np.float32)
+    route_km = np.full((len(pickups), len(drops)), np.nan, dtype=np.float32)
+    for i, j, km in routes:
+        knots[i, j] = np.asarray(KNOT_RATIOS) * km
+        route_km[i, j] = km
+    surrogates = RouteSurrogates(None, knots, route_km, columns, numeric, one_hot, bundle.content_hash)
+
+    # One forest call for every route's fit and holdout rows
+    rng = np.random.default_rng(seed)
+    n = samples_per_route + holdout
+    X = np.vstack([route_samples(X_pool, i, j, km, n, rng, columns) for i, j, km in routes])
+    target = bundle.predict(X)
+
+    n_basis = surrogates.basis(X[:1], knots[routes[0][0], routes[0][1]][None, :]).shape[1]
+    coef = np.full((len(pickups), len(drops), n_basis), np.nan, dtype=np.float32)
+    report = []
+    for r, (i, j, km) in enumerate(routes):
+        block = slice(r * n, (r + 1) * n)
+        B = surrogates.basis(X[block], np.repeat(knots[i, j][None, :], n, axis=0))
+        y = target[block]
+        fit, test = slice(0, samples_per_route), slice(samples_per_route, n)
+        # Scale columns before the tiny ridge so it does not favour large-valued features
+        scale = np.abs(B[fit]).max(axis=0)
+        scale[scale == 0] = 1.0
+        Bs = B[fit] / scale
+        w = np.linalg.solve(Bs.T @ Bs + ridge * np.eye(n_basis), Bs.T @ y[fit]) / scale
+        coef[i, j] = w
+        err = B[test] @ w.astype(np.float32) - y[test]
+        report.append({"pickup": pickups[i], "drop": drops[j], "route_km": km,
+                       "rmse": float(np.sqrt(np.mean(err ** 2))), "mae": float(np.abs(err).mean()),
+                       "max_abs": float(np.abs(err).max()),
+                       "r2_vs_forest": float(1 - np.mean(err ** 2) / max(y[test].var(), 1e-12)),
+                       "forest_std": float(y[test].std())})
+    surrogates.coef = coef
+    return surrogates, pd.DataFrame(report)
+
+
+def load_route_surrogates(bundle, X_pool=None, path=SURROGATE_PATH):
+    """Surrogates for this bundle, re-distilled (from the training features) when missing or stale."""
+    if os.path.exists(path):
+        try:
+            surrogates = RouteSurrogates.load(path)
+        except KeyError:
+            surrogates = None   # written before route_km was stored
+        if surrogates is not None and surrogates.bundle_hash == bundle.content_hash:
+            return surrogates
+    if X_pool is None:
+        X_pool, _, _ = load_training_features(bundle.metadata.get("source", "car-data-all-locations.csv"),
+                                              log=None)
+        X_pool = X_pool[bundle.columns]
+    surrogates, _ = distill(bundle, X_pool)
+    surrogates.save(path)
+    return surrogates
+
+
+if __name__ == "__main__":
+    from sklearn.model_selection import train_test_split
+
+    parser = argparse.ArgumentParser(description="Distil the fare forest into per-route piecewise-linear fares.")
+    parser.add_argument("source", nargs="?", default="car-data-all-locations.csv")
+    parser.add_argument("--samples", type=int, default=256, help="fit rows per route")
+    parser.add_argument("--holdout", type=int, default=64, help="fidelity rows per route")
+    parser.add_argument("--output", default=SURROGATE_PATH)
+    parser.add_argument("--report", default=None, help="write the per-route fidelity CSV here")
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    X, y, _ = load_training_features(args.source)
+    X_train, X_test, _, y_test = train_test_split(X[bundle.columns], y, test_size=0.20, random_state=42)
+
+    start = time.perf_counter()
+    surrogates, report = distill(bundle, X_train, samples_per_route=args.samples, holdout=args.holdout)
+    surrogates.save(args.output)
+    print(f"✅ {len(report)} route surrogates x {surrogates.n_basis} coefficients "
+          f"({surrogates.coef.nbytes / 1e3:.0f} KB) -> {args.output} in {time.perf_counter() - start:.1f}s")
+    if args.report:
+        report.to_csv(args.report, index=False)
+
+    print(f"Fidelity vs forest (held-out route samples): RMSE {np.sqrt((report['rmse'] ** 2).mean()):.2f}  "
+          f"MAE {report['mae'].mean():.2f}  median R2 {report['r2_vs_forest'].median():.3f}  "
+          f"worst route max |err| {report['max_abs'].max():.2f}  "
+          f"(forest spread within a route {report['forest_std'].mean():.2f})")
+    print(report.sort_values("rmse", ascending=False).head(5).to_string(index=False))
+
+    X_test = X_test.to_numpy(np.float64)
+    forest_pred, surrogate_pred = bundle.predict(X_test), surrogates.predict(X_test)
+    covered = ~np.isnan(surrogate_pred)
+    y_test = np.asarray(y_test, dtype=np.float64)
+    rmse = lambda a, b: float(np.sqrt(np.mean((a - b) ** 2)))
+    print(f"Test split ({covered.sum()} of {len(X_test)} rows covered): surrogate vs forest RMSE "
+          f"{rmse(surrogate_pred[covered], forest_pred[covered]):.2f}; vs price "
+          f"{rmse(surrogate_pred[covered], y_test[covered]):.2f} (forest {rmse(forest_pred[covered], y_test[covered]):.2f})")
+
+    for label, fn in (("forest", bundle.predict), ("surrogate", surrogates.predict)):
+        times = []
+        for row in X_test[:200]:
+            t0 = time.perf_counter()
+            fn(row[None, :])
+            times.append((time.perf_counter() - t0) * 1000)
+        print(f"{label:>9} single-row predict p50 {np.median(times):.4f} ms")
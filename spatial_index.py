@@ -0,0 +1,188 @@
+import argparse
+import time
+from math import cos, radians, floor
+
+import numpy as np
+
+from geo import one_to_many
+from locations import coords_dict
+
+# ============================================================================
+# SPATIAL INDEX FOR SNAPPING GPS PINS TO PICKUP POINTS
+# ============================================================================
+# The apps only accept names from the location registry. LocationIndex maps a
+# raw (lat, lon) to the nearest registered location:
+#
+#   index = LocationIndex(coords_dict)
+#   index.snap(22.571, 88.362)              -> "Esplanade" (or None if too far)
+#   index.nearest(22.571, 88.362, k=3)      -> [(name, km), ...]
+#   index.within(22.571, 88.362, 2.0)       -> [(name, km), ...] by distance
+#
+# Underneath, GridIndex buckets points into square cells of about cell_km
+# (sorted by cell id, one slice per cell). A query scans rings of cells
+# outward from the pin and stops once no unvisited cell can hold anything
+# closer, so it touches a handful of points instead of all of them.
+# Distances are exact haversine; the grid only prunes candidates.
+
+KM_PER_DEG_LAT = 111.195
+DEFAULT_SNAP_KM = 3.0
+
+
+class GridIndex:
+    """Uniform lat/lon grid over a point set with kNN and radius queries."""
+
+    def __init__(self, lats, lons, cell_km=None):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        n = len(self.lats)
+        if n == 0:
+            raise ValueError("GridIndex needs at least one point")
+
+        ref_lat = float(np.mean(self.lats))
+        self.lat0, self.lon0 = float(self.lats.min()), float(self.lons.min())
+        height_km = (self.lats.max() - self.lat0) * KM_PER_DEG_LAT
+        width_km = (self.lons.max() - self.lon0) * KM_PER_DEG_LAT * cos(radians(ref_lat))
+        if cell_km is None:
+            # about two points per cell on average
+            cell_km = max(np.sqrt(max(height_km * width_km, 1e-6) * 2 / n), 0.05)
+        self.cell_km = cell_km
+        self.cell_lat = cell_km / KM_PER_DEG_LAT
+        self.cell_lon = cell_km / (KM_PER_DEG_LAT * cos(radians(ref_lat)))
+        # Shortest real cell side anywhere in the data, for the stopping bound
+        widest = float(np.max(np.abs(self.lats)))
+        self.min_side_km = 0.99 * min(cell_km, self.cell_lon * KM_PER_DEG_LAT * cos(radians(widest)))
+
+        rows = np.floor((self.lats - self.lat0) / self.cell_lat).astype(np.int64)
+        cols = np.floor((self.lons - self.lon0) / self.cell_lon).astype(np.int64)
+        self.n_rows, self.n_cols = int(rows.max()) + 1, int(cols.max()) + 1
+        keys = rows * self.n_cols + cols
+        self.order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[self.order]
+        cells, starts = np.unique(sorted_keys, return_index=True)
+        ends = np.append(starts[1:], len(sorted_keys))
+        self.cells = dict(zip(cells.tolist(), zip(starts.tolist(), ends.tolist())))
+
+    def __len__(self):
+        return len(self.lats)
+
+    def _cell_of(self, lat, lon):
+        return floor((lat - self.lat0) / self.cell_lat), floor((lon - self.lon0) / self.cell_lon)
+
+    def _points_in(self, r_lo, r_hi, c_lo, c_hi, skip_inner=None):
+        """Point ids in the cell block [r_lo..r_hi] x [c_lo..c_hi] (grid-clipped)."""
+        slices = []
+        for r in range(max(r_lo, 0), min(r_hi, self.n_rows - 1) + 1):
+            if skip_inner and skip_inner[0] < r < skip_inner[1]:
+                cols = (c_lo, c_hi)   # ring: only the two edge columns on inner rows
+            else:
+                cols = range(c_lo, c_hi + 1)
+            for c in cols:
+                if 0 <= c < self.n_cols:
+                    span = self.cells.get(r * self.n_cols + c)
+                    if span is not None:
+                        slices.append(self.order[span[0]:span[1]])
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def knn(self, lat, lon, k=1):
+        """(ids, km) of the k nearest points, closest first."""
+        k = min(k, len(self))
+        r0, c0 = self._cell_of(lat, lon)
+        last_ring = max(r0, self.n_rows - 1 - r0, c0, self.n_cols - 1 - c0, 0)
+        ids = np.empty(0, dtype=np.int64)
+        km = np.empty(0)
+        ring = 0
+        while True:
+            if ring == 0:
+                found = self._points_in(r0, r0, c0, c0)
+            else:
+                found = self._points_in(r0 - ring, r0 + ring, c0 - ring, c0 + ring,
+                                        skip_inner=(r0 - ring, r0 + ring))
+            if len(found):
+                ids = np.concatenate([ids, found])
+                km = np.concatenate([km, one_to_many(lat, lon, self.lats[found], self.lons[found])])
+            # anything not seen yet is at least `ring` whole cells away
+            if len(ids) >= k and (np.partition(km, k - 1)[k - 1] <= ring * self.min_side_km):
+                break
+            if ring >= last_ring:
+                break
+            ring += 1
+        best = np.argsort(km, kind="stable")[:k]
+        return ids[best], km[best]
+
+    def within(self, lat, lon, radius_km):
+        """(ids, km) of all points within radius_km, closest first."""
+        r0, c0 = self._cell_of(lat, lon)
+        reach = int(np.ceil(radius_km / self.min_side_km))
+        found = self._points_in(r0 - reach, r0 + reach, c0 - reach, c0 + reach)
+        km = one_to_many(lat, lon, self.lats[found], self.lons[found])
+        keep = km <= radius_km
+        order = np.argsort(km[keep], kind="stable")
+        return found[keep][order], km[keep][order]
+
+
+class LocationIndex:
+    """Named pickup points with snapping, kNN and radius lookups."""
+
+    def __init__(self, coords=None, cell_km=None):
+        coords = coords or coords_dict
+        self.names = list(coords)
+        lats = [coords[name][0] for name in self.names]
+        lons = [coords[name][1] for name in self.names]
+        self.grid = GridIndex(lats, lons, cell_km)
+
+    def nearest(self, lat, lon, k=1):
+        ids, km = self.grid.knn(lat, lon, k)
+        return [(self.names[i], float(d)) for i, d in zip(ids, km)]
+
+    def within(self, lat, lon, radius_km):
+        ids, km = self.grid.within(lat, lon, radius_km)
+        return [(self.names[i], float(d)) for i, d in zip(ids, km)]
+
+    def snap(self, lat, lon, max_km=DEFAULT_SNAP_KM):
+        """Name of the nearest location, or None if it is more than max_km away."""
+        name, km = self.nearest(lat, lon, 1)[0]
+        return name if max_km is None or km <= max_km else None
+
+
+def brute_force_knn(lats, lons, lat, lon, k=1):
+    """Reference answer: distance to every point, then partial sort."""
+    km = one_to_many(lat, lon, lats, lons)
+    ids = np.argpartition(km, k - 1)[:k] if k < len(km) else np.arange(len(km))
+    ids = ids[np.argsort(km[ids], kind="stable")]
+    return ids, km[ids]
+
+
+def benchmark(n_points=20_000, n_queries=2000, k=5, seed=0):
+    """Grid index vs brute-force scan on random points around Kolkata."""
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(22.4, 22.95, n_points)
+    lons = rng.uniform(88.25, 88.5, n_points)
+    queries = np.column_stack([rng.uniform(22.4, 22.95, n_queries), rng.uniform(88.25, 88.5, n_queries)])
+
+    start = time.perf_counter()
+    grid = GridIndex(lats, lons)
+    build_s = time.perf_counter() - start
+
+    results = {"points": n_points, "queries": n_queries, "k": k, "build_ms": build_s * 1000}
+    answers = {}
+    for name, run in (("grid", lambda q: grid.knn(q[0], q[1], k)),
+                      ("brute_force", lambda q: brute_force_knn(lats, lons, q[0], q[1], k))):
+        start = time.perf_counter()
+        answers[name] = [run(q) for q in queries]
+        results[f"{name}_us_per_query"] = (time.perf_counter() - start) * 1e6 / n_queries
+    results["identical"] = all(np.allclose(a[1], b[1]) for a, b in zip(answers["grid"], answers["brute_force"]))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pickup-point spatial index.")
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    r = benchmark(args.points, args.queries, args.k)
+    print(f"{r['points']:,} points, {r['queries']:,} queries, k={r['k']} (grid built in {r['build_ms']:.1f} ms)")
+    print(f"  grid index    {r['grid_us_per_query']:8.1f} µs/query")
+    print(f"  brute force   {r['brute_force_us_per_query']:8.1f} µs/query")
+    print(f"  same answers: {r['identical']}")
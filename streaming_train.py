@@ -0,0 +1,244 @@
+import argparse
+import copy
+import glob
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from carpool_features import add_engineered_features, CATEGORICAL_COLUMNS, NUMERIC_COLUMNS, DROP_COLUMNS
+from category_encoder import CategoryEncoder
+from fast_forest import FlatForest
+from model_bundle import save_bundle, BUNDLE_DIR
+
+# ============================================================================
+# OUT-OF-CORE TRAINING
+# ============================================================================
+# Usage:
+#   python streaming_train.py rides_parquet/ --chunk-rows 500000 --trees-per-chunk 4
+#
+# complete_carpool_model.py holds the whole dataset in memory. This trainer
+# never holds more than one chunk of rows:
+#
+#   pass 1  engineer features chunk by chunk; collect the encoder
+#           vocabularies (with counts, for the default category) and one
+#           QuantileSketch per non-categorical column for the medians (the
+#           imputation values, and the serving defaults of every column)
+#   pass 2  impute + encode each chunk with the pass-1 statistics and fit a
+#           small RandomForest on it; every 1 in holdout_every rows is held
+#           back instead (up to max_eval_rows) for the final metrics
+#
+# The per-chunk forests are merged into one forest (their trees averaged
+# together) and saved as a regular model bundle, so serving does not change.
+# Data memory is bounded by chunk_rows; the merged forest grows with
+# trees_per_chunk x number of chunks.
+#
+# Input is a CSV, a Parquet file, or a directory of part files as written by
+# generate_all_city_dataset.py.
+
+TARGET_COLUMN = "price"
+
+
+class QuantileSketch:
+    """Mergeable streaming quantile sketch (KLL-style compactors).
+
+    Level h holds items of weight 2**h. A level that grows past k items is
+    sorted and every other item (random offset) moves up a level, so memory
+    is O(k log(n / k)) and rank error shrinks with k.
+    """
+
+    def __init__(self, k=4096, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self._compact()
+
+    def _compact(self):
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) > self.k:
+                items = np.sort(self.levels[h])
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[self._rng.integers(0, 2)::2]])
+                self.levels[h] = np.empty(0)
+            h += 1
+
+    def quantile(self, q):
+        if self.count == 0:
+            return float("nan")
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        return float(values[order][np.searchsorted(cumulative, q * cumulative[-1])])
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+# ----- INPUT -----
+def iter_chunks(path, chunk_rows):
+    """DataFrames of at most chunk_rows rows from a CSV, a Parquet file or a directory of parts."""
+    if os.path.isdir(path):
+        parts = sorted(glob.glob(os.path.join(path, "part-*")))
+        if not parts:
+            raise FileNotFoundError(f"no part-* files in {path}")
+        for part in parts:
+            yield from iter_chunks(part, chunk_rows)
+    elif path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+def _engineer(chunk):
+    chunk = add_engineered_features(chunk)
+    return chunk.drop([col for col in DROP_COLUMNS if col in chunk.columns], axis=1)
+
+
+# ----- PASS 1: PREPROCESSING STATISTICS -----
+def collect_statistics(path, chunk_rows, sketch_k=4096):
+    """Column order, category counts and non-categorical medians over the whole input."""
+    columns = None
+    counts = {}
+    sketches = {}
+    n_rows = 0
+    for chunk in iter_chunks(path, chunk_rows):
+        chunk = _engineer(chunk)
+        if columns is None:
+            columns = [c for c in chunk.columns if c != TARGET_COLUMN]
+        n_rows += len(chunk)
+        for col in CATEGORICAL_COLUMNS:
+            if col in chunk.columns:
+                vc = chunk[col].astype(object).fillna("Unknown").value_counts()
+                seen = counts.setdefault(col, {})
+                for value, n in vc.items():
+                    seen[value] = seen.get(value, 0) + int(n)
+        for col in columns:
+            if col not in CATEGORICAL_COLUMNS:
+                sketches.setdefault(col, QuantileSketch(sketch_k)).update(chunk[col].to_numpy(np.float64))
+    if columns is None:
+        raise ValueError(f"{path} has no rows")
+    medians = {col: sketch.median() for col, sketch in sketches.items()}
+    return {"columns": columns, "counts": counts, "medians": medians, "n_rows": n_rows}
+
+
+def prepare_chunk(chunk, stats, encoders):
+    """Engineered, imputed and encoded (X, y) for one chunk."""
+    chunk = _engineer(chunk)
+    for col in NUMERIC_COLUMNS:
+        if col in stats["medians"]:
+            chunk[col] = chunk[col].fillna(stats["medians"][col])
+    for col, enc in encoders.items():
+        chunk[col] = enc.transform(chunk[col].astype(object).fillna("Unknown"))
+    X = chunk[stats["columns"]].to_numpy(np.float64)
+    return X, chunk[TARGET_COLUMN].to_numpy(np.float64)
+
+
+# ----- PASS 2: CHUNK-WISE FOREST -----
+def train_streaming(path, chunk_rows=200_000, trees_per_chunk=4, max_depth=14,
+                    min_samples_leaf=1, holdout_every=5, max_eval_rows=200_000,
+                    bundle_path=BUNDLE_DIR, random_state=42, log=print):
+    """Two-pass out-of-core training; saves a model bundle and returns its manifest."""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
+
+    start = time.perf_counter()
+    stats = collect_statistics(path, chunk_rows)
+    encoders = {col: CategoryEncoder(sorted(seen)) for col, seen in stats["counts"].items()}
+    log(f"pass 1: {stats['n_rows']:,} rows, {len(encoders)} vocabularies, "
+        f"{len(stats['medians'])} medians ({time.perf_counter() - start:.1f}s)")
+
+    forests, eval_X, eval_y = [], [], []
+    eval_rows = 0
+    offset = 0
+    for i, chunk in enumerate(iter_chunks(path, chunk_rows)):
+        X, y = prepare_chunk(chunk, stats, encoders)
+        held = (offset + np.arange(len(y))) % holdout_every == 0 if holdout_every else np.zeros(len(y), bool)
+        offset += len(y)
+        if held.any() and eval_rows < max_eval_rows:
+            take = np.flatnonzero(held)[:max_eval_rows - eval_rows]
+            eval_X.append(X[take])
+            eval_y.append(y[take])
+            eval_rows += len(take)
+        if (~held).sum() == 0:
+            continue
+        forest = RandomForestRegressor(n_estimators=trees_per_chunk, max_depth=max_depth,
+                                       min_samples_leaf=min_samples_leaf,
+                                       random_state=random_state + i, n_jobs=-1)
+        forest.fit(X[~held], y[~held])
+        forests.append(forest)
+        log(f"pass 2: chunk {i + 1} fitted on {int((~held).sum()):,} rows")
+
+    if not forests:
+        raise ValueError("no training rows left after the holdout split")
+    model = copy.copy(forests[0])
+    model.estimators_ = [tree for forest in forests for tree in forest.estimators_]
+    model.n_estimators = len(model.estimators_)
+    flat = FlatForest.from_sklearn(model)
+
+    metrics = {}
+    if eval_X:
+        X_eval, y_eval = np.concatenate(eval_X), np.concatenate(eval_y)
+        pred = flat.predict(X_eval)
+        metrics = {"r2": float(r2_score(y_eval, pred)), "mae": float(mean_absolute_error(y_eval, pred)),
+                   "rmse": float(np.sqrt(mean_squared_error(y_eval, pred))), "n_rows": int(len(y_eval))}
+        log(f"[Holdout]    R2: {metrics['r2']:.3f}   MAE: {metrics['mae']:.2f}   RMSE: {metrics['rmse']:.2f}")
+
+    feature_defaults = {col: float(m) for col, m in stats["medians"].items()}
+    for col, seen in stats["counts"].items():
+        feature_defaults[col] = str(max(seen, key=seen.get))
+    manifest = save_bundle(
+        flat,
+        columns=stats["columns"],
+        vocabularies={col: list(enc.classes_) for col, enc in encoders.items()},
+        feature_defaults=feature_defaults,
+        metadata={
+            "source": str(path),
+            "n_rows": stats["n_rows"],
+            "estimator": "StreamingRandomForest",
+            "params": {"chunk_rows": chunk_rows, "trees_per_chunk": trees_per_chunk,
+                       "max_depth": max_depth, "min_samples_leaf": min_samples_leaf,
+                       "random_state": random_state},
+            "test": metrics,
+        },
+        path=bundle_path,
+    )
+    log(f"✅ {flat.n_trees} trees from {len(forests)} chunks saved to {bundle_path}/ "
+        f"(hash {manifest['content_hash'][:12]}) in {time.perf_counter() - start:.1f}s")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Out-of-core fare model training.")
+    parser.add_argument("input", help="CSV, Parquet file or directory of part files")
+    parser.add_argument("--chunk-rows", type=int, default=200_000)
+    parser.add_argument("--trees-per-chunk", type=int, default=4)
+    parser.add_argument("--max-depth", type=int, default=14)
+    parser.add_argument("--min-samples-leaf", type=int, default=1)
+    parser.add_argument("--holdout-every", type=int, default=5, help="hold back 1 in N rows (0: none)")
+    parser.add_argument("--bundle", default=BUNDLE_DIR)
+    args = parser.parse_args()
+
+    train_streaming(args.input, args.chunk_rows, args.trees_per_chunk, args.max_depth,
+                    args.min_samples_leaf, args.holdout_every, bundle_path=args.bundle)
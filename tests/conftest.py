@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+# The modules live flat at the repository root
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+DATASET = os.path.join(REPO, "car-data-all-locations.csv")
+
+
+@pytest.fixture(scope="session")
+def training_data(tmp_path_factory):
+    """(X, y, encoders) of the bundled dataset, prepared into a throwaway cache."""
+    from feature_cache import load_training_features
+
+    return load_training_features(DATASET, cache_dir=str(tmp_path_factory.mktemp("features")), log=None)
+
+
+@pytest.fixture(scope="session")
+def small_model(training_data):
+    """Small forest fitted like complete_carpool_model.py does it."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    X, y, _ = training_data
+    return RandomForestRegressor(n_estimators=10, max_depth=8, random_state=42).fit(X, y)
+
+
+@pytest.fixture(scope="session")
+def bundle_path(tmp_path_factory, training_data, small_model):
+    """Directory of a bundle saved from small_model."""
+    from fast_forest import FlatForest
+    from model_bundle import save_bundle
+
+    X, _, encoders = training_data
+    defaults = {col: float(X[col].median()) for col in X.columns}
+    for col, enc in encoders.items():
+        defaults[col] = str(enc.classes_[int(X[col].mode()[0])])
+    path = str(tmp_path_factory.mktemp("bundles") / "carpool_model_bundle")
+    save_bundle(FlatForest.from_sklearn(small_model), list(X.columns),
+                {col: list(enc.classes_) for col, enc in encoders.items()}, defaults, path=path)
+    return path
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fare_predictor import predict_fares
+from fare_table import FareTable, build_fare_table, load_fare_table, predict_fare
+from model_bundle import load_bundle
+
+
+@pytest.fixture
+def bundle(bundle_path):
+    return load_bundle(bundle_path)
+
+
+@pytest.fixture
+def distances(bundle):
+    pickup, drop, other = bundle.vocabularies["pickup location"][:3]
+    return {(pickup, drop): 8.0, (drop, other): 5.5}
+
+
+def test_lookup_matches_the_model(bundle, distances):
+    table = build_fare_table(bundle, distances)
+    (pickup, drop), km = next(iter(distances.items()))
+    request = pd.DataFrame({"pickup location": [pickup], "drop location": [drop],
+                            "travelling distance(km)": [km]})
+    assert table.lookup(pickup, drop) == pytest.approx(predict_fares(request, bundle).iloc[0])
+    assert predict_fare(bundle, table, pickup, drop, km) == table.lookup(pickup, drop, km)
+    assert table.lookup(pickup, drop, km + 1.0) is None
+    assert table.lookup("Nowhere", drop) is None
+
+
+def test_rebuilt_when_the_distances_change(bundle, distances, tmp_path):
+    path = str(tmp_path / "fare_table.npz")
+    table = load_fare_table(bundle, path, distances)
+    assert FareTable.load(path).is_current(bundle, distances)
+
+    (pickup, drop), km = next(iter(distances.items()))
+    moved = {**distances, (pickup, drop): km + 2.0}
+    assert not table.is_current(bundle, moved)
+    rebuilt = load_fare_table(bundle, path, moved)
+    assert rebuilt.lookup(pickup, drop, km + 2.0) is not None
+    assert np.isclose(FareTable.load(path).distance_km, rebuilt.distance_km, equal_nan=True).all()
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+from fast_forest import FlatForest, TREE_MAJOR_MIN_ROWS
+
+
+@pytest.mark.parametrize("n_rows", [1, 37, TREE_MAJOR_MIN_ROWS + 5])
+def test_flat_forest_matches_sklearn(n_rows):
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 6))
+    y = X[:, 0] * 3 + np.sin(X[:, 1]) * 10 + rng.normal(size=600)
+    model = RandomForestRegressor(n_estimators=25, max_depth=10, random_state=0).fit(X, y)
+
+    X_new = rng.normal(size=(n_rows, 6))
+    np.testing.assert_array_equal(FlatForest.from_sklearn(model).predict(X_new), model.predict(X_new))
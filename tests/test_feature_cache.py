@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from carpool_features import add_engineered_features
+from feature_cache import load_training_features, prepare_training_frame
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET = os.path.join(REPO, "car-data-all-locations.csv")
+
+
+@pytest.fixture
+def csv_with_gaps(tmp_path):
+    """Copy of the dataset with a few categorical cells blanked."""
+    df = pd.read_csv(DATASET)
+    df.loc[[0, 5, 17], "fuel type"] = np.nan
+    df.loc[[3, 9], "pickup location"] = np.nan
+    path = tmp_path / "rides.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_parquet_path_matches_csv_with_missing_categories(csv_with_gaps, tmp_path):
+    pytest.importorskip("pyarrow")
+    X, y, encoders = load_training_features(csv_with_gaps, cache_dir=str(tmp_path / "cache"), log=None)
+    X_csv, y_csv, encoders_csv = prepare_training_frame(add_engineered_features(pd.read_csv(csv_with_gaps)))
+
+    assert "Unknown" in encoders["fuel type"].classes_
+    assert "Unknown" in encoders["pickup location"].classes_
+    for col, enc in encoders_csv.items():
+        assert list(encoders[col].classes_) == list(enc.classes_)
+    assert list(X.columns) == list(X_csv.columns)
+    np.testing.assert_array_equal(X.to_numpy(np.float64), X_csv.to_numpy(np.float64))
+    np.testing.assert_array_equal(np.asarray(y, np.float64), np.asarray(y_csv, np.float64))
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from fast_forest import FlatForest
+from forest_compression import compress, matches_bundle, prune_tree, tree_arrays
+from model_bundle import load_bundle
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(800, 5))
+    return X, X[:, 0] * 4 + np.sin(3 * X[:, 1]) * 6 + rng.normal(size=800)
+
+
+@pytest.mark.parametrize("ccp_alpha", [0.05, 0.5, 5.0])
+def test_pruning_matches_sklearn(data, ccp_alpha):
+    from sklearn.tree import DecisionTreeRegressor
+
+    X, y = data
+    full = DecisionTreeRegressor(random_state=0).fit(X, y)
+    pruned = DecisionTreeRegressor(random_state=0, ccp_alpha=ccp_alpha).fit(X, y)
+    ours = FlatForest.from_trees([prune_tree(tree_arrays(full.tree_), ccp_alpha)], X.shape[1])
+    assert ours.n_nodes == pruned.tree_.node_count
+    np.testing.assert_allclose(ours.predict(X), pruned.predict(X))
+
+
+def test_compress_stays_close(data):
+    from sklearn.ensemble import RandomForestRegressor
+
+    X, y = data
+    model = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0).fit(X[:600], y[:600])
+    forest, report = compress(model, X[600:700], X[700:], y[700:], ccp_alpha=0.5, max_shift=0.5)
+    assert forest.quantized and forest.n_trees <= 20
+    assert list(report["step"]) == ["original", "prune", "drop", "float32", "quantize"]
+    assert report["kb"].iloc[-1] < report["kb"].iloc[0]
+    rmse = report.set_index("step")["test_rmse"]
+    assert rmse["float32"] == rmse["drop"]   # re-encoding changes no prediction ...
+    assert abs(rmse["quantize"] - rmse["float32"]) < 1e-3   # ... or at most half a leaf step
+
+
+def test_matches_bundle(bundle_path, small_model, data):
+    from sklearn.ensemble import RandomForestRegressor
+
+    X, y = data
+    bundle = load_bundle(bundle_path)
+    assert matches_bundle(small_model, bundle)
+    other = RandomForestRegressor(n_estimators=3, max_depth=4, random_state=0).fit(X, y)
+    assert not matches_bundle(other, bundle)
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+import pytest
+
+from hyperparam_search import best_params, load_results, successive_halving
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 4))
+    return X, X[:, 0] * 5 + rng.normal(size=400)
+
+
+def search(X, y, path):
+    return successive_halving(X, y, n_configs=4, eta=2, min_fraction=0.25, workers=2,
+                              results_path=str(path), log=lambda msg: None)
+
+
+def test_resume_and_best_params(data, tmp_path):
+    X, y = data
+    path = tmp_path / "search.jsonl"
+    final = search(X, y, path)
+    lines = path.read_text().splitlines()
+
+    assert search(X, y, path) == final   # everything resumed, nothing re-run
+    assert path.read_text().splitlines() == lines
+    assert best_params(str(path)) == final[0]["config"]
+
+
+def test_other_data_does_not_resume(data, tmp_path):
+    X, y = data
+    path = tmp_path / "search.jsonl"
+    search(X, y, path)
+    changed = y.copy()
+    changed[0] += 1.0
+    with pytest.raises(ValueError, match="other settings"):
+        search(X, changed, path)
+
+
+@pytest.mark.parametrize("content", ["", '{"settings": {"n_co'])
+def test_empty_or_torn_header(tmp_path, content):
+    path = tmp_path / "search.jsonl"
+    path.write_text(content)
+    assert best_params(str(path)) is None
+    assert load_results(str(path), {"seed": 0}) == {}
+    assert json.loads(path.read_text().splitlines()[0])["settings"] == {"seed": 0}
+
+
+def test_best_params_only_for_the_same_data(data, tmp_path):
+    X, y = data
+    path = tmp_path / "search.jsonl"
+    final = search(X, y, path)
+    assert best_params(str(path), X, y) == final[0]["config"]
+    assert best_params(str(path), X, y + 1.0) is None
@@ -0,0 +1,43 @@
+import os
+import threading
+
+import numpy as np
+
+from model_bundle import bundle_hash, load_bundle, save_bundle
+
+
+def test_round_trip_predicts_like_sklearn(bundle_path, training_data, small_model):
+    X, _, _ = training_data
+    bundle = load_bundle(bundle_path, verify=True)
+    assert bundle.columns == list(X.columns)
+    np.testing.assert_array_equal(bundle.predict(X[:500].to_numpy(np.float64)), small_model.predict(X[:500]))
+
+
+def test_readers_never_see_a_missing_bundle(bundle_path, tmp_path):
+    source = load_bundle(bundle_path)
+    path = str(tmp_path / "carpool_model_bundle")
+    save = lambda: save_bundle(source.forest, source.columns, source.vocabularies, source.feature_defaults,
+                               path=path)
+    save()
+    errors, done = [], threading.Event()
+
+    def read():
+        while not done.is_set():
+            try:
+                assert load_bundle(path).content_hash == source.content_hash
+                assert bundle_hash(path) == source.content_hash
+            except Exception as e:
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for _ in range(50):
+        save()
+    done.set()
+    for reader in readers:
+        reader.join()
+
+    assert not errors
+    assert len(os.listdir(tmp_path)) <= 3   # the link, its version and the previous one
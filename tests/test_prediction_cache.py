@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from model_bundle import load_bundle
+from prediction_cache import PredictionCache
+
+
+@pytest.fixture
+def requests(bundle_path):
+    pickups = load_bundle(bundle_path).vocabularies["pickup location"]
+    return [{"pickup location": p, "drop location": d, "travelling distance(km)": km}
+            for p in pickups[:4] for d in pickups[4:8] for km in (3.0, 7.5, 12.2)]
+
+
+def test_hits_and_quantized_keys(bundle_path, requests):
+    cache = PredictionCache(bundle_path)
+    first = cache.predict(requests[0])
+    nearby = dict(requests[0], **{"travelling distance(km)": requests[0]["travelling distance(km)"] + 0.02})
+    assert cache.predict(nearby) == first
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_eviction_keeps_the_byte_count(bundle_path, requests):
+    cache = PredictionCache(bundle_path, max_entries=10)
+    for request in requests:
+        cache.predict(request)
+    stats = cache.stats()
+    assert stats["entries"] == 10
+    assert stats["evictions"] == len(requests) - 10
+    assert stats["bytes"] == sum(size for _, _, size in cache._entries.values())
+
+
+def test_shared_between_threads(bundle_path, requests):
+    cache = PredictionCache(bundle_path, max_entries=len(requests) // 3)
+    expected = {i: PredictionCache(bundle_path).predict(r) for i, r in enumerate(requests)}
+    work = [i % len(requests) for i in range(4000)]
+    with ThreadPoolExecutor(8) as pool:
+        fares = list(pool.map(lambda i: cache.predict(requests[i]), work))
+
+    assert fares == [expected[i] for i in work]
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == len(work)
+    assert stats["entries"] <= cache.max_entries
+    assert stats["bytes"] == sum(size for _, _, size in cache._entries.values())
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from geo import one_to_many
+from locations import coords_dict
+from road_router import (PIN_LEG_SPEED_KMPH, ContractionHierarchy, OfflineRouter, astar, bidirectional_dijkstra,
+                         synthetic_city_graph)
+
+
+@pytest.fixture(scope="module")
+def small_graph():
+    coords = {name: coords_dict[name] for name in ("Park Street", "Ballygunge", "Alipore")}
+    graph = synthetic_city_graph(coords)
+    return graph, ContractionHierarchy.build(graph)
+
+
+def test_search_algorithms_agree(small_graph):
+    graph, hierarchy = small_graph
+    rng = np.random.default_rng(1)
+    for source, target in rng.integers(0, graph.n_nodes, size=(40, 2)):
+        source, target = int(source), int(target)
+        expected, _ = astar(graph, source, target)
+        assert bidirectional_dijkstra(graph, source, target)[0] == pytest.approx(expected)
+        cost, path = hierarchy.query(source, target)
+        assert cost == pytest.approx(expected)
+        if path:
+            assert path[0] == source and path[-1] == target
+            assert sum(graph.edge(u, v)[1] for u, v in zip(path, path[1:])) == pytest.approx(expected)
+
+
+def test_nearest_node_matches_a_full_scan(small_graph):
+    graph, _ = small_graph
+    rng = np.random.default_rng(2)
+    for lat, lon in zip(rng.uniform(22.50, 22.56, 200), rng.uniform(88.33, 88.38, 200)):
+        expected = np.min(one_to_many(lat, lon, graph.node_lat, graph.node_lon))
+        found = graph.nearest_node(lat, lon)
+        assert one_to_many(lat, lon, graph.node_lat[[found]], graph.node_lon[[found]])[0] == \
+            pytest.approx(expected, abs=1e-6)
+
+
+def test_pin_legs_count_in_distance_and_duration(small_graph):
+    graph, _ = small_graph
+    router = OfflineRouter(graph)
+    a, b = 0, graph.n_nodes - 1
+    on_nodes = [[float(graph.node_lon[a]), float(graph.node_lat[a])],
+                [float(graph.node_lon[b]), float(graph.node_lat[b])]]
+    off_nodes = [[on_nodes[0][0], on_nodes[0][1] + 0.0005], on_nodes[1]]   # ~55 m north of node a
+    assert graph.nearest_node(off_nodes[0][1], off_nodes[0][0]) == a
+
+    base = router.directions(on_nodes)["features"][0]["properties"]["summary"]
+    moved = router.directions(off_nodes)["features"][0]["properties"]["summary"]
+    extra_m = moved["distance"] - base["distance"]
+    assert extra_m == pytest.approx(55.6, abs=1.0)
+    assert moved["duration"] - base["duration"] == pytest.approx(extra_m / (PIN_LEG_SPEED_KMPH / 3.6))
@@ -0,0 +1,18 @@
+import pytest
+
+from locations import coords_dict
+from route_cache import RouteCache, StubDirectionsClient
+
+
+def test_route_cache_calls_client_once_per_route(tmp_path):
+    stub = StubDirectionsClient()
+    cache = RouteCache(stub, path=str(tmp_path / "routes.sqlite"))
+    coords = [list(reversed(coords_dict["Park Street"])), list(reversed(coords_dict["Howrah"]))]
+
+    first = cache.directions(coords, profile="driving-car", format="geojson")
+    second = cache.directions(coords, profile="driving-car", format="geojson")
+
+    assert stub.calls == 1
+    segment = lambda r: r["features"][0]["properties"]["segments"][0]
+    assert segment(first)["distance"] == pytest.approx(segment(second)["distance"])
+    assert segment(first)["duration"] == pytest.approx(segment(second)["duration"])
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fare_predictor import build_feature_matrix
+from fare_table import build_fare_table, predict_fare
+from model_bundle import load_bundle
+from route_surrogate import RouteSurrogates, distill
+
+
+@pytest.fixture(scope="module")
+def distilled(bundle_path, training_data):
+    bundle = load_bundle(bundle_path)
+    X, _, _ = training_data
+    pickup, drop, other = bundle.vocabularies["pickup location"][:3]
+    distances = {(pickup, drop): 8.0, (drop, other): 15.0}
+    surrogates, report = distill(bundle, X[bundle.columns].to_numpy()[:2000], distances,
+                                 samples_per_route=128, holdout=32)
+    return bundle, surrogates, report, distances
+
+
+def test_fidelity_report_per_route(distilled):
+    _, _, report, distances = distilled
+    assert len(report) == len(distances)
+    assert np.isfinite(report[["rmse", "mae", "max_abs"]].to_numpy()).all()
+
+
+def test_predicts_only_inside_the_fitted_band(distilled, tmp_path):
+    bundle, surrogates, _, distances = distilled
+    (pickup, drop), km = next(iter(distances.items()))
+    surrogates.save(str(tmp_path / "s.npz"))
+    loaded = RouteSurrogates.load(str(tmp_path / "s.npz"))
+
+    inside, outside = [0.5 * km, 0.9 * km, 1.5 * km], [0.3 * km, 1.6 * km, 10 * km]
+    requests = pd.DataFrame({"pickup location": pickup, "drop location": drop,
+                             "travelling distance(km)": inside + outside})
+    X, _ = build_feature_matrix(requests, bundle)
+    fares = loaded.predict(X)
+    assert np.isfinite(fares[:3]).all() and np.isnan(fares[3:]).all()
+
+    table = build_fare_table(bundle, distances)
+    for d in outside:
+        assert predict_fare(bundle, table, pickup, drop, d, surrogate=loaded) == \
+            predict_fare(bundle, table, pickup, drop, d)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from geo import one_to_many
+from locations import coords_dict
+from spatial_index import GridIndex, LocationIndex, brute_force_knn
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(0)
+    return rng.uniform(22.4, 22.95, 3000), rng.uniform(88.25, 88.5, 3000)
+
+
+@pytest.mark.parametrize("k", [1, 5, 40])
+def test_knn_matches_brute_force(points, k):
+    lats, lons = points
+    grid = GridIndex(lats, lons)
+    rng = np.random.default_rng(1)
+    # inside the box and well outside it
+    for lat, lon in np.column_stack([rng.uniform(22.2, 23.1, 200), rng.uniform(88.0, 88.7, 200)]):
+        _, km = grid.knn(lat, lon, k)
+        _, expected = brute_force_knn(lats, lons, lat, lon, k)
+        np.testing.assert_allclose(km, expected)
+
+
+def test_within_returns_every_point_in_the_radius(points):
+    lats, lons = points
+    grid = GridIndex(lats, lons)
+    ids, km = grid.within(22.57, 88.36, 1.5)
+    expected = np.flatnonzero(one_to_many(22.57, 88.36, lats, lons) <= 1.5)
+    assert sorted(ids.tolist()) == sorted(expected.tolist())
+    assert np.all(np.diff(km) >= 0)
+
+
+def test_snap_to_registry():
+    index = LocationIndex(coords_dict)
+    lat, lon = coords_dict["Esplanade"]
+    assert index.snap(lat + 0.002, lon - 0.002) == "Esplanade"
+    assert index.snap(21.0, 87.0) is None
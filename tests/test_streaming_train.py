@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fare_predictor import predict_fares
+from fare_table import build_fare_table, predict_fare
+from model_bundle import load_bundle
+from prediction_cache import PredictionCache
+from streaming_train import train_streaming
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET = os.path.join(REPO, "car-data-all-locations.csv")
+
+
+@pytest.fixture(scope="module")
+def streamed_bundle(tmp_path_factory):
+    """Bundle trained by the streaming trainer on a few small chunks."""
+    tmp = tmp_path_factory.mktemp("streaming")
+    source = tmp / "rides.csv"
+    pd.read_csv(DATASET, nrows=1500).to_csv(source, index=False)
+    path = str(tmp / "bundle")
+    train_streaming(str(source), chunk_rows=500, trees_per_chunk=2, max_depth=6, bundle_path=path,
+                    log=lambda msg: None)
+    return load_bundle(path)
+
+
+def test_streamed_bundle_has_a_default_for_every_column(streamed_bundle):
+    assert set(streamed_bundle.columns) <= set(streamed_bundle.feature_defaults)
+
+
+def test_streamed_bundle_serves(streamed_bundle):
+    bundle = streamed_bundle
+    pickup, drop = bundle.vocabularies["pickup location"][:2]
+    table = build_fare_table(bundle, distances={(pickup, drop): 8.0})
+
+    on_grid = predict_fare(bundle, table, pickup, drop, 8.0)
+    off_grid = predict_fare(bundle, table, pickup, drop, 11.5)
+    assert np.isfinite(on_grid) and np.isfinite(off_grid)
+    assert on_grid == pytest.approx(table.lookup(pickup, drop))
+
+    requests = pd.DataFrame({"pickup location": [pickup], "drop location": [drop],
+                             "travelling distance(km)": [11.5]})
+    assert predict_fares(requests, bundle).iloc[0] == pytest.approx(off_grid)
+    cache = PredictionCache(bundle.path)
+    assert np.isfinite(cache.predict({"pickup location": pickup, "drop location": drop,
+                                      "travelling distance(km)": 11.5}))